@@ -1,8 +1,8 @@
 # REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
 from django.db import models
-import copy
 import pandas as pd
 from reo.models import ScenarioModel
+from reo.src.model_dict import model_dict
 
 year = 2021
 """
@@ -20,12 +20,7 @@ class BaseModel(object):
         NOTE: to get correct field types you must run self.clean_fields() first (eg. convert int to float)
         :return: dict
         """
-        d = copy.deepcopy(self.__dict__)
-        d.pop("_state", None)
-        d.pop("id", None)
-        d.pop("basemodel_ptr_id", None)
-        d.pop("run_uuid", None)  # redundant with base_scenario
-        return d
+        return model_dict(self, exclude_keys=("id", "basemodel_ptr_id", "run_uuid"))  # run_uuid is redundant with base_scenario
 
     @classmethod
     def create(cls, **kwargs):
@@ -0,0 +1,18 @@
+# Generated by Django 4.0.7 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ghpghx', '0019_alter_ghpghxinputs_borehole_depth_ft_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ghpghxinputs',
+            name='input_hash',
+            field=models.TextField(blank=True, db_index=True, default='', editable=False, help_text='SHA-256 hash of the normalized inputs and the GhpGhx.jl version, used to reuse the results of a previous design with identical inputs'),
+        ),
+    ]
@@ -11,12 +11,19 @@ import os
 
 log = logging.getLogger(__name__)
 
+# GHPGHXInputs.status while the ghpghx.src.run_ghpghx task sizes the GHX, and once the outputs are saved
+SOLVING = "Solving for GHX Size..."
+SOLVED = "Solved"
+
 
 class GHPGHXInputs(models.Model):
     # Inputs
 
     ghp_uuid = models.UUIDField(primary_key=True, unique=True, editable=False)
     status = models.TextField(blank=True, default="")
+    input_hash = models.TextField(blank=True, default="", db_index=True, editable=False,
+        help_text="SHA-256 hash of the normalized inputs and the GhpGhx.jl version, used to reuse the results of a previous "
+                  "design with identical inputs")
     latitude = models.FloatField(null=True, blank=True,
         validators=[MinValueValidator(-90.0), MaxValueValidator(90.0)],
         help_text="Latitude of the site")
@@ -352,7 +359,7 @@ class ModelManager(object):
 
         try:
             ghpghx_inputs_model = GHPGHXInputs.objects.get(ghp_uuid=ghp_uuid)
-            ghpghx_outputs_model = GHPGHXOutputs.objects.get(ghp_uuid=ghp_uuid)
+            ghpghx_outputs_model = GHPGHXOutputs.objects.filter(ghp_uuid=ghp_uuid).first()
         except Exception as e:
             if isinstance(e, models.ObjectDoesNotExist):
                 resp['messages']['error'] = (
@@ -365,13 +372,19 @@ class ModelManager(object):
                 raise Exception
 
         ghpghx_inputs_dict = model_to_dict(ghpghx_inputs_model)
-        ghpghx_outputs_dict = model_to_dict(ghpghx_outputs_model)
-
         resp["inputs"] = ghpghx_inputs_dict
-        resp["outputs"] = ghpghx_outputs_dict
-
         del resp["inputs"]["status"]
 
+        # The GHX is sized by the ghpghx.src.run_ghpghx task, which saves the outputs or an error status
+        if ghpghx_outputs_model is None:
+            resp["status"] = ghpghx_inputs_model.status
+            if ghpghx_inputs_model.status.startswith("Error"):
+                resp['messages']['error'] = ghpghx_inputs_model.status
+            return resp
+
+        resp["outputs"] = model_to_dict(ghpghx_outputs_model)
+        resp["status"] = SOLVED
+
         return resp
 
 
@@ -16,8 +16,8 @@ from tastypie.resources import ModelResource
 from tastypie.validation import Validation
 from django.core.exceptions import ValidationError
 from ghpghx.models import GHPGHXInputs, GHPGHXOutputs
-from django.forms.models import model_to_dict
-from reo.src.pvwatts import PVWatts
+from ghpghx.src.run_ghpghx import run_ghpghx, hash_inputs, reuse_results_requested, find_reusable_outputs, \
+    copy_results, SOLVING, SOLVED
 log = logging.getLogger(__name__)
 
 api_version = "version 1.0.0"
@@ -39,6 +39,108 @@ class UUIDFilter(logging.Filter):
         record.uuidstr = self.uuidstr
         return True
 
+
+def create_ghpghx_inputs(post: dict):
+    """
+    Validate and save the inputs of a GHPGHX POST, and copy the outputs of a solved identical design when reuse is
+    requested.
+    :param post: dict, the POSTed inputs (the "reuse_results" key is removed)
+    :return: tuple of the ghp_uuid, reuse_results and the status, SOLVED if outputs were copied else SOLVING
+    :raises ImmediateHttpResponse: 400 or 500 response when the inputs are invalid or cannot be saved
+    """
+    ghp_uuid = str(uuid.uuid4())
+    data = dict()
+    data["ghp_uuid"] = ghp_uuid
+
+    uuidFilter = UUIDFilter(ghp_uuid)
+    log.addFilter(uuidFilter)
+    log.info('Beginning run setup')
+
+    reuse_results = reuse_results_requested(post)
+    post.pop("reuse_results", None)
+
+    # Validate inputs
+    try:
+        # Instantiate a model class instance, but not yet saved to db
+        ghpghxInputsM = GHPGHXInputs(ghp_uuid=ghp_uuid, **post)
+        try:
+            # Validate individual model fields
+            ghpghxInputsM.clean_fields()
+        except ValidationError as ve:
+            validation_errors = ve.message_dict
+            return400(data, validation_errors)
+        # TODO add ghpghxM.clean() for field-to-field validation
+        # try:
+        #     ghpghxM.clean()
+        # except ValidationError as ve:
+        #     validation_errors = ve.message_dict
+        #     return400(data, validation_errors)
+        
+        # If **fuel** for heating load is given, convert to thermal
+        if ghpghxInputsM.heating_thermal_load_mmbtu_per_hr in [None, []]:
+            ghpghxInputsM.heating_thermal_load_mmbtu_per_hr = list(np.array(ghpghxInputsM.heating_fuel_load_mmbtu_per_hr) * \
+                                            ghpghxInputsM.existing_boiler_efficiency)
+        # The ambient temperature is read from PVWatts in run_ghpghx, if it is not an input
+        ghpghxInputsM.input_hash = hash_inputs(ghpghxInputsM)
+        ghpghxInputsM.status = SOLVING
+    except ImmediateHttpResponse as e:
+        raise e
+    except Exception:
+        exc_type, exc_value, exc_traceback = sys.exc_info()
+        data["status"] = ('Internal Server Error during input validation. No GHPGHX task has been created. '
+                          'Please check your POST for bad values.')
+        data['inputs'] = post
+        data['messages'] = {}
+        data['messages']['error'] = "Unexpected Error."
+        log.error("Internal Server error: " + data['messages']['error'])
+        raise ImmediateHttpResponse(HttpResponse(json.dumps(data),
+                                                 content_type='application/json',
+                                                 status=500))  # internal server error
+
+    try:
+        # Save the instance of the GHPGHXInputs model to the database
+        ghpghxInputsM.save()
+    except Exception:
+        log.error("Could not create and save ghp_uuid: {}\n Data: {}".format(ghp_uuid, data))
+        exc_type, exc_value, exc_traceback = sys.exc_info()
+        data["status"] = "Internal Server Error during saving of inputs. Please see messages."
+        data['messages'] = "Unexpected Error."
+        log.error("Internal Server error: " + data['messages'])
+        raise ImmediateHttpResponse(HttpResponse(json.dumps(data),
+                                                 content_type='application/json',
+                                                 status=500))  # internal server error
+    
+    if reuse_results:
+        source_outputs = find_reusable_outputs(ghpghxInputsM.input_hash, ghp_uuid)
+        if source_outputs is not None:
+            try:
+                copy_results(source_outputs, ghp_uuid)
+            except Exception as e:  # fall back to solving
+                log.warning("Could not reuse GHPGHX results of ghp_uuid {}: {}".format(source_outputs.ghp_uuid, e))
+            else:
+                return ghp_uuid, reuse_results, SOLVED
+    return ghp_uuid, reuse_results, SOLVING
+
+
+def size_ghx(post: dict) -> str:
+    """
+    Size a GHX in the calling process, for callers that already run in a Celery worker (the v2 setup_scenario task)
+    and read the outputs right away
+    :param post: dict of the GHPGHX inputs, as POSTed to /ghpghx
+    :return: str, ghp_uuid of the solved design
+    """
+    try:
+        ghp_uuid, reuse_results, status = create_ghpghx_inputs(json.loads(json.dumps(post)))
+    except ImmediateHttpResponse as e:
+        raise ValueError("Invalid GHPGHX inputs: {}".format(e.response.content.decode()))
+    if status == SOLVING:
+        run_ghpghx(ghp_uuid, reuse_results=reuse_results)
+        status = GHPGHXInputs.objects.values_list("status", flat=True).get(ghp_uuid=ghp_uuid)
+    if status != SOLVED:
+        raise ValueError("GHPGHX ghp_uuid {}: {}".format(ghp_uuid, status))
+    return ghp_uuid
+
+
 class GHPGHXJob(ModelResource):
 
     class Meta:
@@ -68,113 +170,24 @@ class GHPGHXJob(ModelResource):
         return self.get_object_list(bundle.request)
 
     def obj_create(self, bundle, **kwargs):
-        ghp_uuid = str(uuid.uuid4())
-        data = dict()
-        data["ghp_uuid"] = ghp_uuid
-
-        uuidFilter = UUIDFilter(ghp_uuid)
-        log.addFilter(uuidFilter)
-        log.info('Beginning run setup')
-
-        # Validate inputs
-        try:
-            # Instantiate a model class instance, but not yet saved to db
-            ghpghxInputsM = GHPGHXInputs(ghp_uuid=ghp_uuid, **bundle.data)
-            try:
-                # Validate individual model fields
-                ghpghxInputsM.clean_fields()
-            except ValidationError as ve:
-                validation_errors = ve.message_dict
-                return400(data, validation_errors)
-            # TODO add ghpghxM.clean() for field-to-field validation
-            # try:
-            #     ghpghxM.clean()
-            # except ValidationError as ve:
-            #     validation_errors = ve.message_dict
-            #     return400(data, validation_errors)
-            
-            # If **fuel** for heating load is given, convert to thermal
-            if ghpghxInputsM.heating_thermal_load_mmbtu_per_hr in [None, []]:
-                ghpghxInputsM.heating_thermal_load_mmbtu_per_hr = list(np.array(ghpghxInputsM.heating_fuel_load_mmbtu_per_hr) * \
-                                                ghpghxInputsM.existing_boiler_efficiency)
-            # Call PVWatts for hourly dry-bulb outdoor air temperature
-            if ghpghxInputsM.ambient_temperature_f in [None, []]:
-                try:
-                    pvwatts_inst = PVWatts(tilt=45, latitude=ghpghxInputsM.latitude, longitude=ghpghxInputsM.longitude)
-                    amb_temp_c = pvwatts_inst.response["outputs"]["tamb"]
-                    ghpghxInputsM.ambient_temperature_f = list(np.array(amb_temp_c) * 1.8 + 32.0)
-                except Exception:
-                    return400(data, {"Error": "Error in PVWatts call when getting temperature for GHP model."})
-        except ImmediateHttpResponse as e:
-            raise e
-        except Exception:
-            exc_type, exc_value, exc_traceback = sys.exc_info()
-            data["status"] = ('Internal Server Error during input validation. No GHPGHX task has been created. '
-                              'Please check your POST for bad values.')
-            data['inputs'] = bundle.data
-            data['messages'] = {}
-            data['messages']['error'] = "Unexpected Error."
-            log.error("Internal Server error: " + data['messages']['error'])
-            raise ImmediateHttpResponse(HttpResponse(json.dumps(data),
-                                                     content_type='application/json',
-                                                     status=500))  # internal server error
+        ghp_uuid, reuse_results, status = create_ghpghx_inputs(bundle.data)
+        if status == SOLVED:
+            raise ImmediateHttpResponse(HttpResponse(json.dumps({'ghp_uuid': ghp_uuid, 'status': SOLVED}),
+                                                     content_type='application/json', status=201))
+        data = {"ghp_uuid": ghp_uuid}
 
         try:
-            # Save the instance of the GHPGHXInputs model to the database
-            ghpghxInputsM.save()
+            run_ghpghx.delay(ghp_uuid, reuse_results=reuse_results)
         except Exception:
-            log.error("Could not create and save ghp_uuid: {}\n Data: {}".format(ghp_uuid, data))
-            exc_type, exc_value, exc_traceback = sys.exc_info()
-            data["status"] = "Internal Server Error during saving of inputs. Please see messages."
-            data['messages'] = "Unexpected Error."
-            log.error("Internal Server error: " + data['messages'])
-            raise ImmediateHttpResponse(HttpResponse(json.dumps(data),
-                                                     content_type='application/json',
-                                                     status=500))  # internal server error
-        
-        data["inputs"] = model_to_dict(ghpghxInputsM)
-        # Remove extra inputs used above but not expected in ghpghx_inputs.jl
-        data["inputs"].pop("latitude", None)
-        data["inputs"].pop("longitude", None)
-        data["inputs"].pop("heating_fuel_load_mmbtu_per_hr", None)
-        data["inputs"].pop("existing_boiler_efficiency", None)
-        data["status"] = 'Solving for GHX Size...'
-
-        try:
-            julia_host = os.environ.get('JULIA_HOST', "julia")
-            response = requests.post("http://" + julia_host + ":8081/ghpghx/", json=data["inputs"])
-            results = response.json()
-        except Exception as e:
-            exc_type, exc_value, exc_traceback = sys.exc_info()
-            message = "Error running GHPGHX model."
-            data["status"] = message
-            if 'messages' not in data.keys():
-                data['messages'] = {}
-            data['messages']['error'] = message
-            log.error("Internal Server error: " + message)
-            raise ImmediateHttpResponse(HttpResponse(json.dumps(data),
-                                                        content_type='application/json',
-                                                        status=500))  # internal server error
-        
-        try:
-            #ghpghxOutputsM.objects.filter(ghp_uuid=ghp_uuid).update(**results)
-            ghpghxOutputsM = GHPGHXOutputs(ghp_uuid=ghp_uuid, **results)
-            ghpghxOutputsM.save()
-        except Exception as e:
-            print(e)
-            exc_type, exc_value, exc_traceback = sys.exc_info()
-            message = "Error saving the results to the database"
+            message = "Error queuing the GHPGHX model."
+            GHPGHXInputs.objects.filter(ghp_uuid=ghp_uuid).update(status=message)
             data["status"] = message
-            if 'messages' not in data.keys():
-                data['messages'] = {}
-            data['messages']['error'] = message
+            data['messages'] = {'error': message}
             log.error("Internal Server error: " + message)
             raise ImmediateHttpResponse(HttpResponse(json.dumps(data),
-                                                        content_type='application/json',
-                                                        status=500))  # internal server error
+                                                     content_type='application/json',
+                                                     status=500))  # internal server error
 
-        # Successful if it reaches here
-        data["status"] = "Solved"
-        raise ImmediateHttpResponse(HttpResponse(json.dumps({'ghp_uuid': ghp_uuid}),
+        # Poll GET /ghpghx/<ghp_uuid>/results until the status is "Solved"
+        raise ImmediateHttpResponse(HttpResponse(json.dumps({'ghp_uuid': ghp_uuid, 'status': SOLVING}),
                                                  content_type='application/json', status=201))
-
@@ -0,0 +1,157 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+"""
+GHX sizing for POST /ghpghx as a Celery task, and reuse of the outputs of solved designs with the same input_hash.
+"""
+import hashlib
+import json
+import logging
+import os
+from functools import lru_cache
+import numpy as np
+from celery import shared_task
+from django.db import transaction
+from django.forms.models import model_to_dict
+from ghpghx.models import GHPGHXInputs, GHPGHXOutputs, SOLVING, SOLVED
+from reo.src.julia_client import julia_client
+from reo.src.pvwatts import PVWatts
+log = logging.getLogger(__name__)
+
+# inputs used in the API to prepare the inputs, but not expected in ghpghx_inputs.jl
+NON_JULIA_INPUT_KEYS = ["latitude", "longitude", "heating_fuel_load_mmbtu_per_hr", "existing_boiler_efficiency"]
+
+MANIFEST_PATH = os.path.join("julia_src", "Manifest.toml")
+
+
+@lru_cache(maxsize=1)
+def ghpghx_jl_version() -> str:
+    """
+    GhpGhx.jl version used by the Julia API, from the GHPGHX_JL_VERSION environment variable or the version (or git
+    tree hash) in julia_src/Manifest.toml
+    """
+    version = os.environ.get("GHPGHX_JL_VERSION")
+    if version:
+        return version
+    try:
+        with open(MANIFEST_PATH, "r") as f:
+            in_ghpghx = False
+            for line in f:
+                line = line.strip()
+                if line.startswith("[["):
+                    in_ghpghx = line == "[[deps.GhpGhx]]"
+                elif in_ghpghx and line.startswith(("version", "git-tree-sha1")):
+                    return line.split("=")[1].strip().strip('"')
+    except IOError:
+        pass
+    return ""
+
+
+def reuse_results_requested(data: dict) -> bool:
+    """
+    Top level "reuse_results" of the POST, which defaults to the GHPGHX_REUSE_RESULTS environment variable (true)
+    """
+    default = os.environ.get("GHPGHX_REUSE_RESULTS", "true").lower() == "true"
+    return bool(data.get("reuse_results", default))
+
+
+def julia_inputs(ghpghx_inputs: GHPGHXInputs) -> dict:
+    """
+    :return: dict of the inputs POSTed to the Julia /ghpghx endpoint
+    """
+    inputs = model_to_dict(ghpghx_inputs)
+    for k in NON_JULIA_INPUT_KEYS:
+        inputs.pop(k, None)
+    return inputs
+
+
+def hash_inputs(ghpghx_inputs: GHPGHXInputs) -> str:
+    """
+    :param ghpghx_inputs: GHPGHXInputs after clean_fields and the conversion of the heating fuel load to thermal
+    :return: str, SHA-256 hex digest of the inputs sent to Julia (plus the location when the ambient temperature comes
+        from PVWatts) and the GhpGhx.jl version
+    """
+    inputs = julia_inputs(ghpghx_inputs)
+    inputs.pop("status", None)
+    if ghpghx_inputs.ambient_temperature_f in [None, []]:
+        inputs["latitude"] = ghpghx_inputs.latitude
+        inputs["longitude"] = ghpghx_inputs.longitude
+    canonical = json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256((ghpghx_jl_version() + canonical).encode()).hexdigest()
+
+
+def find_reusable_outputs(input_hash: str, ghp_uuid: str):
+    """
+    :return: GHPGHXOutputs of a solved design with the same input_hash, or None
+    """
+    if not input_hash:
+        return None
+    solved = GHPGHXInputs.objects.filter(input_hash=input_hash, status=SOLVED).exclude(ghp_uuid=ghp_uuid)
+    return GHPGHXOutputs.objects.filter(ghp_uuid__in=solved.values("ghp_uuid")).first()
+
+
+def copy_results(source_outputs: GHPGHXOutputs, ghp_uuid: str) -> None:
+    """
+    Copy source_outputs, and the ambient temperature used for them, to the (already saved) ghp_uuid.
+    """
+    ghpghx_inputs = GHPGHXInputs.objects.get(ghp_uuid=ghp_uuid)
+    source_inputs = GHPGHXInputs.objects.get(ghp_uuid=source_outputs.ghp_uuid)
+    values = {f.attname: getattr(source_outputs, f.attname) for f in GHPGHXOutputs._meta.concrete_fields}
+    values["ghp_uuid"] = ghp_uuid
+    with transaction.atomic():
+        GHPGHXOutputs(**values).save(force_insert=True)
+        ghpghx_inputs.ambient_temperature_f = source_inputs.ambient_temperature_f
+        ghpghx_inputs.status = SOLVED
+        ghpghx_inputs.save(update_fields=["ambient_temperature_f", "status"])
+
+
+def _set_status(ghp_uuid: str, status: str) -> None:
+    GHPGHXInputs.objects.filter(ghp_uuid=ghp_uuid).update(status=status)
+
+
+@shared_task(ignore_result=True)
+def run_ghpghx(ghp_uuid, reuse_results=True):
+    """
+    Size the GHX of ghp_uuid with the Julia /ghpghx endpoint and save the GHPGHXOutputs.
+    Errors are saved in GHPGHXInputs.status, which the results endpoint returns.
+    :param ghp_uuid: str
+    :param reuse_results: bool, copy the outputs of an identical design that was solved while this one was queued
+    """
+    ghpghx_inputs = GHPGHXInputs.objects.get(ghp_uuid=ghp_uuid)
+    if reuse_results:
+        source_outputs = find_reusable_outputs(ghpghx_inputs.input_hash, ghp_uuid)
+        if source_outputs is not None:
+            try:
+                copy_results(source_outputs, ghp_uuid)
+                return
+            except Exception as e:  # fall back to solving
+                log.warning("Could not reuse GHPGHX results of ghp_uuid {}: {}".format(source_outputs.ghp_uuid, e))
+
+    # Call PVWatts for hourly dry-bulb outdoor air temperature
+    if ghpghx_inputs.ambient_temperature_f in [None, []]:
+        try:
+            pvwatts_inst = PVWatts(tilt=45, latitude=ghpghx_inputs.latitude, longitude=ghpghx_inputs.longitude)
+            amb_temp_c = pvwatts_inst.response["outputs"]["tamb"]
+            ghpghx_inputs.ambient_temperature_f = list(np.array(amb_temp_c) * 1.8 + 32.0)
+            ghpghx_inputs.save(update_fields=["ambient_temperature_f"])
+        except Exception:
+            message = "Error in PVWatts call when getting temperature for GHP model."
+            log.error("ghp_uuid {}: {}".format(ghp_uuid, message))
+            _set_status(ghp_uuid, message)
+            return
+
+    try:
+        response = julia_client.post("ghpghx", json=julia_inputs(ghpghx_inputs))
+        results = response.json()
+    except Exception:
+        message = "Error running GHPGHX model."
+        log.error("ghp_uuid {}: {}".format(ghp_uuid, message))
+        _set_status(ghp_uuid, message)
+        return
+
+    try:
+        GHPGHXOutputs(ghp_uuid=ghp_uuid, **results).save()
+    except Exception as e:
+        message = "Error saving the results to the database"
+        log.error("ghp_uuid {}: {}: {}".format(ghp_uuid, message, e))
+        _set_status(ghp_uuid, message)
+        return
+    _set_status(ghp_uuid, SOLVED)
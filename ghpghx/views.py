@@ -9,6 +9,7 @@ import json
 import pandas as pd
 import requests
 import logging
+from reo.src.julia_client import julia_client
 from django.http import JsonResponse
 from django.http import HttpResponse
 from django.template import  loader
@@ -89,8 +90,7 @@ def ground_conductivity(request):
         inputs_dict = {"latitude": latitude,
                         "longitude": longitude}
 
-        julia_host = os.environ.get('JULIA_HOST', "julia")
-        http_jl_response = requests.get("http://" + julia_host + ":8081/ground_conductivity/", json=inputs_dict)
+        http_jl_response = julia_client.get("ground_conductivity", json=inputs_dict)
         
         response = JsonResponse(
             http_jl_response.json()
@@ -26,6 +26,7 @@ from tastypie.test import TestApiClient
 from reo.utilities import TONHOUR_TO_KWHT, get_climate_zone_and_nearest_city
 from ghpghx.models import GHPGHXInputs
 from ghpghx.models import ModelManager as ghpModelManager
+from ghpghx.resources import size_ghx
 
 class ScenarioTask(Task):
     """
@@ -63,7 +64,7 @@ class ScenarioTask(Task):
         self.request.chord = None  # this seems to stop the infinite chord_unlock call
 
 
-@shared_task(bind=True, base=ScenarioTask)
+@shared_task(bind=True, base=ScenarioTask, ignore_result=True)
 def setup_scenario(self, run_uuid, data, api_version=1):
     """
 
@@ -396,10 +397,7 @@ def setup_scenario(self, run_uuid, data, api_version=1):
                     determine_heat_cool_post["simulation_years"] = 2
                     determine_heat_cool_post["max_sizing_iterations"] = 1
 
-                    determine_heat_cool_post_resp = client.post('/v1/ghpghx/', data=determine_heat_cool_post)
-                    determine_heat_cool_post_resp_dict = json.loads(determine_heat_cool_post_resp.content)
-                    
-                    determine_heat_cool_uuid = determine_heat_cool_post_resp_dict.get('ghp_uuid')
+                    determine_heat_cool_uuid = size_ghx(determine_heat_cool_post)
                     determine_heat_cool_results_url = "/v1/ghpghx/"+determine_heat_cool_uuid+"/results/"
                     determine_heat_cool_results_resp = client.get(determine_heat_cool_results_url) 
                     determine_heat_cool_results_resp_dict = json.loads(determine_heat_cool_results_resp.content)
@@ -423,10 +421,8 @@ def setup_scenario(self, run_uuid, data, api_version=1):
                 if inputs_dict["Site"]["GHP"]["aux_heater_type"] == "electric":
                     ghpghx_post["is_heating_electric"] = True
         
-                # Call /ghpghx endpoint to size GHP and GHX
-                ghpghx_post_resp = client.post('/v1/ghpghx/', data=ghpghx_post)
-                ghpghx_post_resp_dict = json.loads(ghpghx_post_resp.content)
-                ghpghx_uuid_list.append(ghpghx_post_resp_dict.get('ghp_uuid'))
+                # Size GHP and GHX here: POST /ghpghx only queues the sizing, and this task already runs in a worker
+                ghpghx_uuid_list.append(size_ghx(ghpghx_post))
                 ghpghx_results_url = "/v1/ghpghx/"+ghpghx_uuid_list[i]+"/results/"
                 ghpghx_results_resp = client.get(ghpghx_results_url)  # same as doing ghpModelManager.make_response(ghp_uuid)
                 ghpghx_results_resp_dict = json.loads(ghpghx_results_resp.content)
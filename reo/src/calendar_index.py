@@ -0,0 +1,72 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+"""
+Cached, read-only calendar index arrays (month, day, weekday, hour, ...) for the 365 day years of the time series, so
+that time series logic can index and mask series with arrays instead of looping over datetimes.
+"""
+from collections import namedtuple
+from functools import lru_cache
+import numpy as np
+
+DAYS_PER_YEAR = 365
+
+DayCalendar = namedtuple("DayCalendar", "month day_of_month day_of_week is_weekday day_of_year")
+DayCalendar.__doc__ = """
+month: int 1-12, day_of_month: int 1-31, day_of_week: int 0-6 (Monday is 0, as in calendar.weekday),
+is_weekday: bool (Monday through Friday), day_of_year: int 0-364 (position of the day in the 365 day year)
+"""
+StepCalendar = namedtuple("StepCalendar", "month day_of_month day_of_week hour is_weekday day_of_year")
+StepCalendar.__doc__ = """
+Fields of DayCalendar for the day of each time step, and hour: int 0-23
+"""
+
+
+def _read_only(*arrays):
+    for a in arrays:
+        a.setflags(write=False)
+    return arrays
+
+
+@lru_cache(maxsize=None)
+def day_calendar(year: int, leap_day: bool = True) -> DayCalendar:
+    """
+    A year of time steps always has 365 days. With leap_day, a leap year includes February 29 and ends on December 30,
+    like the built-in load profiles and the CHP unavailability periods; without it, February 29 is skipped, which is
+    the month layout of the URDB rate schedules.
+    :param year: int
+    :param leap_day: bool, False to skip February 29 of a leap year instead of December 31
+    :return: DayCalendar of read-only np.ndarrays with one entry per day (365)
+    """
+    days = np.arange(np.datetime64("{:04d}-01-01".format(year)), np.datetime64("{:04d}-01-01".format(year + 1)),
+                     dtype="datetime64[D]")
+    first_of_month = days.astype("datetime64[M]")
+    month = first_of_month.astype(np.int64) % 12 + 1
+    day_of_month = (days - first_of_month).astype(np.int64) + 1
+    if not leap_day:
+        keep = ~((month == 2) & (day_of_month == 29))
+        days, month, day_of_month = days[keep], month[keep], day_of_month[keep]
+    days, month, day_of_month = days[:DAYS_PER_YEAR], month[:DAYS_PER_YEAR], day_of_month[:DAYS_PER_YEAR]
+    day_of_week = (days.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+    return DayCalendar(*_read_only(month, day_of_month, day_of_week, day_of_week < 5, np.arange(DAYS_PER_YEAR)))
+
+
+@lru_cache(maxsize=None)
+def step_calendar(year: int, time_steps_per_hour: int = 1, leap_day: bool = True) -> StepCalendar:
+    """
+    :param year: int
+    :param time_steps_per_hour: int
+    :param leap_day: bool, False to skip February 29 of a leap year instead of December 31
+    :return: StepCalendar of read-only np.ndarrays with one entry per time step (8760 * time_steps_per_hour)
+    """
+    steps_per_day = 24 * time_steps_per_hour
+    days = day_calendar(year, leap_day)
+    month, day_of_month, day_of_week, is_weekday, day_of_year = (np.repeat(a, steps_per_day) for a in days)
+    hour = np.tile(np.repeat(np.arange(24), time_steps_per_hour), DAYS_PER_YEAR)
+    return StepCalendar(*_read_only(month, day_of_month, day_of_week, hour, is_weekday, day_of_year))
+
+
+def month_start_steps(year: int, time_steps_per_hour: int = 1, leap_day: bool = True) -> np.ndarray:
+    """
+    :return: np.ndarray of 13 ints, the zero-indexed first time step of each month and the number of time steps
+    """
+    days_in_month = np.bincount(day_calendar(year, leap_day).month, minlength=13)[1:]
+    return np.concatenate(([0], np.cumsum(days_in_month) * 24 * time_steps_per_hour))
@@ -0,0 +1,181 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+"""
+Packed float64 .npy stores of the EASIUR health cost maps and the AVERT hourly emissions factors in reo/src/data, built
+with the image by bin/build-data-stores and memory-mapped once per process.
+"""
+import json
+import logging
+import os
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+log = logging.getLogger(__name__)
+
+LIBRARY_PATH = os.path.join('reo', 'src', 'data')
+EASIUR_PATH = os.path.join(LIBRARY_PATH, 'EASIUR_Data')
+EASIUR_STACKS = ("area", "p150", "p300")
+EASIUR_SOURCES = {
+    "pop2005": "sc_8.6MVSL_{}_pop2005.hdf5",
+    "growth_rate": "sc_growth_rate_pop2005_pop2040_{}.hdf5",
+}
+AVERT_POLLUTANTS = ("CO2", "NOx", "SO2", "PM25")
+
+
+def _store_is_current(store_path, index_path, source_path):
+    if not (os.path.isfile(store_path) and os.path.isfile(index_path)):
+        return False
+    return os.path.getmtime(source_path) <= min(os.path.getmtime(store_path), os.path.getmtime(index_path))
+
+
+def _index_path(store_path):
+    return store_path[:-len('.npy')] + '.json'
+
+
+def _save_store(store_path, index_path, array, names):
+    # write to temporary files and rename so that a process never reads a partial store
+    tmp_suffix = '.{}.tmp'.format(os.getpid())
+    with open(store_path + tmp_suffix, 'wb') as f:
+        np.save(f, array)
+    with open(index_path + tmp_suffix, 'w') as f:
+        json.dump(names, f)
+    os.replace(store_path + tmp_suffix, store_path)
+    os.replace(index_path + tmp_suffix, index_path)
+
+
+class ArrayStore(object):
+
+    def __init__(self, source_path, store_path, read_source):
+        """
+        :param source_path: str, original data file
+        :param store_path: str, .npy file of the packed data (the index is the same path with .json)
+        :param read_source: function of source_path that returns (list of names, np.ndarray with one name per entry
+            along the named axis)
+        """
+        index_path = _index_path(store_path)
+        if _store_is_current(store_path, index_path, source_path):
+            with open(index_path, 'r') as f:
+                names = json.load(f)
+            self.array = np.load(store_path, mmap_mode='r')
+        else:
+            log.warning("No current store {}, reading {}. Build it with bin/build-data-stores.".format(
+                store_path, source_path))
+            names, array = read_source(source_path)
+            self.array = np.ascontiguousarray(array, dtype='float64')
+            self.array.setflags(write=False)
+        self.index = {name: i for i, name in enumerate(names)}
+
+
+def _read_hdf5_maps(path):
+    import h5py
+    with h5py.File(path, 'r') as f:
+        names = sorted(f.keys())
+        return names, np.stack([f[name][()] for name in names])
+
+
+def _read_avert_csv(path):
+    df = pd.read_csv(path, dtype='float64', float_precision='high')
+    return list(df.columns), df.values
+
+
+class EASIURStore(ArrayStore):
+
+    def map(self, name):
+        """
+        :param name: str, eg. "NOX_Annual"
+        :return: read-only 148x112 np.ndarray
+        """
+        return self.array[self.index[name]]
+
+    def maps(self):
+        """
+        :return: dict of name to read-only 148x112 np.ndarray, like deepdish.io.load of the source file
+        """
+        return {name: self.array[i] for name, i in self.index.items()}
+
+    def value(self, name, x, y):
+        """
+        :param x: int, zero based column of the CAMx grid
+        :param y: int, zero based row of the CAMx grid
+        :return: np.float64
+        """
+        return self.array[self.index[name], x, y]
+
+
+class AVERTStore(ArrayStore):
+
+    def series(self, region):
+        """
+        :param region: str, AVERT region abbreviation, eg. "RM"
+        :return: read-only np.ndarray of 8760 hourly emissions factors, or None if the region is not in the data
+        """
+        if region not in self.index:
+            return None
+        return self.array[:, self.index[region]]
+
+
+def _easiur_paths(stack, kind):
+    """
+    :return: (source_path, store_path), the store has shape (n maps, 148, 112) and its .json index names the maps
+    """
+    return (os.path.join(EASIUR_PATH, EASIUR_SOURCES[kind].format(stack)),
+            os.path.join(EASIUR_PATH, 'easiur_{}_{}.npy'.format(stack, kind)))
+
+
+def _avert_paths(pollutant):
+    """
+    :return: (source_path, store_path), the store has shape (8760, n regions) and its .json index names the regions
+    """
+    name = 'AVERT_hourly_emissions_{}'.format(pollutant)
+    return os.path.join(LIBRARY_PATH, name + '.csv'), os.path.join(LIBRARY_PATH, name + '.npy')
+
+
+def _all_stores():
+    """
+    :return: list of (store function, its arguments, source_path, store_path, read_source)
+    """
+    return ([(easiur_store, (stack, kind)) + _easiur_paths(stack, kind) + (_read_hdf5_maps,)
+             for stack in EASIUR_STACKS for kind in EASIUR_SOURCES] +
+            [(avert_store, (pollutant,)) + _avert_paths(pollutant) + (_read_avert_csv,)
+             for pollutant in AVERT_POLLUTANTS])
+
+
+@lru_cache(maxsize=None)
+def easiur_store(stack, kind):
+    """
+    :param stack: str, one of EASIUR_STACKS
+    :param kind: str, "pop2005" for the marginal damages with 2005 population, "growth_rate" for their annual growth
+    :return: EASIURStore, loaded once per process
+    """
+    return EASIURStore(*_easiur_paths(stack, kind), _read_hdf5_maps)
+
+
+@lru_cache(maxsize=None)
+def avert_store(pollutant):
+    """
+    :param pollutant: str, one of AVERT_POLLUTANTS
+    :return: AVERTStore, loaded once per process
+    """
+    return AVERTStore(*_avert_paths(pollutant), _read_avert_csv)
+
+
+def build_stores():
+    for _, _, source_path, store_path, read_source in _all_stores():
+        names, array = read_source(source_path)
+        _save_store(store_path, _index_path(store_path), np.ascontiguousarray(array, dtype='float64'), names)
+
+
+def preload():
+    """
+    Memory-map the stores that are built and current in this process. Stores that are missing are not read from their
+    source files here, they are read when they are first used.
+    """
+    for store, args, source_path, store_path, _ in _all_stores():
+        try:
+            if _store_is_current(store_path, _index_path(store_path), source_path):
+                store(*args)
+        except Exception as e:  # the store is loaded again when it is first used
+            log.warning("Could not preload {}: {}".format(store_path, e))
+
+
+if __name__ == "__main__":
+    build_stores()
@@ -0,0 +1,121 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+"""
+Pooled keep-alive HTTP client for the Julia API (julia_src/http.jl), which retries connection errors and fails over
+round-robin across the Julia hosts.
+"""
+import itertools
+import logging
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from urllib3.util.retry import Retry
+log = logging.getLogger(__name__)
+
+JULIA_PORT = 8081
+
+# (connect, read) timeouts in seconds. Optimization and sizing endpoints run as long as the solver needs, so they have
+# no read timeout (REopt.jl enforces Settings.timeout_seconds itself).
+DEFAULT_TIMEOUT = (5, 120)
+ENDPOINT_TIMEOUTS = {
+    "reopt": (5, None),
+    "job": (5, None),
+    "erp": (5, None),
+    "ghpghx": (5, None),
+    "simulated_load": (5, 300),
+}
+
+
+def failed_to_connect(e):
+    """
+    True if the request was never sent (so it can safely be sent to another host), as opposed to a connection that was
+    dropped while the Julia server was handling the request.
+    """
+    if isinstance(e, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(e.args[0], "reason", None) if e.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def julia_hosts_from_env():
+    """
+    Comma separated JULIA_HOSTS, or JULIA_HOST, or "julia"
+    """
+    hosts = os.environ.get('JULIA_HOSTS') or os.environ.get('JULIA_HOST', "julia")
+    return [host.strip() for host in hosts.split(",") if host.strip()]
+
+
+class JuliaClient(object):
+
+    def __init__(self, hosts=None, port=JULIA_PORT, connect_retries=3, backoff_factor=0.5, pool_maxsize=10):
+        """
+        :param hosts: list of str, Julia server host names, defaults to julia_hosts_from_env()
+        :param port: int
+        :param connect_retries: int, number of times to retry a connection error on each host
+        :param backoff_factor: float, sleep backoff_factor * 2 ** (retry number - 1) seconds between retries
+        :param pool_maxsize: int, number of connections to keep alive per host
+        """
+        self.hosts = hosts or julia_hosts_from_env()
+        self.port = port
+        self.connect_retries = connect_retries
+        self.backoff_factor = backoff_factor
+        self.pool_maxsize = pool_maxsize
+        self._host_cycle = itertools.cycle(range(len(self.hosts)))
+        self._lock = threading.Lock()
+        self._session = None
+        self._pid = None
+
+    @property
+    def session(self):
+        """
+        requests.Session for this process. Celery and gunicorn fork worker processes, which must not share the parent's
+        sockets, so a new Session is created whenever the process id changes.
+        """
+        if self._session is None or self._pid != os.getpid():
+            retry = Retry(total=self.connect_retries, connect=self.connect_retries, read=0, status=0, redirect=0,
+                          backoff_factor=self.backoff_factor, raise_on_status=False)
+            adapter = HTTPAdapter(pool_connections=len(self.hosts), pool_maxsize=self.pool_maxsize, max_retries=retry)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._session = session
+            self._pid = os.getpid()
+        return self._session
+
+    def _next_host_index(self):
+        with self._lock:
+            return next(self._host_cycle)
+
+    def url(self, endpoint, host=None):
+        return "http://{}:{}/{}/".format(host or self.hosts[0], self.port, endpoint.strip("/"))
+
+    def request(self, method, endpoint, timeout=None, **kwargs):
+        """
+        :param method: str, HTTP method
+        :param endpoint: str, Julia API endpoint, e.g. "reopt" or "chp_defaults"
+        :param timeout: (connect, read) seconds, defaults to ENDPOINT_TIMEOUTS[endpoint] or DEFAULT_TIMEOUT
+        :param kwargs: passed to requests.Session.request, e.g. json or stream
+        :return: requests.Response
+        """
+        endpoint = endpoint.strip("/")
+        if timeout is None:
+            timeout = ENDPOINT_TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
+        first = self._next_host_index()
+        for i in range(len(self.hosts)):
+            host = self.hosts[(first + i) % len(self.hosts)]
+            try:
+                return self.session.request(method, self.url(endpoint, host), timeout=timeout, **kwargs)
+            except requests.exceptions.ConnectionError as e:
+                if i == len(self.hosts) - 1 or not failed_to_connect(e):
+                    raise
+                log.warning("Could not connect to Julia host {}, trying the next host.".format(host))
+
+    def get(self, endpoint, **kwargs):
+        return self.request("GET", endpoint, **kwargs)
+
+    def post(self, endpoint, **kwargs):
+        return self.request("POST", endpoint, **kwargs)
+
+
+julia_client = JuliaClient()
@@ -0,0 +1,167 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+"""
+TTL cache of the successful responses of the idempotent Julia API default/lookup endpoints (e.g. chp_defaults), keyed
+on the endpoint and the key sorted inputs.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from cachetools import TTLCache
+from reo.src.julia_client import julia_client
+log = logging.getLogger(__name__)
+
+KEY_PREFIX = "julia_response:"
+STATS_KEY = "julia_response_cache:stats"
+
+
+class CachedResponse(object):
+    """
+    Stands in for the requests.Response of a cached Julia API call (the views only use json() and status_code).
+    """
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+
+    def json(self):
+        return self.payload
+
+
+class LocalBackend(object):
+
+    name = "local"
+
+    def __init__(self, maxsize, ttl_seconds):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+        self.counts = defaultdict(lambda: {"hits": 0, "misses": 0})
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            return self.cache.get(key)
+
+    def set(self, key, payload):
+        with self.lock:
+            self.cache[key] = payload
+
+    def count(self, endpoint, outcome):
+        with self.lock:
+            self.counts[endpoint][outcome] += 1
+
+    def stats(self):
+        with self.lock:
+            return {"size": len(self.cache), "endpoints": {k: dict(v) for k, v in self.counts.items()}}
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+            self.counts.clear()
+
+
+class RedisBackend(object):
+
+    name = "redis"
+
+    def __init__(self, url, ttl_seconds):
+        import redis
+        self.redis = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, key):
+        payload = self.redis.get(key)
+        return json.loads(payload) if payload is not None else None
+
+    def set(self, key, payload):
+        self.redis.set(key, json.dumps(payload), ex=self.ttl_seconds)
+
+    def count(self, endpoint, outcome):
+        self.redis.hincrby(STATS_KEY, "{}:{}".format(endpoint, outcome), 1)
+
+    def stats(self):
+        endpoints = defaultdict(lambda: {"hits": 0, "misses": 0})
+        for field, count in self.redis.hgetall(STATS_KEY).items():
+            endpoint, outcome = field.decode().rsplit(":", 1)
+            endpoints[endpoint][outcome] = int(count)
+        return {"size": sum(1 for _ in self.redis.scan_iter(match=KEY_PREFIX + "*")), "endpoints": dict(endpoints)}
+
+    def clear(self):
+        for key in self.redis.scan_iter(match=KEY_PREFIX + "*"):
+            self.redis.delete(key)
+        self.redis.delete(STATS_KEY)
+
+
+def redis_url_from_env():
+    url = os.environ.get("JULIA_RESPONSE_CACHE_REDIS_URL")
+    if url is None:
+        from reopt_api.celery import app
+        url = app.conf.broker_url
+    return url
+
+
+def backend_from_env():
+    """
+    JULIA_RESPONSE_CACHE_BACKEND selects the backend:
+        "local" (default): per-process TTL cache with LRU eviction beyond JULIA_RESPONSE_CACHE_MAXSIZE entries
+        "redis": shared by all processes (the Celery broker's Redis, or JULIA_RESPONSE_CACHE_REDIS_URL)
+        "none": no caching
+    """
+    backend = os.environ.get("JULIA_RESPONSE_CACHE_BACKEND", "local").lower()
+    ttl_seconds = int(os.environ.get("JULIA_RESPONSE_CACHE_TTL_SECONDS", 24 * 3600))
+    if backend == "none":
+        return None
+    if backend == "redis":
+        return RedisBackend(redis_url_from_env(), ttl_seconds)
+    return LocalBackend(int(os.environ.get("JULIA_RESPONSE_CACHE_MAXSIZE", 1024)), ttl_seconds)
+
+
+class JuliaResponseCache(object):
+
+    def __init__(self, backend=None, client=julia_client):
+        """
+        :param backend: LocalBackend, RedisBackend, or None to disable caching
+        :param client: JuliaClient used on cache misses
+        """
+        self.backend = backend
+        self.client = client
+
+    @staticmethod
+    def key(endpoint, inputs):
+        normalized = json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=str)
+        return KEY_PREFIX + endpoint + ":" + hashlib.sha256(normalized.encode()).hexdigest()
+
+    def get(self, endpoint, json=None):
+        """
+        GET the Julia API endpoint with the json inputs, or return the cached response for the same inputs.
+        Errors in the cache backend are logged and fall through to the Julia API.
+        :return: requests.Response or CachedResponse
+        """
+        if self.backend is None:
+            return self.client.get(endpoint, json=json)
+        key = self.key(endpoint, json)
+        try:
+            payload = self.backend.get(key)
+            if payload is not None:
+                self.backend.count(endpoint, "hits")
+                return CachedResponse(payload)
+            self.backend.count(endpoint, "misses")
+        except Exception as e:
+            log.warning("Julia response cache unavailable: {}".format(e))
+            return self.client.get(endpoint, json=json)
+
+        response = self.client.get(endpoint, json=json)
+        if response.status_code == 200:
+            try:
+                self.backend.set(key, response.json())
+            except Exception as e:
+                log.warning("Could not cache Julia response for {}: {}".format(endpoint, e))
+        return response
+
+    def stats(self):
+        if self.backend is None:
+            return {"backend": "none"}
+        return dict(backend=self.backend.name, **self.backend.stats())
+
+
+julia_response_cache = JuliaResponseCache(backend_from_env())
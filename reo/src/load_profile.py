@@ -1,12 +1,12 @@
 # REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
 import os
-import copy
 import math
-import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 from collections import namedtuple
 from reo.utilities import degradation_factor, get_climate_zone_and_nearest_city
+from reo.src.load_profile_store import profile_store
+from reo.src.calendar_index import step_calendar
+from functools import lru_cache
 import logging
 from reo.exceptions import LoadProfileError
 log = logging.getLogger(__name__)
@@ -330,8 +330,8 @@ def bau_outage_check(critical_loads_kw, existing_pv_kw_list, gen_existing_kw, ge
                      fuel_gal, fuel_slope, fuel_intercept, time_steps_per_hour):
     """
     Determine if existing generator and/or PV can meet critical load and for how long
-    :param critical_loads_kw: list of float, length same as outage
-    :param existing_pv_kw_list:  list of float, length same as outage, existing pv production
+    :param critical_loads_kw: list or np.ndarray of float, length same as outage
+    :param existing_pv_kw_list:  list or np.ndarray of float, length same as outage, existing pv production
     :param gen_existing_kw: float, generator capacity
     :param gen_min_turn_down: float zero to one
     :param fuel_gal: float, gallons of fuel available
@@ -344,36 +344,64 @@ def bau_outage_check(critical_loads_kw, existing_pv_kw_list, gen_existing_kw, ge
     """
 
     generator_fuel_use_gal = 0.0 
+    no_existing_pv = existing_pv_kw_list is None or len(existing_pv_kw_list) == 0
 
-    if gen_existing_kw == 0 and existing_pv_kw_list in [None, []]:
+    if gen_existing_kw == 0 and no_existing_pv:
         return False, 0, generator_fuel_use_gal
 
-    elif gen_existing_kw > 0:
-        if existing_pv_kw_list in [None, []]:
-            existing_pv_kw_list = [0] * len(critical_loads_kw)
-
-        for i, (load, pv) in enumerate(zip(critical_loads_kw, existing_pv_kw_list)):
-            unmet = load - pv
-            if unmet > 0:
+    unmet = np.asarray(critical_loads_kw, dtype=float)
+    if not no_existing_pv:
+        n_steps = min(len(unmet), len(existing_pv_kw_list))
+        unmet = unmet[:n_steps] - np.asarray(existing_pv_kw_list[:n_steps], dtype=float)
+    running = unmet > 0
+
+    if gen_existing_kw > 0:
+        gen_step_kwh = gen_existing_kw * (1.0 / time_steps_per_hour)
+        # generator output and fuel use while the fuel does not limit the output
+        gen_output = np.maximum(np.minimum(unmet, gen_step_kwh), gen_min_turn_down * gen_existing_kw) # output = the greater of either the unmet load or available generation based on fuel and the min loading 
+        fuel_needed = np.where(running, fuel_intercept + fuel_slope * gen_output, 0.0)
+        fuel_left_gal = np.cumsum(np.concatenate(([fuel_gal], -fuel_needed)))  # before each time step
+        fuel_used_gal = np.cumsum(fuel_needed)  # after each time step
+        if fuel_slope == 0:
+            stops = [0]  # the fuel needed does not depend on the output, take the time steps one at a time
+        else:
+            fuel_limited = running & ((fuel_left_gal[:-1] - fuel_intercept) / fuel_slope < gen_step_kwh)
+            stops = np.flatnonzero(fuel_limited | (running & (gen_output < unmet)))
+        if len(stops) == 0:
+            return True, len(critical_loads_kw), float(fuel_used_gal[-1]) if len(fuel_used_gal) else 0.0
+        i = int(stops[0])
+        if fuel_slope != 0 and not fuel_limited[i]:
+            return False, i, float(fuel_used_gal[i])  # the generator cannot meet the full load
+
+        # from time step i the fuel left limits the generator output
+        fuel_gal = float(fuel_left_gal[i])
+        generator_fuel_use_gal = float(fuel_used_gal[i - 1]) if i > 0 else 0.0
+        for i, unmet_kw in enumerate(unmet[i:].tolist(), start=i):
+            if unmet_kw > 0:
                 fuel_kwh = (fuel_gal - fuel_intercept) / fuel_slope
-                gen_avail = min(fuel_kwh, gen_existing_kw * (1.0 / time_steps_per_hour))
-                gen_output = max(min(unmet, gen_avail), gen_min_turn_down * gen_existing_kw) # output = the greater of either the unmet load or available generation based on fuel and the min loading 
+                gen_avail = min(fuel_kwh, gen_step_kwh)
+                gen_output = max(min(unmet_kw, gen_avail), gen_min_turn_down * gen_existing_kw)
                 fuel_needed = fuel_intercept + fuel_slope * gen_output
                 fuel_gal -= fuel_needed
                 generator_fuel_use_gal += fuel_needed # previous logic: max(min(fuel_needed,fuel_gal), 0) 
 
-                if gen_output < unmet: # if the generator cannot meet the full load, still assume it runs during the outage
+                if gen_output < unmet_kw: # if the generator cannot meet the full load, still assume it runs during the outage
                     return False, i, generator_fuel_use_gal 
 
     else:  # gen_existing_kw = 0 and PV_existing_kw > 0
-        for i, (load, pv) in enumerate(zip(critical_loads_kw, existing_pv_kw_list)):
-            unmet = load - pv
-            if unmet > 0:
-                return False, i, generator_fuel_use_gal
+        unmet_steps = np.flatnonzero(running)
+        if len(unmet_steps) > 0:
+            return False, int(unmet_steps[0]), generator_fuel_use_gal
 
     return True, len(critical_loads_kw), generator_fuel_use_gal
 
 
+@lru_cache(maxsize=None)
+def load_space_heating_fraction_flat_load():
+    with open(os.path.join(library_path_base, 'space_heating_fraction_flat_load.json'), 'rb') as f:
+        return json.load(f)
+
+
 class BuiltInProfile(object):
 
     Default_city = namedtuple("Default_city", "name lat lng tmyid zoneid")
@@ -451,9 +479,9 @@ class BuiltInProfile(object):
     def built_in_profile(self):
         if self.monthly_energy in [None, []]:
             if self.doe_reference_name in ['FlatLoad'] + self.flatload_alternate_options:
-                return [ld * self.annual_energy * self.heating_fraction[0] for ld in self.custom_normalized_flatload]            
+                return (np.array(self.custom_normalized_flatload) * self.annual_energy * self.heating_fraction[0]).tolist()
             else:
-                return [ld * self.annual_energy for ld in self.normalized_profile]
+                return (self.normalized_profile_array * self.annual_energy).tolist()
         return self.monthly_scaled_profile
 
     @property
@@ -484,91 +512,62 @@ class BuiltInProfile(object):
 
     @property
     def custom_normalized_flatload(self):
-        # built in profiles are assumed to be hourly
-        periods = 8760
-        # get datetimes of all hours 
-        series = pd.date_range(start=datetime(self.year, 1, 1, 0), end=datetime(self.year, 12, 31, 23), freq='h')
+        # built in profiles are assumed to be hourly (the last day of a leap year is clipped)
+        cal = step_calendar(self.year)
 
-        # clip last day if a leap year
-        series = series[:periods]
-        
         # create boolean masks for weekday and hour of day filters
         if self.doe_reference_name in ['FlatLoad_24_5','FlatLoad_16_5','FlatLoad_8_5']:
-            weekends = [5,6]
-            weekday_mask = [i.weekday() not in weekends for i in series]
+            weekday_mask = cal.is_weekday
         else:
-            weekday_mask = [True for i in series]
+            weekday_mask = np.full(len(cal.hour), True)
         if self.doe_reference_name in ['FlatLoad_16_5','FlatLoad_16_7']:
-            hour_range = range(6,22)
-            hour_mask = [i.hour in hour_range for i in series]
+            hour_mask = (cal.hour >= 6) & (cal.hour < 22)
         elif self.doe_reference_name in ['FlatLoad_8_5','FlatLoad_8_7']:
-            hour_range = range(9,17)
-            hour_mask = [i.hour in hour_range for i in series]
+            hour_mask = (cal.hour >= 9) & (cal.hour < 17)
         else:
-            hour_mask = [True for i in series]
+            hour_mask = np.full(len(cal.hour), True)
         # combine masks to a series where 1 is on and 0 is off
-        series_binary = [int(i) for i in (np.array(weekday_mask) & np.array(hour_mask))]
+        series_binary = (weekday_mask & hour_mask).astype(int)
         # convert combined masks to a normalized profile
-        sum_series_binary = sum(series_binary)
-        normalized_profile = [i/sum_series_binary for i in series_binary]
+        normalized_profile = (series_binary / series_binary.sum()).tolist()
         return normalized_profile
 
     @property
     def monthly_scaled_profile(self):
 
-        load_profile = []
-
-        datetime_current = datetime(self.year, 1, 1, 0)
-        month_total = 0
-        month_scale_factor = []
-
         if self.doe_reference_name in ['FlatLoad'] + self.flatload_alternate_options:
-            normalized_profile = self.custom_normalized_flatload
+            normalized_profile = np.array(self.custom_normalized_flatload)
         else:
-            normalized_profile = self.normalized_profile
-        
-        for load in normalized_profile:
-            month = datetime_current.month
-            # Monthly total based on annual_energy (sum of monthly_energy) and the normalized profile, later used to scale actual monthly energy
-            month_total += self.annual_energy * load
-
-            # add an hour
-            datetime_current = datetime_current + timedelta(0, 0, 0, 0, 0, 1, 0)
-
-            if month != datetime_current.month:
-                if month_total == 0:
-                    month_scale_factor.append(0)
-                else:
-                    month_scale_factor.append(float(self.monthly_energy[month - 1] / month_total * self.heating_fraction[month - 1]))
-                month_total = 0
-
-        datetime_current = datetime(self.year, 1, 1, 0)
+            normalized_profile = self.normalized_profile_array
 
-        for load in normalized_profile:
-            month = datetime_current.month
+        # month index (0-11) of each hour
+        months = step_calendar(self.year).month - 1
 
-            load_profile.append(self.annual_energy * load * month_scale_factor[month - 1])
+        # Monthly total based on annual_energy (sum of monthly_energy) and the normalized profile, later used to scale actual monthly energy
+        month_total = np.bincount(months, weights=self.annual_energy * normalized_profile, minlength=12)
+        monthly_energy = np.array(self.monthly_energy[:12], dtype=float)
+        heating_fraction = np.array(self.heating_fraction[:12], dtype=float)
+        month_scale_factor = np.zeros(12)
+        nonzero = month_total != 0
+        month_scale_factor[nonzero] = monthly_energy[nonzero] / month_total[nonzero] * heating_fraction[nonzero]
 
-            # add an hour
-            datetime_current = datetime_current + timedelta(0, 0, 0, 0, 0, 1, 0)
+        return (self.annual_energy * normalized_profile * month_scale_factor[months]).tolist()
 
-        return load_profile
+    @property
+    def normalized_profile_array(self):
+        """
+        :return: read-only np.ndarray view of the normalized profile in the packed profile store
+        """
+        return profile_store(self.load_type).profile(self.city, self.building_type)
 
     @property
     def normalized_profile(self):
-        profile_path = os.path.join(self.library_path,
-                                    self.builtin_profile_prefix + self.city + "_" + self.building_type + ".dat")
-        normalized_profile = list()
-        f = open(profile_path, 'r')
-        for line in f:
-            normalized_profile.append(float(line.strip('\n')))
-
-        return normalized_profile
+        return self.normalized_profile_array.tolist()
 
     @property
     def heating_fraction(self):
         if self.load_type == "SpaceHeating":
-            space_heating_fraction_flat_load = json.load(open(os.path.join(library_path_base, 'space_heating_fraction_flat_load.json'), 'rb'))
+            space_heating_fraction_flat_load = load_space_heating_fraction_flat_load()
             if self.user_entered_space_heating_fraction in [None, []]:
                 heating_fraction = [space_heating_fraction_flat_load[self.city] for _ in range(12)]
             elif len(self.user_entered_space_heating_fraction) == 1:
@@ -576,7 +575,7 @@ class BuiltInProfile(object):
             else:
                 heating_fraction = self.user_entered_space_heating_fraction
         elif self.load_type == "DHW":
-            space_heating_fraction_flat_load = json.load(open(os.path.join(library_path_base, 'space_heating_fraction_flat_load.json'), 'rb'))
+            space_heating_fraction_flat_load = load_space_heating_fraction_flat_load()
             if self.user_entered_space_heating_fraction in [None, []]:
                 heating_fraction = [1.0 - space_heating_fraction_flat_load[self.city] for _ in range(12)]
             elif len(self.user_entered_space_heating_fraction) == 1:
@@ -622,9 +621,7 @@ class LoadProfile(BuiltInProfile):
         self.sr_required_pct = kwargs.get("sr_required_pct")
 
         if user_profile:
-            self.load_list = user_profile
-            self.unmodified_load_list = copy.copy(self.load_list)
-            self.bau_load_list = copy.copy(self.load_list)
+            unmodified_loads = np.array(user_profile, dtype=float)
 
         else:  # building type and (annual_kwh OR monthly_totals_energy) defined by user
             if len(doe_reference_name_list) == 0:
@@ -643,38 +640,32 @@ class LoadProfile(BuiltInProfile):
                     if len(doe_reference_name_list[i])>1:
                         kwargs['monthly_totals_energy'] = kwargs.get('monthly_totals_kwh')
                     super(LoadProfile, self).__init__(**kwargs)
-                    if self.time_steps_per_hour > 1:
-                        load_list = [val for val in self.built_in_profile for _ in range(self.time_steps_per_hour)]
-                    else:
-                        load_list = self.built_in_profile 
-                    combine_loadlist.append(load_list)
-
-                # In the case where the user supplies a list of doe_reference_names and percent shares
-                # for consistency we want to act as if we had scaled the partial load to the total site 
-                # load which was unknown at the start of the loop above. This scalar makes it such that
-                # when the percent shares are later applied that the total site load will be the sum
-                # of the default annual loads for this location
-                if (len(doe_reference_name_list) > 1) and self.annual_kwh is None:
-                    total_site_load = sum([sum(l) for l in combine_loadlist])
-                    for i, load in enumerate(combine_loadlist):
-                        actual_percent_of_site_load = sum(load)/total_site_load
-                        scalar = 1.0 / actual_percent_of_site_load
-                        combine_loadlist[i] = list(np.array(load)* scalar)
-                
-                # Apply the percent share of annual load to each partial load
+                    combine_loadlist.append(np.repeat(self.built_in_profile, self.time_steps_per_hour))
+                combine_loads = np.vstack(combine_loadlist)
+
                 if (len(doe_reference_name_list) > 1):
-                    for i,load in enumerate(combine_loadlist):
-                        combine_loadlist[i] = (np.array(load) * (kwargs.get("percent_share")[i]/100.0)).tolist()
-                
-                # Aggregate total hybrid load
-                self.unmodified_load_list = (np.sum(np.array(combine_loadlist), axis=0)).tolist()
+                    # Apply the percent share of annual load to each partial load
+                    weights = np.array(kwargs.get("percent_share"), dtype=float) / 100.0
+                    # In the case where the user supplies a list of doe_reference_names and percent shares
+                    # for consistency we want to act as if we had scaled the partial load to the total site
+                    # load which was unknown at the start of the loop above. This scalar makes it such that
+                    # when the percent shares are later applied that the total site load will be the sum
+                    # of the default annual loads for this location
+                    if self.annual_kwh is None:
+                        partial_annual_loads = combine_loads.sum(axis=1)
+                        weights *= partial_annual_loads.sum() / partial_annual_loads
+                    # Aggregate total hybrid load as the weighted sum of the partial loads
+                    unmodified_loads = weights.dot(combine_loads)
+                else:
+                    unmodified_loads = combine_loads[0]
 
+        # the series are np.ndarrays until they are saved as lists at the end
         if loads_kw_is_net:
-            self.load_list, existing_pv_kw_list = self._account_for_existing_pv(pvs, analysis_years)
+            loads, existing_pv_kw = self._account_for_existing_pv(pvs, analysis_years, unmodified_loads)
         else:
-            self.load_list = copy.copy(self.unmodified_load_list)
-            existing_pv_kw_list = None
-        self.bau_load_list = copy.copy(self.load_list)
+            loads = unmodified_loads.copy()
+            existing_pv_kw = None
+        bau_loads = loads.copy()
         """
         Account for outage in load_list (loads_kw).
             1. if user provides critical_loads_kw then splice it into load_list during outage.
@@ -687,20 +678,20 @@ class LoadProfile(BuiltInProfile):
 
         if outage_with_user_crit_load:
 
-            if existing_pv_kw_list is not None and critical_loads_kw_is_net:
+            critical_loads = np.array(critical_loads_kw, dtype=float)
+            if existing_pv_kw is not None and critical_loads_kw_is_net:
                 # Add existing pv in if net critical load provided
-                for i, p in enumerate(existing_pv_kw_list):
-                    critical_loads_kw[i] += p
-            if existing_pv_kw_list is not None:
-                existing_pv_kw_list = existing_pv_kw_list[outage_start_time_step - 1:outage_end_time_step]
+                critical_loads[:len(existing_pv_kw)] += existing_pv_kw
+            if existing_pv_kw is not None:
+                existing_pv_kw = existing_pv_kw[outage_start_time_step - 1:outage_end_time_step]
 
         elif outage_with_crit_load_pct:  # use native_load * critical_load_pct
 
-            if existing_pv_kw_list not in [None, []]:
-                existing_pv_kw_list = existing_pv_kw_list[outage_start_time_step - 1:outage_end_time_step]
+            if existing_pv_kw is not None:
+                existing_pv_kw = existing_pv_kw[outage_start_time_step - 1:outage_end_time_step]
                 
-            critical_loads_kw = [ld * critical_load_pct for ld in self.load_list]
-            # Note: existing PV accounted for in load_list
+            critical_loads = loads * critical_load_pct
+            # Note: existing PV accounted for in loads
 
         elif critical_loads_kw not in [None, []]:
             """
@@ -708,35 +699,39 @@ class LoadProfile(BuiltInProfile):
              financial run needs to pick up on the same critical load series for apple-to-apple comparison in the
              outage-simulation stage. (This is a web app specific use-case)
             """
+            critical_loads = np.array(critical_loads_kw, dtype=float)
             resilience_check_flag = True
             generator_fuel_use_gal = 0
             bau_sustained_time_steps = 0 # no outage
 
         else:  # missing outage_start_time_step, outage_end_time_step, or critical_load_kw => no specified outage
-            critical_loads_kw = [critical_load_pct * ld for ld in self.unmodified_load_list]
+            critical_loads = critical_load_pct * unmodified_loads
             resilience_check_flag = True
             generator_fuel_use_gal = 0 
             bau_sustained_time_steps = 0  # no outage
 
         if outage_with_crit_load_pct or outage_with_user_crit_load:
 
-            # splice critical loads in to load_list (used in optimal case)
-            self.load_list[outage_start_time_step - 1:outage_end_time_step] = \
-                critical_loads_kw[outage_start_time_step - 1:outage_end_time_step]
+            outage = slice(outage_start_time_step - 1, outage_end_time_step)
+            # splice critical loads in to loads (used in optimal case)
+            loads[outage] = critical_loads[outage]
 
             # replace bau load with zeros during outage
-            self.bau_load_list[outage_start_time_step - 1:outage_end_time_step] = \
-                [0.0 for _ in critical_loads_kw[outage_start_time_step - 1:outage_end_time_step]]
+            bau_loads[outage] = 0.0
 
             resilience_check_flag, bau_sustained_time_steps, generator_fuel_use_gal = \
-                bau_outage_check(critical_loads_kw[outage_start_time_step - 1:outage_end_time_step],
-                                    existing_pv_kw_list, gen_existing_kw, gen_min_turn_down,
+                bau_outage_check(critical_loads[outage],
+                                    existing_pv_kw, gen_existing_kw, gen_min_turn_down,
                                     fuel_avail_before_outage, fuel_slope, fuel_intercept,
                                     self.time_steps_per_hour)
 
             if bau_sustained_time_steps > 0:  # include critical load in bau load for the time that it can be met
-                self.bau_load_list[outage_start_time_step - 1:outage_start_time_step + bau_sustained_time_steps - 1] = \
-                    critical_loads_kw[outage_start_time_step - 1:outage_start_time_step + bau_sustained_time_steps - 1]
+                bau_loads[outage_start_time_step - 1:outage_start_time_step + bau_sustained_time_steps - 1] = \
+                    critical_loads[outage_start_time_step - 1:outage_start_time_step + bau_sustained_time_steps - 1]
+
+        self.unmodified_load_list = unmodified_loads.tolist()
+        self.load_list = loads.tolist()
+        self.bau_load_list = bau_loads.tolist()
 
         # resilience_check_flag: True if existing diesel and/or PV can sustain critical load during outage
         self.outage_start_time_step = outage_start_time_step
@@ -750,14 +745,18 @@ class LoadProfile(BuiltInProfile):
         self.bau_annual_kwh = int(round(sum(self.bau_load_list),0))
         self.loads_kw_is_net = loads_kw_is_net
         self.critical_loads_kw_is_net = critical_loads_kw_is_net
-        self.critical_load_series_kw = critical_loads_kw
+        self.critical_load_series_kw = critical_loads.tolist()
 
         if dfm is not None:
             dfm.add_load(self)
 
-    def _account_for_existing_pv(self, pvs, years):
-        # account for existing PV in load profile if loads_kw_is_net
-        existing_pv_kw_list = None
+    def _account_for_existing_pv(self, pvs, years, unmodified_loads):
+        """
+        Account for existing PV in load profile if loads_kw_is_net
+        :param unmodified_loads: np.ndarray of the net load
+        :return: np.ndarray of the native load, np.ndarray of the existing PV production or None if there is none
+        """
+        existing_pv_kw = None
         for pv in pvs:  # get all of the existing production
             if pv is not None:
                 if pv.existing_kw > 0:
@@ -769,15 +768,14 @@ class LoadProfile(BuiltInProfile):
                     multiplying the pv.prod_factor by the levelization_factor we are modeling the average pv production.
                     """
                     levelization_factor = round(degradation_factor(years, pv.degradation_pct), 5)
-                    # for first PV just override the existing_pv_kw_list, otherwise add to existing production
-                    new_existing_pv_kw_list = [pv.existing_kw * x * levelization_factor for x in pv.prod_factor]
-                    if existing_pv_kw_list is None:
-                        existing_pv_kw_list = new_existing_pv_kw_list
+                    # for first PV just override the existing_pv_kw, otherwise add to existing production
+                    new_existing_pv_kw = pv.existing_kw * np.asarray(pv.prod_factor, dtype=float) * levelization_factor
+                    if existing_pv_kw is None:
+                        existing_pv_kw = new_existing_pv_kw
                     else:
-                        existing_pv_kw_list = [i + j for i, j in zip(new_existing_pv_kw_list, existing_pv_kw_list)]
-        if existing_pv_kw_list is not None:
+                        existing_pv_kw = new_existing_pv_kw + existing_pv_kw
+        if existing_pv_kw is not None:
             # add existing pv to load profile to create native load from net load
-            native_load = [i + j for i, j in zip(self.unmodified_load_list, existing_pv_kw_list)]
-            return native_load, existing_pv_kw_list
-        return copy.copy(self.unmodified_load_list), existing_pv_kw_list
+            return unmodified_loads + existing_pv_kw, existing_pv_kw
+        return unmodified_loads.copy(), existing_pv_kw
 
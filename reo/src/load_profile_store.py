@@ -0,0 +1,115 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+"""
+Packed float64 stores (profiles.npy and profiles_index.json) of the built-in DoE Commercial Reference Building load
+profiles of each load type, built with the image by bin/build-data-stores and memory-mapped once per process.
+"""
+import json
+import logging
+import os
+from functools import lru_cache
+import numpy as np
+log = logging.getLogger(__name__)
+
+LIBRARY_PATH = os.path.join('input_files', 'LoadProfiles')
+STORE_FILENAME = 'profiles.npy'
+INDEX_FILENAME = 'profiles_index.json'
+PROFILE_FILE_MARKER = '8760_norm_'  # e.g. Load8760_norm_Miami_Hospital.dat
+
+
+def profile_key(city, building):
+    return city + "_" + building
+
+
+def _profile_files(directory):
+    """
+    :return: dict of profile_key to .dat file name
+    """
+    files = dict()
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.dat') and PROFILE_FILE_MARKER in filename:
+            files[filename.split(PROFILE_FILE_MARKER, 1)[1][:-len('.dat')]] = filename
+    return files
+
+
+def _store_is_current(directory, files):
+    store_path = os.path.join(directory, STORE_FILENAME)
+    index_path = os.path.join(directory, INDEX_FILENAME)
+    if not (os.path.isfile(store_path) and os.path.isfile(index_path)):
+        return False
+    with open(index_path, 'r') as f:
+        if sorted(json.load(f)) != sorted(files):
+            return False
+    store_mtime = min(os.path.getmtime(store_path), os.path.getmtime(index_path))
+    return all(os.path.getmtime(os.path.join(directory, filename)) <= store_mtime for filename in files.values())
+
+
+def build_store(directory):
+    """
+    Pack the .dat profiles in directory into STORE_FILENAME and INDEX_FILENAME.
+    """
+    files = _profile_files(directory)
+    index = {key: row for row, key in enumerate(files)}
+    profiles = np.vstack([np.loadtxt(os.path.join(directory, filename), dtype='float64')
+                          for filename in files.values()])
+    # write to temporary files and rename so that a process never reads a partial store
+    tmp_suffix = '.{}.tmp'.format(os.getpid())
+    with open(os.path.join(directory, STORE_FILENAME + tmp_suffix), 'wb') as f:
+        np.save(f, profiles)
+    with open(os.path.join(directory, INDEX_FILENAME + tmp_suffix), 'w') as f:
+        json.dump(index, f)
+    os.replace(os.path.join(directory, STORE_FILENAME + tmp_suffix), os.path.join(directory, STORE_FILENAME))
+    os.replace(os.path.join(directory, INDEX_FILENAME + tmp_suffix), os.path.join(directory, INDEX_FILENAME))
+
+
+def build_stores():
+    for load_type in sorted(os.listdir(LIBRARY_PATH)):
+        directory = os.path.join(LIBRARY_PATH, load_type)
+        if os.path.isdir(directory) and _profile_files(directory):
+            build_store(directory)
+
+
+class ProfileStore(object):
+
+    def __init__(self, directory):
+        """
+        :param directory: str, folder with the .dat profiles of one load type
+        """
+        self.directory = directory
+        self.files = _profile_files(directory)
+        if _store_is_current(directory, self.files):
+            with open(os.path.join(directory, INDEX_FILENAME), 'r') as f:
+                self.index = json.load(f)
+            self.profiles = np.load(os.path.join(directory, STORE_FILENAME), mmap_mode='r')
+        else:
+            log.warning("No current load profile store in {}, reading the .dat files. "
+                        "Build it with bin/build-data-stores.".format(directory))
+            self.index, self.profiles = None, None
+
+    def profile(self, city, building):
+        """
+        :return: read-only 1D np.ndarray, the normalized profile (fraction of annual energy in each hour)
+        """
+        key = profile_key(city, building)
+        if self.profiles is None:
+            if key not in self.files:
+                raise FileNotFoundError("No built-in load profile for {} in {}.".format(building, city))
+            profile = np.loadtxt(os.path.join(self.directory, self.files[key]), dtype='float64')
+            profile.setflags(write=False)
+            return profile
+        try:
+            return self.profiles[self.index[key]]
+        except KeyError:
+            raise FileNotFoundError("No built-in load profile for {} in {}.".format(building, city))
+
+
+@lru_cache(maxsize=None)
+def profile_store(load_type):
+    """
+    :param load_type: str, one of "Electric", "SpaceHeating", "DHW", "Cooling"
+    :return: ProfileStore, loaded once per process
+    """
+    return ProfileStore(os.path.join(LIBRARY_PATH, load_type))
+
+
+if __name__ == "__main__":
+    build_stores()
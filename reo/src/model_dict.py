@@ -0,0 +1,39 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+"""
+Copy of the fields of a Django model instance for the BaseModel.dict properties, which shares immutable values and only
+deep copies mutable ones.
+"""
+import copy
+import datetime
+import decimal
+import uuid
+
+IMMUTABLE_TYPES = {type(None), bool, int, float, complex, str, bytes, decimal.Decimal, uuid.UUID, datetime.date,
+                   datetime.datetime, datetime.time, datetime.timedelta}
+
+
+def register_immutable_type(cls) -> None:
+    """
+    Share values of cls in model_dict instead of copying them (eg. reoptjl.fields.Series)
+    """
+    IMMUTABLE_TYPES.add(cls)
+
+
+def copy_value(v):
+    """
+    :return: v if it is immutable, a shallow copy if v is a list of immutable values, otherwise a deep copy
+    """
+    if type(v) in IMMUTABLE_TYPES:
+        return v
+    if type(v) is list and IMMUTABLE_TYPES.issuperset(map(type, v)):
+        return v.copy()
+    return copy.deepcopy(v)
+
+
+def model_dict(obj, exclude_keys=()) -> dict:
+    """
+    :param obj: Django model instance
+    :param exclude_keys: attribute names to leave out, in addition to "_state"
+    :return: dict of the attributes in obj.__dict__ (the loaded field values), equal to a deep copy of obj.__dict__
+    """
+    return {k: copy_value(v) for k, v in obj.__dict__.items() if k != "_state" and k not in exclude_keys}
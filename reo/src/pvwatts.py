@@ -4,6 +4,7 @@ import json
 import keys
 import logging
 from reo.exceptions import PVWattsDownloadError
+from reo.src.pvwatts_cache import pvwatts_cache
 log = logging.getLogger(__name__)
 
 
@@ -103,15 +104,31 @@ class PVWatts:
         self.response = None
         self.response = self.data  # store response so don't hit API multiple times
 
+    @property
+    def params(self):
+        """
+        :return: dict of the PVWatts API query parameters, in the order of the url
+        """
+        return {
+            "api_key": self.key, "azimuth": self.azimuth, "system_capacity": self.system_capacity,
+            "losses": self.losses*100, "array_type": self.array_type, "module_type": self.module_type,
+            "timeframe": self.timeframe, "gcr": self.gcr, "dc_ac_ratio": self.dc_ac_ratio, "inv_eff": self.inv_eff*100,
+            "radius": int(self.radius), "dataset": self.dataset, "lat": self.latitude, "lon": self.longitude,
+            "tilt": self.tilt
+        }
+
     @property
     def url(self):
-        url = self.url_base + "?api_key=" + self.key + "&azimuth=" + str(self.azimuth) + \
-              "&system_capacity=" + str(self.system_capacity) + "&losses=" + str(self.losses*100) + \
-              "&array_type=" + str(self.array_type) + "&module_type=" + str(self.module_type) + \
-              "&timeframe=" + self.timeframe + "&gcr=" + str(self.gcr) +  "&dc_ac_ratio=" + str(self.dc_ac_ratio) + \
-              "&inv_eff=" + str(self.inv_eff*100) + "&radius=" + str(int(self.radius)) + "&dataset=" + self.dataset + \
-              "&lat=" + str(self.latitude) + "&lon=" + str(self.longitude) + "&tilt=" + str(self.tilt)
-        return url
+        return self.url_base + "?" + "&".join(k + "=" + str(v) for k, v in self.params.items())
+
+    def fetch(self):
+        """
+        Call the PVWatts API
+        :return: (status code, response dict)
+        """
+        resp = requests.get(self.url, verify=self.verify)
+        log.info("PVWatts API query successful.")
+        return resp.status_code, check_pvwatts_response_data(resp)
 
     @property
     def data(self):
@@ -122,10 +139,8 @@ class PVWatts:
                     if self.longitude < 67.0 or self.longitude > 81.5 or self.latitude < -43.8 or self.latitude > 38.0: 
                         self.dataset = 'intl'
                         self.radius = self.radius *2
-            resp = requests.get(self.url, verify=self.verify)
-            log.info("PVWatts API query successful.")
-            data = check_pvwatts_response_data(resp)
-            self.response = data
+            # repeated requests (eg. several PV arrays or nearby sites with the same parameters) are served from the cache
+            self.response = pvwatts_cache.get(self.url_base, self.params, self.fetch)
         return self.response
 
     @property
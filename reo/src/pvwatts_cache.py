@@ -0,0 +1,182 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+"""
+On-disk LRU cache of the successful PVWatts API responses used by reo.src.pvwatts.PVWatts, keyed on the URL and the key
+sorted parameters without the api_key. Concurrent requests for the same key in one process share one API call.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from reo.exceptions import PVWattsDownloadError
+log = logging.getLogger(__name__)
+
+UNCACHED_PARAMS = {"api_key"}
+
+
+class PVWattsCache(object):
+
+    def __init__(self, directory=None, maxsize=4096, ttl_seconds=30 * 24 * 3600, offline_directory=None):
+        """
+        :param directory: str, cache directory, or None to disable the cache
+        :param maxsize: int, number of responses to keep
+        :param ttl_seconds: float, age (since it was written) after which a cached response is fetched again
+        :param offline_directory: str, directory of recorded responses to use instead of the PVWatts API
+        """
+        self.directory = directory
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.offline_directory = offline_directory
+        self.counts = {"hits": 0, "misses": 0, "coalesced": 0}
+        self._in_flight = dict()  # key to Future of the response
+        self._n_files = None  # number of cached responses at the last evict, plus the writes since then
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url_base: str, params: dict) -> str:
+        normalized = json.dumps({k: v for k, v in params.items() if k not in UNCACHED_PARAMS}, sort_keys=True,
+                                separators=(",", ":"), default=str)
+        return hashlib.sha256((url_base + "?" + normalized).encode()).hexdigest()
+
+    def _count(self, outcome):
+        with self._lock:
+            self.counts[outcome] += 1
+
+    @staticmethod
+    def _read(path: str):
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def read(self, key: str):
+        """
+        :return: cached response dict for key, or None
+        """
+        if self.directory is None:
+            return None
+        path = os.path.join(self.directory, key + ".json")
+        try:
+            st = os.stat(path)
+            if time.time() - st.st_mtime > self.ttl_seconds:
+                return None
+            # the access time orders the least recently used responses, the modification time is the write time
+            os.utime(path, ns=(time.time_ns(), st.st_mtime_ns))
+        except OSError:
+            return None
+        return self._read(path)
+
+    def write(self, key: str, data: dict) -> None:
+        """
+        Save data under key (atomically, so that other processes never read a partial file) and evict the least
+        recently used responses once there are more than maxsize.
+        """
+        if self.directory is None:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, os.path.join(self.directory, key + ".json"))
+            with self._lock:
+                if self._n_files is not None:
+                    self._n_files += 1
+                full = self._n_files is None or self._n_files > self.maxsize
+            if full:
+                self.evict()
+        except OSError as e:  # the response is still returned, just not cached
+            log.warning("Could not cache PVWatts response: {}".format(e))
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used responses down to 90% of maxsize, so that the directory is scanned about once
+        every maxsize / 10 writes when the cache is full
+        """
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    try:
+                        entries.append((entry.stat().st_atime, entry.path))
+                    except OSError:
+                        pass  # removed by another process
+        n_keep = len(entries)
+        if len(entries) > self.maxsize:
+            n_keep = self.maxsize - self.maxsize // 10
+            entries.sort()
+            for _, path in entries[:len(entries) - n_keep]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        with self._lock:
+            self._n_files = n_keep
+
+    def get(self, url_base: str, params: dict, fetch):
+        """
+        :param url_base: str, PVWatts API URL without the query
+        :param params: dict of the query parameters
+        :param fetch: function that calls the PVWatts API and returns (status code, response dict)
+        :return: response dict, from the cache, the offline directory, or fetch
+        """
+        key = self.key(url_base, params)
+        data = self.read(key)
+        if data is not None:
+            self._count("hits")
+            return data
+        if self.offline_directory is not None:
+            data = self._read(os.path.join(self.offline_directory, key + ".json"))
+            if data is None:
+                raise PVWattsDownloadError(task="pvwatts.py", message="No recorded PVWatts response in {} for {}".format(
+                    self.offline_directory, params))
+            self._count("hits")
+            return data
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+        if not owner:
+            self._count("coalesced")
+            return future.result()
+
+        self._count("misses")
+        try:
+            status_code, data = fetch()
+            if status_code == 200 and not data.get("errors"):
+                self.write(key, data)
+            future.set_result(data)
+            return data
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+
+def cache_from_env():
+    """
+    PVWATTS_CACHE_DIR ("none" disables the cache), PVWATTS_CACHE_MAXSIZE files, PVWATTS_CACHE_TTL_SECONDS, and
+    PVWATTS_OFFLINE_DIR, a directory of recorded responses (eg. a copy of a cache directory) to use instead of the API
+    """
+    directory = os.environ.get("PVWATTS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "pvwatts_cache"))
+    return PVWattsCache(
+        directory=None if directory.lower() == "none" else directory,
+        maxsize=int(os.environ.get("PVWATTS_CACHE_MAXSIZE", 4096)),
+        ttl_seconds=float(os.environ.get("PVWATTS_CACHE_TTL_SECONDS", 30 * 24 * 3600)),
+        offline_directory=os.environ.get("PVWATTS_OFFLINE_DIR"),
+    )
+
+
+pvwatts_cache = cache_from_env()
@@ -2,15 +2,15 @@
 sample Python codes for EASIUR and APSCA
 """
 
-import csv
-import deepdish
+from functools import lru_cache
 import h5py
 import numpy as np
+import pandas as pd
 import pyproj
 import os
+from reo.src.emissions_data_store import easiur_store
 
 # print(f"This module uses the following packages")
-# print(f"deepdish: {deepdish.__version__}")
 # print(f"h5py    : {h5py.__version__}")
 # print(f"numpy   : {np.__version__}")
 # print(f"pyproj  : {pyproj.__version__}")
@@ -109,6 +109,9 @@ DATUM_WGS84 = pyproj.Proj("epsg:4326 +proj=longlat +ellps=WGS84 +datum=WGS84 +no
 def get_EASIUR2005(stack, pop_year=2005, income_year=2005, dollar_year=2010):
     """Returns EASIUR for a given `stack` height in a dict.
 
+    The maps are read from the memory-mapped stores in reo.src.emissions_data_store (read-only arrays when no
+    adjustment is applied). Use get_EASIUR2005_at to look up one location.
+
     Args:
         stack: area, p150, p300
         pop_year: population year
@@ -120,14 +123,10 @@ def get_EASIUR2005(stack, pop_year=2005, income_year=2005, dollar_year=2010):
         print("stack should be one of 'area', 'p150', 'p300'")
         return False
 
-    file_2005 = "sc_8.6MVSL_" + stack + "_pop2005.hdf5"
-
-    #ret_map = deepdish.io.load("data/EASIUR_Data/" + file_2005)
-    ret_map = deepdish.io.load(os.path.join(library_path, 'EASIUR_Data', file_2005))
+    ret_map = easiur_store(stack, "pop2005").maps()
 
     if pop_year != 2005:
-        filename = "sc_growth_rate_pop2005_pop2040_" + stack + ".hdf5"
-        map_rate = deepdish.io.load(os.path.join(library_path, 'EASIUR_Data', filename))
+        map_rate = easiur_store(stack, "growth_rate").maps()
 
         for k, v in map_rate.items():
             ret_map[k] = ret_map[k] * (v ** (pop_year - 2005))
@@ -153,6 +152,46 @@ def get_EASIUR2005(stack, pop_year=2005, income_year=2005, dollar_year=2010):
     return ret_map
 
 
+def get_EASIUR2005_at(stack, x, y, names, pop_year=2005, income_year=2005, dollar_year=2010):
+    """Returns EASIUR for a given `stack` height at one grid cell, in a dict.
+
+    Same values as get_EASIUR2005(stack, pop_year, income_year, dollar_year)[name][x, y], but only the cell (x, y) is
+    read and adjusted.
+
+    Args:
+        stack: area, p150, p300
+        x, y: zero based CAMx grid cell
+        names: EASIUR keys, eg. ["NOX_Annual", "SO2_Annual"]
+        pop_year: population year
+        income_year: income level (1990 to 2024)
+        dollar_year: dollar year (1980 to 2010)
+
+    Raises:
+        ValueError for an invalid stack or year, IndexError for a cell outside of the grid
+    """
+
+    if stack not in ["area", "p150", "p300"]:
+        raise ValueError("stack should be one of 'area', 'p150', 'p300'")
+    if income_year not in MorIncomeGrowthAdj:
+        raise ValueError("income year must be between 1990 to 2024")
+    if dollar_year not in GDP_deflator:
+        raise ValueError("Dollar year must be between 1980 to 2010")
+
+    values = dict()
+    for name in names:
+        v = easiur_store(stack, "pop2005").value(name, x, y)
+        if pop_year != 2005:
+            rate = np.array([easiur_store(stack, "growth_rate").value(name, x, y)])
+            # power of an array, which numpy may round differently than the power of a scalar, as in get_EASIUR2005
+            v = v * (rate ** (pop_year - 2005))[0]
+        if income_year != 2005:
+            v = v * (MorIncomeGrowthAdj[income_year] / MorIncomeGrowthAdj[2005])
+        if dollar_year != 2010:
+            v = v * (GDP_deflator[dollar_year] / GDP_deflator[2010])
+        values[name] = v
+    return values
+
+
 def get_pop_inc(year, min_age=30):
     """Returns population and incidence (or mortality) rate of `min_age` or older for a given `year`."""
 
@@ -171,36 +210,34 @@ def get_pop_inc(year, min_age=30):
 def get_pop_inc_raw(year, min_age=30):
     """Returns population and incidence (or mortality) rate of `min_age` or older for a given `year`.
 
-    Raw data (CSV files) were derived from BenMAP
+    Raw data (CSV files) were derived from BenMAP. Each file is parsed once per process.
     """
-
-#    with open("data/EASIUR_Data/PopInc/popinc" + str(year) + ".CSV", newline="") as f:
-    with open(os.path.join(library_path, 'EASIUR_Data/PopInc/popinc{}.CSV'.format(str(year))), newline="") as f:
-        
-        pop = np.zeros((148, 112))
-        inc = np.zeros((148, 112))
-        popinc_csv = csv.reader(f)
-        header = next(popinc_csv)
-
-        if "Col" in header[0]:  # Col has a strange char
-            header[0] = "Col"
-
-        xys = set()
-        for row in popinc_csv:
-            row_d = dict(zip(header, row))
-            if int(row_d["Start Age"]) == min_age:
-                x = int(row_d["Col"]) - 1
-                y = int(row_d["Row"]) - 1
-                if (x, y) in xys:
-                    # just to check
-                    print("Duplicate?", x, y)
-                xys.add((x, y))
-                p = float(row_d["Population"])
-                i = float(row_d["Baseline"])
-                # print float(row_d['Point Estimate'])/i, row_d['Percent of Baseline']
-                pop[x, y] = p
-                inc[x, y] = i / p
-        return pop, inc
+    pop, inc = _pop_inc_raw(int(year), min_age)
+    return pop.copy(), inc.copy()
+
+
+@lru_cache(maxsize=None)
+def _pop_inc_raw(year, min_age):
+    df = pd.read_csv(os.path.join(library_path, 'EASIUR_Data/PopInc/popinc{}.CSV'.format(str(year))))
+    if "Col" in df.columns[0]:  # Col has a strange char
+        df = df.rename(columns={df.columns[0]: "Col"})
+    df = df[df["Start Age"].astype(int) == min_age]
+    x = df["Col"].astype(int).values - 1
+    y = df["Row"].astype(int).values - 1
+    cells, counts = np.unique(np.stack([x, y], axis=1), axis=0, return_counts=True)
+    for (dup_x, dup_y) in cells[counts > 1]:
+        # just to check
+        print("Duplicate?", dup_x, dup_y)
+    p = df["Population"].astype(float).values
+    i = df["Baseline"].astype(float).values
+    if (p == 0).any():
+        raise ZeroDivisionError("Population of 0 in popinc{}.CSV".format(year))
+
+    pop = np.zeros((148, 112))
+    inc = np.zeros((148, 112))
+    pop[x, y] = p
+    inc[x, y] = i / p
+    return pop, inc
 
 
 def get_avg_plume(x, y, spec, stack="area", season="Q0"):
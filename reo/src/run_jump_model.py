@@ -8,6 +8,7 @@ from celery import shared_task, Task
 from reo.exceptions import REoptError, OptimizationTimeout, UnexpectedError, NotOptimal, REoptFailedToStartError
 from reo.models import ModelManager
 from reo.src.profiler import Profiler
+from reo.src.julia_client import julia_client
 from celery.utils.log import get_task_logger
 logger = get_task_logger(__name__)
 
@@ -60,8 +61,7 @@ def run_jump_model(dfm, data, bau=False):
     logger.info("Running {} JuMP model ...".format("BAU" if bau else ""))
     try:
         t_start = time.time()
-        julia_host = os.environ.get('JULIA_HOST', "julia")
-        response = requests.post("http://" + julia_host + ":8081/job/", json=reopt_inputs)
+        response = julia_client.post("job", json=reopt_inputs)
         results = response.json()
         if response.status_code == 500:
             raise REoptFailedToStartError(task=name, message=results["error"], run_uuid=run_uuid, user_uuid=user_uuid)
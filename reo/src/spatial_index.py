@@ -0,0 +1,65 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+"""
+Spatial indexes (STRtrees of prepared geometries) of the shapefiles in reo/src/data used for point lookups, read once
+per process.
+"""
+import os
+from functools import lru_cache
+import geopandas as gpd
+import pyproj
+from shapely.prepared import prep
+from shapely.strtree import STRtree
+
+DATA_PATH = os.path.join('reo', 'src', 'data')
+
+PROJ_102008 = "+proj=aea +lat_1=20 +lat_2=60 +lat_0=40 +lon_0=-96 +x_0=0 +y_0=0 +datum=NAD83 +units=m +no_defs"
+
+
+class ShapefileIndex(object):
+
+    def __init__(self, path, attribute):
+        """
+        :param path: str, path to the shapefile
+        :param attribute: str, column of the shapefile returned by the lookups
+        """
+        gdf = gpd.read_file(path)
+        self.geometries = list(gdf.geometry.values)
+        self.values = list(gdf[attribute].values)
+        self.prepared = [prep(geometry) for geometry in self.geometries]
+        self.tree = STRtree(self.geometries, items=range(len(self.geometries)))
+
+    def containing(self, point):
+        """
+        :param point: shapely Point in the shapefile's coordinate reference system
+        :return: attribute value of the first (in file order) geometry that intersects the point, or None
+        """
+        for i in sorted(self.tree.query_items(point)):
+            if self.prepared[i].intersects(point):
+                return self.values[i]
+        return None
+
+    def nearest(self, point):
+        """
+        :param point: shapely Point in the shapefile's coordinate reference system
+        :return: (attribute value, distance) of the geometry nearest to the point
+        """
+        i = self.tree.nearest_item(point)
+        return self.values[i], self.geometries[i].distance(point)
+
+
+@lru_cache(maxsize=None)
+def shapefile_index(filename, attribute):
+    """
+    :param filename: str, shapefile in reo/src/data
+    :param attribute: str, column of the shapefile returned by the lookups
+    :return: ShapefileIndex, built once per process
+    """
+    return ShapefileIndex(os.path.join(DATA_PATH, filename), attribute)
+
+
+@lru_cache(maxsize=None)
+def transformer_4326_to_102008():
+    """
+    Transformer from EPSG:4326 (latitude, longitude order) to the North America Albers Equal Area projection (ESRI:102008)
+    """
+    return pyproj.Transformer.from_crs("epsg:4326", PROJ_102008)
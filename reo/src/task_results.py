@@ -0,0 +1,173 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+"""
+Size and lifetime of the Celery task results in the django-db result backend (the django_celery_results tables): large
+results are stored in Redis by reference, consumed results are deleted, and expired rows are removed periodically.
+"""
+import json
+import logging
+import os
+import uuid
+from datetime import timedelta
+from celery import Task, shared_task
+from django.db import connection
+from django.db.models import Count, Min
+from django.utils import timezone
+from django_celery_results.models import GroupResult, TaskResult
+log = logging.getLogger(__name__)
+
+KEY_PREFIX = "reopt_task_result:"
+REF_KEY = "result_ref"
+
+
+def result_max_bytes() -> int:
+    """
+    Largest JSON return value stored in the result backend, REOPT_RESULT_MAX_BYTES (default 64 kB)
+    """
+    return int(os.environ.get("REOPT_RESULT_MAX_BYTES", 64 * 1024))
+
+
+def _redis():
+    import redis
+    url = os.environ.get("REOPT_RESULT_REDIS_URL")
+    if url is None:
+        from reopt_api.celery import app
+        url = app.conf.broker_url
+    return redis.Redis.from_url(url)
+
+
+def cap_result(value):
+    """
+    :param value: JSON serializable task return value
+    :return: value, or a {"result_ref": key} reference to value stored in Redis if its JSON is larger than
+        result_max_bytes(). If Redis is not available value is returned (and stored in the result backend as before).
+    """
+    payload = json.dumps(value)
+    if len(payload) <= result_max_bytes():
+        return value
+    key = KEY_PREFIX + str(uuid.uuid4())
+    try:
+        _redis().set(key, payload, ex=int(os.environ.get("REOPT_RESULT_TTL_SECONDS", 24 * 3600)))
+    except Exception as e:
+        log.warning("Could not store a task result of {} bytes in Redis, keeping it in the result backend: {}".format(
+            len(payload), e))
+        return value
+    return {REF_KEY: key}
+
+
+def resolve_result(value, delete=False):
+    """
+    :param value: task result, possibly a reference from cap_result
+    :param delete: bool, delete the referenced value from Redis (when no other consumer will read it)
+    :return: the task return value
+    """
+    if not (isinstance(value, dict) and set(value) == {REF_KEY}):
+        return value
+    r = _redis()
+    payload = r.get(value[REF_KEY])
+    if payload is None:
+        raise KeyError("Task result {} expired or was already deleted.".format(value[REF_KEY]))
+    if delete:
+        r.delete(value[REF_KEY])
+    return json.loads(payload)
+
+
+class CappedResultTask(Task):
+    """
+    Celery Task base class that stores large return values by reference (see cap_result)
+    """
+    def __call__(self, *args, **kwargs):
+        result = super().__call__(*args, **kwargs)
+        if self.request.called_directly:
+            return result
+        return cap_result(result)
+
+
+def _delete_in_batches(queryset, batch_size) -> int:
+    n_deleted = 0
+    while True:
+        ids = list(queryset.order_by("id").values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return n_deleted
+        n_deleted += queryset.model.objects.filter(id__in=ids).delete()[0]
+
+
+def _batch_size() -> int:
+    return int(os.environ.get("REOPT_TASK_RESULT_BATCH_SIZE", 1000))
+
+
+def forget_results(async_result) -> int:
+    """
+    Delete the result rows of async_result, its parents and their children (eg. all of the tasks of a chord, once the
+    chord result has been read).
+    :param async_result: celery.result.AsyncResult or GroupResult
+    :return: int, number of deleted rows
+    """
+    task_ids, group_ids = [], []
+    node = async_result
+    try:
+        while node is not None:
+            if hasattr(node, "results"):  # GroupResult
+                group_ids.append(node.id)
+                task_ids.extend(child.id for child in node.results)
+            else:
+                task_ids.append(node.id)
+            node = node.parent
+        batch_size = _batch_size()
+        n_deleted = 0
+        for i in range(0, len(task_ids), batch_size):
+            n_deleted += TaskResult.objects.filter(task_id__in=task_ids[i:i + batch_size]).delete()[0]
+        return n_deleted + GroupResult.objects.filter(group_id__in=group_ids).delete()[0]
+    except Exception as e:  # expire_task_results removes the rows later
+        log.warning("Could not delete the task results of {}: {}".format(async_result.id, e))
+        return 0
+
+
+def expire_task_results(max_age_days: float = None, batch_size: int = None) -> int:
+    """
+    Delete the TaskResult and GroupResult rows that are done for more than max_age_days, batch_size rows at a time so
+    that each transaction and lock stays short.
+    :param max_age_days: float, default REOPT_TASK_RESULT_MAX_AGE_DAYS
+    :param batch_size: int, default REOPT_TASK_RESULT_BATCH_SIZE
+    :return: int, number of deleted rows
+    """
+    if max_age_days is None:
+        max_age_days = float(os.environ.get("REOPT_TASK_RESULT_MAX_AGE_DAYS", 7))
+    cutoff = timezone.now() - timedelta(days=max_age_days)
+    batch_size = batch_size or _batch_size()
+    return (_delete_in_batches(TaskResult.objects.filter(date_done__lt=cutoff), batch_size) +
+            _delete_in_batches(GroupResult.objects.filter(date_done__lt=cutoff), batch_size))
+
+
+def _table_bytes(model):
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_total_relation_size(%s)", [model._meta.db_table])
+        return cursor.fetchone()[0]
+
+
+def task_result_stats() -> dict:
+    """
+    :return: dict of the number of TaskResult rows (in total and by status), the oldest date_done, and the size in bytes
+        of the result tables including indexes and TOAST (None if the database is not PostgreSQL)
+    """
+    by_status = dict(TaskResult.objects.values_list("status").annotate(n=Count("id")).order_by())
+    oldest = TaskResult.objects.aggregate(oldest=Min("date_done"))["oldest"]
+    return {
+        "task_results": sum(by_status.values()),
+        "task_results_by_status": by_status,
+        "oldest_task_result": oldest.isoformat() if oldest is not None else None,
+        "group_results": GroupResult.objects.count(),
+        "task_result_table_bytes": _table_bytes(TaskResult),
+        "group_result_table_bytes": _table_bytes(GroupResult),
+    }
+
+
+@shared_task(ignore_result=True)
+def expire_task_results_task():
+    """
+    Periodic cleanup of the result tables, every REOPT_TASK_RESULT_CLEANUP_SECONDS (see beat_schedule in
+    reopt_api/celery.py), which logs their size after the cleanup
+    """
+    n_deleted = expire_task_results()
+    log.info("Deleted {} expired task results. Result tables: {}".format(n_deleted, task_result_stats()))
@@ -2,6 +2,7 @@
 import calendar
 import numpy
 import logging
+from reo.src.calendar_index import day_calendar, step_calendar, month_start_steps
 log = logging.getLogger(__name__)
 
 cum_days_in_yr = numpy.cumsum(calendar.mdays)
@@ -302,53 +303,49 @@ class UrdbParse:
             self.reopt_args.energy_max_in_tiers.append(self.big_number)
             log.warning("Cannot handle max usage units of " + energy_tier_unit + "! Using average rate")
 
+        energy_ts_per_hour = int(len(current_rate.energyweekdayschedule[0])/24)
+        simulation_time_steps_per_rate_time_step = int(self.time_steps_per_hour / energy_ts_per_hour)
+        # energy period of each hour (rows) and rate time step in the hour (columns)
+        cal = step_calendar(self.year, leap_day=False)
+        months = cal.month[:, None] - 1
+        energy_ts = cal.hour[:, None] * energy_ts_per_hour + numpy.arange(energy_ts_per_hour)
+        periods = numpy.where(cal.is_weekday[:, None],
+                              numpy.asarray(current_rate.energyweekdayschedule).astype(int)[months, energy_ts],
+                              numpy.asarray(current_rate.energyweekendschedule).astype(int)[months, energy_ts])
+        used_periods = numpy.unique(periods).tolist()
+
+        if self.add_tou_energy_rates_to_urdb_rate:
+            hour_of_year = numpy.arange(8760)[:, None, None]  # len(self.custom_tou_energy_rates) == 8760
+            if len(self.custom_tou_energy_rates) == 35040:
+                hour_of_year = hour_of_year * 4 + numpy.arange(simulation_time_steps_per_rate_time_step)
+            custom_tou_energy_rates = numpy.asarray(self.custom_tou_energy_rates, dtype=float)[hour_of_year]
+
         for tier in range(0, self.reopt_args.energy_tiers_num):
-            hour_of_year = 0
-            for month in range(0, 12):
-                for day in range(0, self.days_in_month[month]):
-
-                    if calendar.weekday(self.year, month + 1, day + 1) < 5:
-                        is_weekday = True
-                    else:
-                        is_weekday = False
-
-                    energy_ts_per_hour = int(len(current_rate.energyweekdayschedule[0])/24)
-                    simulation_time_steps_per_rate_time_step = int(self.time_steps_per_hour / energy_ts_per_hour)
-                    for hour in range(0, 24):
-                        energy_ts = hour * energy_ts_per_hour
-                        for ts in range(energy_ts_per_hour):
-                            if is_weekday:
-                                period = int(current_rate.energyweekdayschedule[month][energy_ts])
-                            else:
-                                period = int(current_rate.energyweekendschedule[month][energy_ts])
-
-                            # workaround for cases where there are different numbers of tiers in periods
-                            n_tiers_in_period = len(current_rate.energyratestructure[period])
-
-                            if n_tiers_in_period == 1:
-                                tier_use = 0  # use the first and only tier in the period
-                            elif tier > n_tiers_in_period-1:  # 'tier' is indexed on zero
-                                tier_use = n_tiers_in_period-1  # use last tier in current period, which has less tiers than the maximum tiers for any period
-                            else:
-                                tier_use = tier
-
-                            if average_rates:
-                                rate = rate_average
-                            else:
-                                rate = float(current_rate.energyratestructure[period][tier_use].get('rate') or 0)
-
-                            adj = float(current_rate.energyratestructure[period][tier_use].get('adj') or 0)
-                            total_rate = rate + adj
-
-                            for step in range(0, simulation_time_steps_per_rate_time_step):
-                                if self.add_tou_energy_rates_to_urdb_rate:
-                                    idx = hour_of_year  # len(self.custom_tou_energy_rates) == 8760:
-                                    if len(self.custom_tou_energy_rates) == 35040:
-                                        idx = hour_of_year * 4 + step
-                                    total_rate = rate + adj + self.custom_tou_energy_rates[idx]
-                                self.energy_costs.append(total_rate)
-                            energy_ts += 1
-                        hour_of_year += 1
+            rates = numpy.zeros(n_periods)
+            adjs = numpy.zeros(n_periods)
+            for period in used_periods:
+                # workaround for cases where there are different numbers of tiers in periods
+                n_tiers_in_period = len(current_rate.energyratestructure[period])
+
+                if n_tiers_in_period == 1:
+                    tier_use = 0  # use the first and only tier in the period
+                elif tier > n_tiers_in_period-1:  # 'tier' is indexed on zero
+                    tier_use = n_tiers_in_period-1  # use last tier in current period, which has less tiers than the maximum tiers for any period
+                else:
+                    tier_use = tier
+
+                if average_rates:
+                    rates[period] = rate_average
+                else:
+                    rates[period] = float(current_rate.energyratestructure[period][tier_use].get('rate') or 0)
+
+                adjs[period] = float(current_rate.energyratestructure[period][tier_use].get('adj') or 0)
+
+            total_rates = (rates[periods] + adjs[periods])[:, :, None]
+            if self.add_tou_energy_rates_to_urdb_rate:
+                total_rates = total_rates + custom_tou_energy_rates
+            total_rates = numpy.broadcast_to(total_rates, periods.shape + (simulation_time_steps_per_rate_time_step,))
+            self.energy_costs.extend(total_rates.ravel().tolist())
 
     def prepare_techs_and_loads(self, techs):
 
@@ -597,16 +594,7 @@ class UrdbParse:
                 self.reopt_args.min_monthly_charge = current_rate.minmonthlycharge
 
     def get_hours_in_month(self, month):
-        hours = []
-        hours.append(0)
-        for m in range(12):
-            hours_previous = hours[m]
-            days_in_month = calendar.monthrange(self.year, m + 1)[1]
-            # no leap days allowed
-            if m == 1 and calendar.isleap(self.year):
-                days_in_month -= 1
-            hours.append(24 * days_in_month + hours_previous)
-
+        hours = month_start_steps(self.year, leap_day=False)  # no leap days allowed
         return range(hours[month], hours[month + 1])
 
     def get_demand_tou_steps(self, current_rate, month, period):
@@ -617,7 +605,6 @@ class UrdbParse:
         :param period: int (zero-indexed)
         :return: list of ints (indexed on 1)
         """
-        step_array = []
         start_step = 1
 
         demand_ts_per_hour = int(len(current_rate.demandweekdayschedule[0]) / 24)
@@ -627,21 +614,14 @@ class UrdbParse:
         if month > 0:
             start_step = (self.last_hour_in_month[month - 1]) * self.time_steps_per_hour + 1
 
-        step_of_year = start_step
-
-        for day in range(0, self.days_in_month[month]):
-            if calendar.weekday(self.year, month + 1, day + 1) < 5:
-                is_weekday = True
-            else:
-                is_weekday = False
-
-            for hour in range(0, 24):
-                for ts in range(demand_ts_per_hour):
-                    demand_ts = hour + ts
-                    for step in range(0, simulation_time_steps_per_rate_time_step): # this fails to loop if time_steps_per_hour < demand_ts_per_hour
-                        if is_weekday and current_rate.demandweekdayschedule[month][demand_ts] == period:
-                            step_array.append(step_of_year)
-                        elif not is_weekday and current_rate.demandweekendschedule[month][demand_ts] == period:
-                            step_array.append(step_of_year)
-                        step_of_year += 1
+        # days of the month (rows), hours (columns) and demand time steps in the hour
+        days = day_calendar(self.year, leap_day=False)
+        is_weekday = days.is_weekday[days.month == month + 1][:, None, None]
+        demand_ts = numpy.arange(24)[:, None] + numpy.arange(demand_ts_per_hour)
+        in_period = numpy.where(is_weekday,
+                                numpy.asarray(current_rate.demandweekdayschedule[month])[demand_ts] == period,
+                                numpy.asarray(current_rate.demandweekendschedule[month])[demand_ts] == period)
+        # this is empty if time_steps_per_hour < demand_ts_per_hour
+        in_period = numpy.repeat(in_period, simulation_time_steps_per_rate_time_step, axis=2).ravel()
+        step_array = (start_step + numpy.flatnonzero(in_period)).tolist()
         return step_array
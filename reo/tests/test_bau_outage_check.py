@@ -0,0 +1,39 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+import numpy as np
+from django.test import SimpleTestCase
+from reo.src.load_profile import bau_outage_check
+
+
+def bau_outage_check_steps(critical_loads_kw, existing_pv_kw_list, gen_existing_kw, gen_min_turn_down,
+                           fuel_gal, fuel_slope, fuel_intercept, time_steps_per_hour):
+    """ bau_outage_check with a generator, one time step at a time """
+    generator_fuel_use_gal = 0.0
+    for i, (load, pv) in enumerate(zip(critical_loads_kw, existing_pv_kw_list)):
+        unmet = load - pv
+        if unmet > 0:
+            fuel_kwh = (fuel_gal - fuel_intercept) / fuel_slope
+            gen_avail = min(fuel_kwh, gen_existing_kw * (1.0 / time_steps_per_hour))
+            gen_output = max(min(unmet, gen_avail), gen_min_turn_down * gen_existing_kw)
+            fuel_needed = fuel_intercept + fuel_slope * gen_output
+            fuel_gal -= fuel_needed
+            generator_fuel_use_gal += fuel_needed
+            if gen_output < unmet:
+                return False, i, generator_fuel_use_gal
+    return True, len(critical_loads_kw), generator_fuel_use_gal
+
+
+class TestBauOutageCheck(SimpleTestCase):
+
+    def test_matches_step_by_step(self):
+        rng = np.random.default_rng(42)
+        for fuel_gal in [0, 10, 100, 1000, 1e6]:
+            for time_steps_per_hour in [1, 4]:
+                critical_loads_kw = (rng.random(24 * 7 * time_steps_per_hour) * 100).tolist()
+                existing_pv_kw_list = (rng.random(len(critical_loads_kw)) * 60).tolist()
+                args = (critical_loads_kw, existing_pv_kw_list, 120, 0.3, fuel_gal, 0.068, 0.01, time_steps_per_hour)
+                self.assertEqual(bau_outage_check(*args), bau_outage_check_steps(*args))
+
+    def test_without_generator(self):
+        self.assertEqual(bau_outage_check([1, 2], None, 0, 0, 100, 0.07, 0, 1), (False, 0, 0.0))
+        self.assertEqual(bau_outage_check([1, 2, 3], [5, 5, 2], 0, 0, 100, 0.07, 0, 1), (False, 2, 0.0))
+        self.assertEqual(bau_outage_check([1, 2, 3], [5, 5, 5], 0, 0, 100, 0.07, 0, 1), (True, 3, 0.0))
@@ -0,0 +1,42 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+import calendar
+import datetime
+import numpy as np
+from django.test import SimpleTestCase
+from reo.src.calendar_index import day_calendar, step_calendar, month_start_steps
+from reo.utilities import generate_year_profile_hourly, get_weekday_weekend_total_hours_by_month
+
+
+class TestCalendarIndex(SimpleTestCase):
+
+    def test_days_match_calendar(self):
+        for year, leap_day in [(2017, True), (2020, True), (2020, False)]:
+            dates = [datetime.date(year, 1, 1) + datetime.timedelta(days=d) for d in range(366)]
+            if not leap_day:
+                dates = [d for d in dates if (d.month, d.day) != (2, 29)]
+            dates = dates[:365]
+            days = day_calendar(year, leap_day)
+            self.assertEqual(days.month.tolist(), [d.month for d in dates])
+            self.assertEqual(days.day_of_month.tolist(), [d.day for d in dates])
+            self.assertEqual(days.day_of_week.tolist(), [calendar.weekday(d.year, d.month, d.day) for d in dates])
+            self.assertEqual(days.is_weekday.tolist(), [d.weekday() < 5 for d in dates])
+
+    def test_steps(self):
+        cal = step_calendar(2020, 4)
+        self.assertEqual(len(cal.hour), 35040)
+        self.assertEqual(cal.hour[:8].tolist(), [0, 0, 0, 0, 1, 1, 1, 1])
+        self.assertEqual(cal.day_of_year[-1], 364)
+        self.assertEqual((cal.month[-1], cal.day_of_month[-1]), (12, 30))  # the last day of a leap year is removed
+        self.assertFalse(cal.month.flags.writeable)
+        self.assertIs(cal, step_calendar(2020, 4))
+        self.assertEqual(month_start_steps(2020, leap_day=False)[2], 59 * 24)
+        self.assertEqual(month_start_steps(2020)[-1], 8760)
+
+    def test_unavailability_profile(self):
+        periods = [{"month": 1, "start_week_of_month": 2, "start_day_of_week": 6, "start_hour": 1, "duration_hours": 48}]
+        profile, start_days, errors = generate_year_profile_hourly(2017, periods)
+        self.assertEqual(errors, [])
+        self.assertEqual(start_days, [7])  # Saturday of the second week of January 2017 (the first week is only Sunday)
+        self.assertEqual(np.flatnonzero(profile).tolist(), list(range(6 * 24, 8 * 24)))
+        hours = get_weekday_weekend_total_hours_by_month(2017, profile)
+        self.assertEqual(hours[1], {"weekends": 48, "weekdays": 0, "total": 48})
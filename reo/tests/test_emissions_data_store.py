@@ -0,0 +1,47 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+import os
+from unittest import mock
+import h5py
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from reo.src import emissions_data_store
+from reo.src.emissions_data_store import easiur_store, avert_store, EASIUR_PATH, LIBRARY_PATH
+from reo.src.pyeasiur import get_EASIUR2005, get_EASIUR2005_at
+
+
+class TestEmissionsDataStore(SimpleTestCase):
+
+    def test_easiur_maps_match_hdf5(self):
+        with h5py.File(os.path.join(EASIUR_PATH, "sc_8.6MVSL_p150_pop2005.hdf5"), 'r') as f:
+            expected = {k: f[k][()] for k in f.keys()}
+        maps = easiur_store("p150", "pop2005").maps()
+        self.assertEqual(set(maps), set(expected))
+        for k, v in expected.items():
+            np.testing.assert_array_equal(maps[k], v)
+        self.assertFalse(maps["NOX_Annual"].flags.writeable)
+        self.assertIs(easiur_store("p150", "pop2005"), easiur_store("p150", "pop2005"))
+
+    def test_easiur_point_lookup_matches_maps(self):
+        names = ["NOX_Annual", "SO2_Annual", "PEC_Annual"]
+        for pop_year in [2020, 2024]:
+            maps = get_EASIUR2005("area", pop_year=pop_year, income_year=pop_year, dollar_year=2005)
+            for x, y in [(0, 0), (60, 40), (147, 111)]:
+                values = get_EASIUR2005_at("area", x, y, names, pop_year=pop_year, income_year=pop_year,
+                                           dollar_year=2005)
+                self.assertEqual(values, {name: maps[name][x, y] for name in names})
+        with self.assertRaises(IndexError):
+            get_EASIUR2005_at("area", 148, 0, names)
+
+    def test_avert_series_match_csv(self):
+        df = pd.read_csv(os.path.join(LIBRARY_PATH, "AVERT_hourly_emissions_NOx.csv"), dtype='float64',
+                         float_precision='high')
+        self.assertEqual(avert_store("NOx").series("RM").tolist(), df["RM"].tolist())
+        self.assertIsNone(avert_store("NOx").series("Atlantis"))
+
+    def test_preload_only_maps_built_stores(self):
+        easiur_store.cache_clear()
+        avert_store.cache_clear()
+        with mock.patch.object(emissions_data_store, "_store_is_current", return_value=False):
+            emissions_data_store.preload()
+        self.assertEqual(easiur_store.cache_info().currsize + avert_store.cache_info().currsize, 0)
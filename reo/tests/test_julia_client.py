@@ -0,0 +1,23 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+import requests
+from django.test import SimpleTestCase
+from reo.src.julia_client import JuliaClient, DEFAULT_TIMEOUT, ENDPOINT_TIMEOUTS
+
+
+class TestJuliaClient(SimpleTestCase):
+
+    def test_round_robin_hosts(self):
+        client = JuliaClient(hosts=["julia1", "julia2"])
+        self.assertEqual(client.url("chp_defaults", "julia2"), "http://julia2:8081/chp_defaults/")
+        self.assertEqual([client._next_host_index() for _ in range(4)], [0, 1, 0, 1])
+
+    def test_failover_when_no_host_is_reachable(self):
+        client = JuliaClient(hosts=["127.0.0.1", "localhost"], port=1, connect_retries=1, backoff_factor=0)
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            client.get("chp_defaults", json={})
+
+    def test_session_is_reused(self):
+        client = JuliaClient(hosts=["julia"])
+        self.assertIs(client.session, client.session)
+        self.assertIsNone(ENDPOINT_TIMEOUTS["reopt"][1])
+        self.assertEqual(ENDPOINT_TIMEOUTS.get("easiur_costs", DEFAULT_TIMEOUT), DEFAULT_TIMEOUT)
@@ -0,0 +1,40 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+from django.test import SimpleTestCase
+from reo.src.julia_response_cache import JuliaResponseCache, LocalBackend, CachedResponse
+
+
+class FakeJuliaClient(object):
+
+    def __init__(self, status_code=200):
+        self.calls = 0
+        self.status_code = status_code
+
+    def get(self, endpoint, json=None):
+        self.calls += 1
+        return CachedResponse({"endpoint": endpoint, "inputs": json}, status_code=self.status_code)
+
+
+class TestJuliaResponseCache(SimpleTestCase):
+
+    def test_hits_and_misses(self):
+        client = FakeJuliaClient()
+        cache = JuliaResponseCache(LocalBackend(maxsize=2, ttl_seconds=60), client=client)
+        first = cache.get("easiur_costs", json={"latitude": "40", "longitude": "-105", "inflation": "0.025"})
+        second = cache.get("easiur_costs", json={"inflation": "0.025", "longitude": "-105", "latitude": "40"})
+        self.assertEqual(client.calls, 1)
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(cache.stats()["endpoints"]["easiur_costs"], {"hits": 1, "misses": 1})
+
+        # LRU eviction once maxsize entries are cached
+        cache.get("chp_defaults", json={"prime_mover": "micro_turbine"})
+        cache.get("chp_defaults", json={"prime_mover": "recip_engine"})
+        self.assertEqual(cache.stats()["size"], 2)
+        cache.get("easiur_costs", json={"latitude": "40", "longitude": "-105", "inflation": "0.025"})
+        self.assertEqual(client.calls, 4)
+
+    def test_errors_are_not_cached(self):
+        client = FakeJuliaClient(status_code=400)
+        cache = JuliaResponseCache(LocalBackend(maxsize=8, ttl_seconds=60), client=client)
+        for _ in range(2):
+            self.assertEqual(cache.get("pv_cost_defaults", json={}).status_code, 400)
+        self.assertEqual(client.calls, 2)
@@ -0,0 +1,40 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+import os
+import shutil
+import tempfile
+import numpy as np
+from django.test import SimpleTestCase
+from reo.src.load_profile_store import profile_store, build_store, ProfileStore, LIBRARY_PATH
+
+
+class TestLoadProfileStore(SimpleTestCase):
+
+    def test_profiles_match_dat_files(self):
+        for load_type, prefix in [("Electric", "Load8760_norm_"), ("SpaceHeating", "SpaceHeating8760_norm_")]:
+            with open(os.path.join(LIBRARY_PATH, load_type, prefix + "Chicago_LargeOffice.dat"), 'r') as f:
+                expected = [float(line.strip('\n')) for line in f]
+            profile = profile_store(load_type).profile("Chicago", "LargeOffice")
+            self.assertEqual(profile.tolist(), expected)
+            self.assertFalse(profile.flags.writeable)
+
+    def test_store_is_loaded_once(self):
+        self.assertIs(profile_store("Electric"), profile_store("Electric"))
+
+    def test_unknown_profile(self):
+        with self.assertRaises(FileNotFoundError):
+            profile_store("Electric").profile("Chicago", "Castle")
+
+    def test_dat_files_without_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for building in ["Hospital", "LargeOffice"]:
+                shutil.copy(os.path.join(LIBRARY_PATH, "Electric", "Load8760_norm_Miami_{}.dat".format(building)),
+                            directory)
+            unpacked = ProfileStore(directory)
+            self.assertIsNone(unpacked.profiles)
+            build_store(directory)
+            packed = ProfileStore(directory)
+            self.assertIsNotNone(packed.profiles)
+            for building in ["Hospital", "LargeOffice"]:
+                self.assertEqual(unpacked.profile("Miami", building).tolist(), packed.profile("Miami", building).tolist())
+            with self.assertRaises(FileNotFoundError):
+                unpacked.profile("Miami", "Castle")
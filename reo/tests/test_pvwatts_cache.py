@@ -0,0 +1,114 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+from django.test import SimpleTestCase
+from reo.exceptions import PVWattsDownloadError
+from reo.src.pvwatts_cache import PVWattsCache
+
+URL_BASE = "https://developer.nrel.gov/api/pvwatts/v6.json"
+
+
+class FakePVWatts(object):
+
+    def __init__(self, status_code=200, errors=(), delay=0.0):
+        self.calls = 0
+        self.status_code = status_code
+        self.errors = list(errors)
+        self.delay = delay
+
+    def fetch(self, params):
+        def fetch():
+            self.calls += 1
+            time.sleep(self.delay)
+            return self.status_code, {"errors": self.errors, "outputs": {"tamb": [params["lat"]] * 3}}
+        return fetch
+
+
+class TestPVWattsCache(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def get(self, cache, pvwatts, lat, api_key="key1"):
+        params = {"api_key": api_key, "lat": lat, "lon": -105.2, "tilt": 20}
+        return cache.get(URL_BASE, params, pvwatts.fetch(params))
+
+    def test_hits_misses_and_eviction(self):
+        pvwatts = FakePVWatts()
+        cache = PVWattsCache(self.directory, maxsize=2)
+        first = self.get(cache, pvwatts, 39.7)
+        second = self.get(cache, pvwatts, 39.7, api_key="key2")  # api_key is not part of the key
+        self.assertEqual(first, second)
+        self.assertEqual(pvwatts.calls, 1)
+
+        self.get(cache, pvwatts, 40.0)
+        time.sleep(0.01)
+        self.get(cache, pvwatts, 39.7)  # most recently used
+        time.sleep(0.01)
+        self.get(cache, pvwatts, 41.0)  # evicts 40.0
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+        self.get(cache, pvwatts, 39.7)
+        self.assertEqual(pvwatts.calls, 3)
+        self.get(cache, pvwatts, 40.0)
+        self.assertEqual(pvwatts.calls, 4)
+
+        # a new cache (eg. another process) reads the same directory
+        self.get(PVWattsCache(self.directory, maxsize=2), pvwatts, 40.0)
+        self.assertEqual(pvwatts.calls, 4)
+
+    def test_ttl_from_write_time(self):
+        pvwatts = FakePVWatts()
+        cache = PVWattsCache(self.directory, ttl_seconds=0.2)
+        self.get(cache, pvwatts, 39.7)
+        time.sleep(0.15)
+        self.get(cache, pvwatts, 39.7)  # a hit does not extend the lifetime of the response
+        self.assertEqual(pvwatts.calls, 1)
+        time.sleep(0.1)
+        self.get(cache, pvwatts, 39.7)
+        self.assertEqual(pvwatts.calls, 2)
+
+    def test_directory_is_scanned_when_full(self):
+        pvwatts = FakePVWatts()
+        cache = PVWattsCache(self.directory, maxsize=20)
+        with mock.patch.object(cache, "evict", wraps=cache.evict) as evict:
+            for i in range(30):
+                self.get(cache, pvwatts, 30.0 + i)
+        # on the first write, then every 3 writes (down to 18 responses) once there are more than 20
+        self.assertEqual(evict.call_count, 5)
+        self.assertEqual(len(os.listdir(self.directory)), 18)
+
+    def test_errors_are_not_cached(self):
+        for pvwatts in [FakePVWatts(status_code=422), FakePVWatts(errors=["lat out of range"])]:
+            cache = PVWattsCache(self.directory)
+            for _ in range(2):
+                self.get(cache, pvwatts, 95.0)
+            self.assertEqual(pvwatts.calls, 2)
+
+    def test_concurrent_requests_are_coalesced(self):
+        pvwatts = FakePVWatts(delay=0.2)
+        cache = PVWattsCache(None)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.get(cache, pvwatts, 39.7))) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(pvwatts.calls, 1)
+        self.assertEqual(len(results), 4)
+        self.assertEqual(cache.stats()["coalesced"], 3)
+
+    def test_offline_directory(self):
+        self.get(PVWattsCache(self.directory), FakePVWatts(), 39.7)
+        pvwatts = FakePVWatts()
+        cache = PVWattsCache(None, offline_directory=self.directory)
+        self.assertEqual(self.get(cache, pvwatts, 39.7)["outputs"]["tamb"], [39.7] * 3)
+        with self.assertRaises(PVWattsDownloadError):
+            self.get(cache, pvwatts, 40.0)
+        self.assertEqual(pvwatts.calls, 0)
@@ -0,0 +1,28 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+import geopandas as gpd
+from shapely import geometry as g
+from django.test import SimpleTestCase
+from reo.src.emissions_calculator import EmissionsCalculator
+from reo.src.spatial_index import shapefile_index
+
+
+class TestSpatialIndex(SimpleTestCase):
+
+    def test_lookups_match_shapefile_scan(self):
+        gdf = gpd.read_file('reo/src/data/avert_102008.shp')
+        index = shapefile_index('avert_102008.shp', 'AVERT')
+        for point in [g.Point(-1e6, 0.0), g.Point(5e5, -1e6), g.Point(2.5e6, 1.5e6)]:
+            distances = gdf.geometry.distance(point)
+            region, distance = index.nearest(point)
+            self.assertEqual(region, gdf.AVERT[distances.idxmin()])
+            self.assertAlmostEqual(distance, distances.min())
+            intersecting = gdf[gdf.geometry.intersects(point)]
+            self.assertEqual(index.containing(point), None if intersecting.empty else intersecting.AVERT.values[0])
+
+    def test_index_is_built_once(self):
+        self.assertIs(shapefile_index('avert_4326.shp', 'AVERT'), shapefile_index('avert_4326.shp', 'AVERT'))
+
+    def test_region_abbr(self):
+        ec = EmissionsCalculator(latitude=39.7407, longitude=-105.1686, pollutant='CO2')
+        self.assertEqual(ec.region_abbr, 'RM')
+        self.assertEqual(ec.meters_to_region, 0)
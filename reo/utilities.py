@@ -2,13 +2,12 @@
 from numpy_financial import npv as NPV
 from math import log10, ceil
 from reo.models import ErrorModel
-import pandas as pd
 import numpy as np
 import calendar
-import datetime
 import math
-import geopandas as gpd
 from shapely import geometry as g
+from reo.src.spatial_index import shapefile_index
+from reo.src.calendar_index import step_calendar, month_start_steps
 # shapely does not work with Python >= 3.9
 # https://github.com/shapely/shapely/issues/1040
 
@@ -258,7 +257,7 @@ def check_common_outputs(Test, d_calculated, d_expected):
 def generate_year_profile_hourly(year, consecutive_periods):
     """
     This function creates a year-specific 8760 profile with 1.0 for timesteps which are defined in the relative_periods based on
-        generalized (non-year specific) datetime metrics. All other values are 0.0. This functions uses numpy, pandas, datetime, and calendar packages/libraries.
+        generalized (non-year specific) datetime metrics. All other values are 0.0. This functions uses numpy, calendar, and reo.src.calendar_index.
 
     :param year: year for applying consecutive_periods changes based on year and leap years (cut off 12/31/year)
     :param consecutive_periods: either list of dictionaries where each dict defines a period (keys = "month", "start_week_of_month", "start_day_of_week", "start_hour", "duration_hours"; length N periods)
@@ -268,13 +267,9 @@ def generate_year_profile_hourly(year, consecutive_periods):
     :return errors_list: used in validators.py - errors related to the input consecutive_periods and the year's calendar
     """
     errors_list = []
-    # Create datetime series of the year, remove last day of the year if leap year
-    if calendar.isleap(year):
-        end_date = "12/31/"+str(year)
-    else:
-        end_date = "1/1/"+str(year+1)
-    dt_profile = pd.date_range(start='1/1/'+str(year), end=end_date, freq="1H", closed="left")
-    year_profile_hourly_series = pd.Series(np.zeros(8760), index=dt_profile)
+    # Hourly profile of the year, the last day of the year is removed if leap year
+    year_profile_hourly = np.zeros(8760)
+    month_start_hours = month_start_steps(year)
     
     # Check if the consecutive_periods is a list_of_dict or other (must be Pandas DataFrame), and if other, convert to list_of_dict
     if not isinstance(consecutive_periods, list):
@@ -295,11 +290,14 @@ def generate_year_profile_hourly(year, consecutive_periods):
             if start_day_of_month == 0:  # This may happen if there is no day_of_week in the 1st, 5th or 6th week of the month
                 raise DayOfWeekError("There is no start_day_of_week {} ({}) in week {} of month {} in the year {}. Remember, Monday is treated as the first day of the week.".format(start_day_of_week+1, day_of_week_name[start_day_of_week], start_week_of_month+1, start_month, year))
             else:
-                start_datetime = datetime.datetime(year=year, month=start_month, day=start_day_of_month, hour=start_hour)
-                if start_datetime + datetime.timedelta(hours=duration_hours-1) > dt_profile[-1]:
+                if not 0 <= start_hour <= 23:
+                    raise ValueError("hour must be in 0..23")
+                start_hour_of_year = month_start_hours[start_month - 1] + (start_day_of_month - 1) * 24 + start_hour
+                end_hour_of_year = start_hour_of_year + duration_hours - 1
+                if end_hour_of_year > len(year_profile_hourly) - 1:
                     raise DurationOverflowsYearError("The start day/time and duration_hours exceeds the end of the year. Please specify two separate unavailability periods: one for the beginning of the year and one for up to the end of the year.")
                 else:
-                    year_profile_hourly_series[start_datetime:start_datetime + datetime.timedelta(hours=duration_hours-1)] = 1.0
+                    year_profile_hourly[start_hour_of_year:max(start_hour_of_year, end_hour_of_year + 1)] = 1.0
             
         except DayOfWeekError as e:
             errors_list.append(error_start_text + str(e.args[0]))
@@ -309,7 +307,7 @@ def generate_year_profile_hourly(year, consecutive_periods):
             errors_list.append(error_start_text + "Invalid set for month {} (1-12), start_week_of_month {} (1-4, possible 5 and 6), start_day_of_week {} (1-7), and start_hour_of_day {} (1-24) for the year {}.".format(start_month, start_week_of_month+1, start_day_of_week+1, start_hour+1, year))
 
     if errors_list == []:
-        year_profile_hourly_list = list(year_profile_hourly_series)
+        year_profile_hourly_list = year_profile_hourly.tolist()
     else:
         year_profile_hourly_list = []   
     
@@ -328,20 +326,15 @@ def get_weekday_weekend_total_hours_by_month(year, year_profile_hourly_list):
     :param year_profile_hourly_list: list of 0's and 1's for tallying the metrics above; typically created using the generate_year_profile_hourly function
     :return weekday_weekend_total_hours_by_month: nested dictionary with 12 keys (one for each month) each being a dictionary of weekday_hours, weekend_hours, and total_hours
     """
-        # Create datetime series of the year, remove last day of the year if leap year
-    if calendar.isleap(year):
-        end_date = "12/31/"+str(year)
-    else:
-        end_date = "1/1/"+str(year+1)
-    dt_profile = pd.date_range(start='1/1/'+str(year), end=end_date, freq="1H", closed="left")
-    year_profile_hourly_series = pd.Series(year_profile_hourly_list, index=dt_profile)
-    unavail_hours = year_profile_hourly_series[year_profile_hourly_series == 1]
+    cal = step_calendar(year)  # the last day of the year is removed if leap year
+    unavail_hours = np.asarray(year_profile_hourly_list) == 1
+    weekend_hours = np.bincount(cal.month[unavail_hours & ~cal.is_weekday], minlength=13)
+    total_hours = np.bincount(cal.month[unavail_hours], minlength=13)
     weekday_weekend_total_hours_by_month = {m:{} for m in range(1,13)}
     for m in range(1,13):
-        unavail_hours_month = unavail_hours[unavail_hours.index.month==m]
-        weekday_weekend_total_hours_by_month[m]["weekends"] = int(sum(unavail_hours_month[(unavail_hours_month.index.dayofweek==5) | (unavail_hours_month.index.dayofweek==6)]))
-        weekday_weekend_total_hours_by_month[m]["weekdays"] = int(sum(unavail_hours_month) - weekday_weekend_total_hours_by_month[m]["weekends"])
-        weekday_weekend_total_hours_by_month[m]["total"] = int(weekday_weekend_total_hours_by_month[m]["weekdays"] + weekday_weekend_total_hours_by_month[m]["weekends"])
+        weekday_weekend_total_hours_by_month[m]["weekends"] = int(weekend_hours[m])
+        weekday_weekend_total_hours_by_month[m]["weekdays"] = int(total_hours[m] - weekend_hours[m])
+        weekday_weekend_total_hours_by_month[m]["total"] = int(total_hours[m])
 
     return weekday_weekend_total_hours_by_month
 
@@ -378,10 +371,9 @@ def convert_gal_to_kwh(delta_T_degF, rho_kg_per_m3, cp_kj_per_kgK):
 def get_climate_zone_and_nearest_city(latitude, longitude, default_cities):
     nearest_city = None
     geometric_flag = False
-    gdf = gpd.read_file('reo/src/data/climate_cities.shp')
-    gdf = gdf[gdf.geometry.intersects(g.Point(longitude, latitude))]
-    if not gdf.empty:
-        nearest_city = gdf.city.values[0].replace(' ', '')
+    city = shapefile_index('climate_cities.shp', 'city').containing(g.Point(longitude, latitude))
+    if city is not None:
+        nearest_city = city.replace(' ', '')
     if nearest_city is None:
         cities_to_search = default_cities
     else:
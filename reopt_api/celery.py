@@ -3,7 +3,7 @@ from __future__ import absolute_import, unicode_literals  # recommended by celer
 import os
 import logging
 from celery import Celery
-from celery.signals import after_setup_logger
+from celery.signals import after_setup_logger, worker_process_init
 from keys import *
 
 # set the default Django settings module for the 'celery' program.
@@ -70,12 +70,27 @@ app.conf.task_default_queue = os.environ.get('APP_QUEUE_NAME', 'localhost')
 # Load task modules from all registered Django app configs.
 app.autodiscover_tasks()
 
+# Expire old rows of the django-db result backend, sent by the single bin/beat process (the celery-beat deployment)
+app.conf.beat_schedule = {
+    'expire-task-results': {
+        'task': 'reo.src.task_results.expire_task_results_task',
+        'schedule': float(os.environ.get('REOPT_TASK_RESULT_CLEANUP_SECONDS', 3600)),
+    },
+}
+
 
 @app.task(bind=True)
 def debug_task(self):
     print('Request: {0!r}'.format(self.request))
 
 
+@worker_process_init.connect
+def preload_data(**kwargs):
+    # memory-map the EASIUR and AVERT stores built with the image (bin/build-data-stores) once per worker process
+    from reo.src.emissions_data_store import preload
+    preload()
+
+
 @after_setup_logger.connect
 def setup_loggers(logger, *args, **kwargs):
     # file_formatter = logging.Formatter(
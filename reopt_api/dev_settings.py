@@ -144,7 +144,9 @@ CELERY_IMPORTS = (
     'futurecosts.api',
     'futurecosts.tasks',
     'reoptjl.api',
-    'reoptjl.src.run_jump_model'
+    'reoptjl.src.run_jump_model',
+    'reo.src.task_results',
+    'ghpghx.src.run_ghpghx'
 )
 
 if 'test' in sys.argv:
@@ -116,7 +116,9 @@ CELERY_IMPORTS = (
     'reo.src.run_jump_model',
     'resilience_stats.outage_simulator_LF',
     'django_extensions',
-    'ghpghx'    
+    'ghpghx',
+    'reo.src.task_results',
+    'ghpghx.src.run_ghpghx'
 )
 
 if 'test' in sys.argv:
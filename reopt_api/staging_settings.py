@@ -134,7 +134,9 @@ CELERY_IMPORTS = (
     'django_extensions',
     'reoptjl.api',
     'reoptjl.src.run_jump_model',
-    'ghpghx'
+    'ghpghx',
+    'reo.src.task_results',
+    'ghpghx.src.run_ghpghx'
 )
 
 # Static files (CSS, JavaScript, Images)
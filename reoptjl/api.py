@@ -1,5 +1,6 @@
 # REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
 import json
+import time
 import uuid
 import sys
 import traceback
@@ -10,18 +11,21 @@ from tastypie.serializers import Serializer
 from tastypie.exceptions import ImmediateHttpResponse, HttpResponse
 from tastypie.resources import ModelResource
 from tastypie.validation import Validation
-from reoptjl.validators import InputValidator
-# from reo.src.profiler import Profiler  # TODO use Profiler?
+from reoptjl.validators import InputValidator, validate_ghpghx_inputs
 from reoptjl.src.run_jump_model import run_jump_model
+from reoptjl.src.run_profile import StageTimer, save_run_profile
+from reoptjl.src.input_handoff import hand_off
+from reoptjl.src.run_summary import refresh_run_summary
+from reoptjl.src.reuse_results import reuse_results_requested, hash_inputs, find_reusable_run, copy_results
 from reo.exceptions import UnexpectedError, REoptError
-from ghpghx.models import GHPGHXInputs
-from django.core.exceptions import ValidationError
 from reoptjl.models import APIMeta
 import keys
 log = logging.getLogger(__name__)
  
 
 def return400(data: dict, validator: InputValidator):
+    # the APIMeta is saved by InputValidator, so the run is listed in the user's summary like the runs that are solved
+    refresh_run_summary(validator.models["APIMeta"].run_uuid)
     data["status"] = (
         'Invalid inputs. No optimization task has been created. See messages for details.'
     )
@@ -33,6 +37,24 @@ def return400(data: dict, validator: InputValidator):
     raise ImmediateHttpResponse(HttpResponse(json.dumps(data), content_type='application/json', status=400))
 
 
+def request_job_type(request) -> str:
+    """
+    :return: APIMeta.job_type of a job POSTed with request
+    """
+    if request.META.get('HTTP_X_API_USER_ID', False):
+        if request.META.get('HTTP_X_API_USER_ID', '') == '6f09c972-8414-469b-b3e8-a78398874103':
+            job_type = 'REopt Web Tool'
+        else:
+            job_type = 'developer.nrel.gov'
+    else:
+        job_type = 'Internal NREL'
+
+    test_case = request.META.get('HTTP_USER_AGENT') or ''
+    if test_case.startswith('check_http/'):
+        job_type = 'Monitoring'
+    return job_type
+
+
 class UUIDFilter(logging.Filter):
 
     def __init__(self, uuidstr):
@@ -126,43 +148,25 @@ class Job(ModelResource):
 
         log.addFilter(UUIDFilter(run_uuid))
 
-        if bundle.request.META.get('HTTP_X_API_USER_ID', False):
-            if bundle.request.META.get('HTTP_X_API_USER_ID', '') == '6f09c972-8414-469b-b3e8-a78398874103':
-                bundle.data['APIMeta']['job_type'] = 'REopt Web Tool'
-            else:
-                bundle.data['APIMeta']['job_type'] = 'developer.nrel.gov'
-        else:
-            bundle.data['APIMeta']['job_type'] = 'Internal NREL'
-
-        test_case = bundle.request.META.get('HTTP_USER_AGENT') or ''
-        if test_case.startswith('check_http/'):
-            bundle.data['APIMeta']['job_type'] = 'Monitoring'
+        bundle.data['APIMeta']['job_type'] = request_job_type(bundle.request)
 
         # Validate ghpghx_inputs, if applicable
-        ghpghx_inputs_validation_errors = []
-        if bundle.data.get("GHP") is not None and \
-            bundle.data["GHP"].get("ghpghx_inputs") not in [None, []] and \
-            bundle.data["GHP"].get("ghpghx_response_uuids") in [None, []]:
-            for ghpghx_inputs in bundle.data["GHP"]["ghpghx_inputs"]:
-                ghpghxM = GHPGHXInputs(**ghpghx_inputs)
-                try:
-                    # Validate individual model fields
-                    ghpghxM.clean_fields()
-                except ValidationError as ve:
-                    ghpghx_inputs_validation_errors += [key + ": " + val[i] + " " for key, val in ve.message_dict.items() for i in range(len(val))]            
+        ghpghx_inputs_validation_errors = validate_ghpghx_inputs(bundle.data)
 
         # Validate inputs
+        timer = StageTimer()
         try:
-            input_validator = InputValidator(bundle.data, ghpghx_inputs_validation_errors=ghpghx_inputs_validation_errors)
-            input_validator.clean_fields()  # step 1 check field values
-            if not input_validator.is_valid:
-                return400(meta, input_validator)
-            input_validator.clean()  # step 2 check requirements that include more than one field (in one model)
-            if not input_validator.is_valid:
-                return400(meta, input_validator)
-            input_validator.cross_clean()  # step 3 check requirements that include more than one model
-            if not input_validator.is_valid:
-                return400(meta, input_validator)
+            with timer.stage("validation"):
+                input_validator = InputValidator(bundle.data, ghpghx_inputs_validation_errors=ghpghx_inputs_validation_errors)
+                input_validator.clean_fields()  # step 1 check field values
+                if not input_validator.is_valid:
+                    return400(meta, input_validator)
+                input_validator.clean()  # step 2 check requirements that include more than one field (in one model)
+                if not input_validator.is_valid:
+                    return400(meta, input_validator)
+                input_validator.cross_clean()  # step 3 check requirements that include more than one model
+                if not input_validator.is_valid:
+                    return400(meta, input_validator)
         except ImmediateHttpResponse as e:
             raise e  # returns the response from return400
         except Exception:
@@ -170,6 +174,7 @@ class Job(ModelResource):
             err = UnexpectedError(exc_type, exc_value.args[0], traceback.format_tb(exc_traceback),
                                   task='InputValidator', run_uuid=run_uuid)
             err.save_to_db()
+            refresh_run_summary(run_uuid)  # no-op if the APIMeta was not saved
             meta["status"] = ('Internal Server Error during input validation. No optimization task has been created. '
                               'Please check your POST for bad values.')
             meta['messages'] = {}
@@ -180,7 +185,8 @@ class Job(ModelResource):
                                                      status=500))  # internal server error
 
         try:
-            input_validator.save()
+            with timer.stage("input_save"):
+                input_validator.save()
         except Exception:
             log.error("Could not create and save run_uuid: {}\n Data: {}".format(run_uuid, meta))
             exc_type, exc_value, exc_traceback = sys.exc_info()
@@ -195,9 +201,27 @@ class Job(ModelResource):
                                                      content_type='application/json',
                                                      status=500))  # internal server error
 
-        APIMeta.objects.filter(run_uuid=run_uuid).update(status='Optimizing...')
+        input_hash = hash_inputs(input_validator.validated_input_dict)
+        if reuse_results_requested(bundle.data):
+            reusable_meta = find_reusable_run(input_hash, run_uuid, input_validator.models["APIMeta"].user_uuid)
+            if reusable_meta is not None:
+                try:
+                    copy_results(reusable_meta, run_uuid)
+                except Exception as e:  # fall back to running the optimization
+                    log.warning("Could not reuse results of run_uuid {}: {}".format(reusable_meta.run_uuid, e))
+                else:
+                    save_run_profile(run_uuid, timer.seconds)
+                    refresh_run_summary(run_uuid)
+                    raise ImmediateHttpResponse(HttpResponse(json.dumps({'run_uuid': run_uuid}),
+                                                content_type='application/json', status=201))
+
+        with timer.stage("input_save"):
+            handoff = hand_off(run_uuid, input_validator.models["APIMeta"], input_validator.models.values())
+        save_run_profile(run_uuid, timer.seconds)
+        APIMeta.objects.filter(run_uuid=run_uuid).update(status='Optimizing...', input_hash=input_hash)
+        refresh_run_summary(run_uuid)
         try:
-            run_jump_model.s(run_uuid).apply_async()
+            run_jump_model.s(run_uuid, queued_at=time.time(), **handoff).apply_async()
         except Exception as e:
             if isinstance(e, REoptError):
                 pass  # handled in each task
@@ -0,0 +1,177 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+"""
+CompressedSeriesField, which stores a 1D float series as byte-shuffled, zlib compressed float64 (or float32) in a bytea
+column and reads it as a lazily decoded Series.
+"""
+import base64
+from array import array
+import zlib
+import numpy as np
+from django.core.exceptions import ValidationError
+from django.db import models
+from reo.src.model_dict import register_immutable_type
+
+# first byte of the stored value, so that a column can change dtype without rewriting existing rows
+DTYPE_CODES = {"float64": b"d", "float32": b"f"}
+CODE_DTYPES = {code: np.dtype(dtype).newbyteorder("<") for dtype, code in DTYPE_CODES.items()}
+
+
+def encode_series(values, dtype: str = "float64") -> bytes:
+    """
+    :param values: sequence of numbers (list, numpy array, array('d'), Series); None is stored as NaN
+    :return: bytes, dtype code + zlib compressed byte-shuffled little-endian values
+    """
+    if isinstance(values, Series) and values.dtype == np.dtype(dtype):
+        return values.data
+    arr = np.asarray(values if not isinstance(values, list) else [np.nan if v is None else v for v in values],
+                     dtype=np.dtype(dtype).newbyteorder("<"))
+    if arr.ndim != 1:
+        raise ValueError("CompressedSeriesField only stores 1D series, got shape {}.".format(arr.shape))
+    # grouping the n-th byte of every value together makes the exponent and high mantissa bytes compress well
+    shuffled = np.ascontiguousarray(arr).view(np.uint8).reshape(-1, arr.itemsize).T.tobytes()
+    return DTYPE_CODES[dtype] + zlib.compress(shuffled)
+
+
+def decode_series(data: bytes) -> np.ndarray:
+    dtype = CODE_DTYPES[data[:1]]
+    shuffled = np.frombuffer(zlib.decompress(data[1:]), dtype=np.uint8)
+    arr = shuffled.reshape(dtype.itemsize, -1).T.copy().view(dtype).reshape(-1)
+    arr.setflags(write=False)
+    return arr
+
+
+class Series(object):
+    """
+    A stored time series. Behaves as a read-only sequence of floats (len, iteration, indexing, np.array(series)) and
+    only decompresses when the values are used.
+    """
+    __slots__ = ("data", "_array")
+
+    def __init__(self, data: bytes):
+        self.data = bytes(data)
+        self._array = None
+
+    @classmethod
+    def from_values(cls, values, dtype: str = "float64"):
+        return cls(encode_series(values, dtype))
+
+    @property
+    def dtype(self):
+        return CODE_DTYPES[self.data[:1]]
+
+    @property
+    def array(self) -> np.ndarray:
+        if self._array is None:
+            self._array = decode_series(self.data)
+        return self._array
+
+    def tolist(self) -> list:
+        """
+        :return: list of floats, with NaN as None (JSON has no NaN)
+        """
+        arr = self.array
+        if np.isnan(arr).any():
+            return [None if np.isnan(v) else v for v in arr.tolist()]
+        return arr.tolist()
+
+    def __array__(self, dtype=None):
+        return self.array if dtype is None else self.array.astype(dtype)
+
+    def __len__(self):
+        return len(self.array)
+
+    def __iter__(self):
+        return iter(self.array.tolist())
+
+    def __getitem__(self, item):
+        value = self.array[item]
+        return value.tolist() if isinstance(value, np.ndarray) else float(value)
+
+    def __eq__(self, other):
+        if isinstance(other, Series):
+            return self.data == other.data or np.array_equal(self.array, other.array)
+        if isinstance(other, (list, tuple, array, np.ndarray)):
+            return np.array_equal(self.array, np.asarray(other, dtype=float))
+        return False
+
+    __hash__ = None
+
+    def __copy__(self):
+        return self  # immutable
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return Series, (self.data,)
+
+    def __repr__(self):
+        return "Series({} {} values)".format(len(self), self.dtype.name)
+
+
+register_immutable_type(Series)  # shared, not copied, by BaseModel.dict
+
+
+class CompressedSeriesField(models.Field):
+    """
+    Time series stored as compressed binary in a bytea column, see the module docstring.
+    Example: electric_to_load_series_kw = CompressedSeriesField(default=list, blank=True, help_text="...")
+    """
+    description = "Compressed series of floats"
+    empty_values = [None, b""]
+
+    def __init__(self, *args, dtype: str = "float64", **kwargs):
+        if dtype not in DTYPE_CODES:
+            raise ValueError("CompressedSeriesField dtype must be one of {}.".format(", ".join(DTYPE_CODES)))
+        self.dtype = dtype
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.dtype != "float64":
+            kwargs["dtype"] = self.dtype
+        return name, path, args, kwargs
+
+    def get_internal_type(self):
+        return "BinaryField"
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return Series(value)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, Series):
+            return value
+        if isinstance(value, (bytes, memoryview)):
+            return Series(value)
+        if isinstance(value, str):  # serialized with value_to_string
+            return Series(base64.b64decode(value.encode("ascii")))
+        try:
+            return Series.from_values(value, self.dtype)
+        except (TypeError, ValueError) as e:
+            raise ValidationError("Invalid series: {}".format(e), code="invalid")
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        if value is None:
+            return None
+        return encode_series(value, self.dtype)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        value = super().get_db_prep_value(value, connection, prepared)
+        if value is not None:
+            return connection.Database.Binary(value)
+        return value
+
+    def value_to_string(self, obj):
+        value = self.value_from_object(obj)
+        if value is None:
+            return None
+        return base64.b64encode(encode_series(value, self.dtype)).decode("ascii")
+
+    def validate(self, value, model_instance):
+        if not self.blank and (value is None or len(value) == 0):
+            raise ValidationError(self.error_messages["blank"], code="blank")
+        if value is None and not self.null:
+            raise ValidationError(self.error_messages["null"], code="null")
@@ -0,0 +1,39 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+from django.core.management.base import BaseCommand
+from reoptjl.models import APIMeta
+from reoptjl.src.run_summary import refresh_run_summaries
+
+
+class Command(BaseCommand):
+    help = "Build the RunSummary rows of existing runs, which are read by the summary endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Number of runs summarized per batch.")
+        parser.add_argument("--user-uuid", default=None, help="Only summarize the runs of this user.")
+        parser.add_argument("--all", action="store_true",
+                            help="Rebuild every summary, not only the runs that do not have one yet.")
+
+    def handle(self, *args, **options):
+        api_metas = APIMeta.objects.all()
+        if options["user_uuid"]:
+            api_metas = api_metas.filter(user_uuid=options["user_uuid"])
+        if not options["all"]:
+            api_metas = api_metas.filter(RunSummary__isnull=True)
+
+        n_runs, n_failed, last_id = 0, 0, 0
+        while True:  # keyset batches on id, so each batch is an index range scan
+            ids = list(api_metas.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:options["batch_size"]])
+            if not ids:
+                break
+            if refresh_run_summaries(APIMeta.objects.filter(id__in=ids)):
+                n_runs += len(ids)
+            else:
+                n_failed += len(ids)
+                self.stderr.write("Could not summarize the runs with ids {} to {}, see the log.".format(ids[0], ids[-1]))
+            last_id = ids[-1]
+            self.stdout.write("Summarized {} runs".format(n_runs))
+        if n_failed:
+            self.stdout.write(self.style.WARNING("Done. Summarized {} runs, could not summarize {} runs.".format(
+                n_runs, n_failed)))
+        else:
+            self.stdout.write(self.style.SUCCESS("Done. Summarized {} runs.".format(n_runs)))
@@ -0,0 +1,21 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+import json
+from django.core.management.base import BaseCommand
+from reo.src.task_results import expire_task_results, task_result_stats
+
+
+class Command(BaseCommand):
+    help = "Delete old rows of the Celery result backend tables (also run periodically by the Celery beat schedule)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--max-age-days", type=float, default=None,
+                            help="Delete the results done more than this many days ago "
+                                 "(default REOPT_TASK_RESULT_MAX_AGE_DAYS or 7).")
+        parser.add_argument("--batch-size", type=int, default=None, help="Number of rows deleted per batch.")
+        parser.add_argument("--stats-only", action="store_true", help="Only report the size of the result tables.")
+
+    def handle(self, *args, **options):
+        if not options["stats_only"]:
+            n_deleted = expire_task_results(options["max_age_days"], options["batch_size"])
+            self.stdout.write(self.style.SUCCESS("Deleted {} task results.".format(n_deleted)))
+        self.stdout.write(json.dumps(task_result_stats(), indent=2))
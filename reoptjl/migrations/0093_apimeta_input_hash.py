@@ -0,0 +1,18 @@
+# Generated by Django 4.0.7 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reoptjl', '0092_merge_20250613_0525'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apimeta',
+            name='input_hash',
+            field=models.TextField(blank=True, db_index=True, default='', help_text='SHA-256 hash of the validated inputs and the REopt.jl version, used to reuse the results of a previous run with identical inputs.'),
+        ),
+    ]
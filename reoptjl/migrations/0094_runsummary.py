@@ -0,0 +1,25 @@
+# Generated by Django 4.0.7 on 2026-10-17 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reoptjl', '0093_apimeta_input_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RunSummary',
+            fields=[
+                ('meta', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='RunSummary', serialize=False, to='reoptjl.apimeta')),
+                ('run_uuid', models.UUIDField(unique=True)),
+                ('user_uuid', models.TextField(blank=True, db_index=True, default='')),
+                ('created', models.DateTimeField(db_index=True)),
+                ('in_user_summary', models.BooleanField(default=True, help_text='False if the run belongs to a portfolio (and has not been unlinked from it) or has been unlinked from the user, in which case it is not returned by the user summary endpoints.')),
+                ('summary', models.JSONField(default=dict)),
+            ],
+        ),
+    ]
@@ -0,0 +1,139 @@
+# Generated by Django 4.0.7 on 2026-10-17 12:00
+"""
+Store the 1D output time series as CompressedSeriesField (compressed float64 in bytea) instead of float8[], in three
+migrations so that no transaction holds the table locks while the rows are converted:
+    - 0095 adds a nullable temporary CompressedSeriesField column for each series (no table rewrite),
+    - 0097_copy_compressed_output_series copies the existing rows into them in committed batches,
+    - 0098_swap_compressed_output_series drops the float8[] columns and renames the new ones.
+
+Expected runtime: 0095 and 0098 only change the catalog, but Django takes about 10 s and 25 s to compute the migration
+states of their operations, during which the tables they already altered stay locked. 0097 takes 5 to 10 ms per
+stored hourly series, e.g. 1 to 2 minutes per 10,000 ElectricLoadOutputs rows with one hourly load series.
+"""
+from django.db import migrations
+import reoptjl.fields
+
+# (model, field, CompressedSeriesField kwargs)
+SERIES_FIELDS = [
+    ("electricloadoutputs", "load_series_kw", dict(default=list, help_text='Annual time series of BAU electric load. Does not include electric load for any new heating or cooling techs.')),
+    ("electricloadoutputs", "critical_load_series_kw", dict(default=list, help_text='Hourly critical load for outage simulator. Values are either uploaded by user, or determined from typical load (either uploaded or simulated) and critical_load_fraction.')),
+    ("electricloadoutputs", "offgrid_annual_oper_res_required_series_kwh", dict(default=list, help_text='Total operating reserves required (for load and techs) on an annual basis, for off-grid scenarios only')),
+    ("electricloadoutputs", "offgrid_annual_oper_res_provided_series_kwh", dict(default=list, help_text='Total operating reserves provided on an annual basis, for off-grid scenarios only')),
+    ("electricloadoutputs", "offgrid_load_met_series_kw", dict(default=list, help_text='Percentage of total electric load met on an annual basis, for off-grid scenarios only')),
+    ("electricutilityoutputs", "electric_to_load_series_kw", dict(blank=True, default=list, help_text='Optimal average annual grid to load time series')),
+    ("electricutilityoutputs", "electric_to_load_series_kw_bau", dict(blank=True, default=list, help_text='Business as usual average annual grid to load time series')),
+    ("electricutilityoutputs", "electric_to_storage_series_kw", dict(blank=True, default=list, help_text='Optimal average annual grid to battery time series')),
+    ("pvoutputs", "electric_to_storage_series_kw", dict(blank=True, default=list)),
+    ("pvoutputs", "electric_to_load_series_kw", dict(blank=True, default=list)),
+    ("pvoutputs", "electric_to_grid_series_kw", dict(blank=True, default=list)),
+    ("pvoutputs", "electric_curtailed_series_kw", dict(blank=True, default=list)),
+    ("pvoutputs", "production_factor_series", dict(blank=True, default=list)),
+    ("windoutputs", "electric_to_storage_series_kw", dict(blank=True, default=list)),
+    ("windoutputs", "electric_to_load_series_kw", dict(blank=True, default=list)),
+    ("windoutputs", "electric_to_grid_series_kw", dict(blank=True, default=list)),
+    ("windoutputs", "electric_curtailed_series_kw", dict(blank=True, default=list)),
+    ("windoutputs", "production_factor_series", dict(blank=True, default=list)),
+    ("electricstorageoutputs", "soc_series_fraction", dict(blank=True, default=list)),
+    ("electricstorageoutputs", "storage_to_load_series_kw", dict(blank=True, default=list)),
+    ("generatoroutputs", "electric_to_storage_series_kw", dict(blank=True, null=True)),
+    ("generatoroutputs", "electric_to_load_series_kw", dict(blank=True, null=True, default=list)),
+    ("generatoroutputs", "electric_to_grid_series_kw", dict(blank=True, null=True, default=list)),
+    ("chpoutputs", "electric_production_series_kw", dict(blank=True, default=list, help_text='Electric power production time-series array [kW]')),
+    ("chpoutputs", "electric_to_grid_series_kw", dict(blank=True, default=list, help_text='Electric power exported time-series array [kW]')),
+    ("chpoutputs", "electric_to_storage_series_kw", dict(blank=True, default=list, help_text='Electric power to charge the battery storage time-series array [kW]')),
+    ("chpoutputs", "electric_to_load_series_kw", dict(blank=True, default=list, help_text='Electric power serving the electric load time-series array [kW]')),
+    ("chpoutputs", "thermal_to_storage_series_mmbtu_per_hour", dict(blank=True, default=list, help_text='Thermal power to TES time-series array [MMBtu/hr]')),
+    ("chpoutputs", "thermal_curtailed_series_mmbtu_per_hour", dict(blank=True, default=list, help_text='Thermal power wasted/unused/vented time-series array [MMBtu/hr]')),
+    ("chpoutputs", "thermal_to_load_series_mmbtu_per_hour", dict(blank=True, default=list, help_text='Thermal power to serve the heating load time-series array [MMBtu/hr]')),
+    ("chpoutputs", "thermal_to_steamturbine_series_mmbtu_per_hour", dict(blank=True, default=list, help_text='Thermal power to steam turbine time-series array [MMBtu/hr]')),
+    ("chpoutputs", "thermal_production_series_mmbtu_per_hour", dict(default=list)),
+    ("chpoutputs", "thermal_to_dhw_load_series_mmbtu_per_hour", dict(default=list)),
+    ("chpoutputs", "thermal_to_space_heating_load_series_mmbtu_per_hour", dict(default=list)),
+    ("chpoutputs", "thermal_to_process_heat_load_series_mmbtu_per_hour", dict(default=list)),
+    ("existingchilleroutputs", "thermal_to_storage_series_ton", dict(blank=True, null=True, default=list, help_text='Annual hourly time series of electric chiller thermal to cold TES [Ton]')),
+    ("existingchilleroutputs", "thermal_to_load_series_ton", dict(blank=True, null=True, default=list, help_text='Annual hourly time series of electric chiller thermal to cooling load [Ton]')),
+    ("existingchilleroutputs", "electric_consumption_series_kw", dict(blank=True, null=True, default=list, help_text='Annual hourly time series of chiller electric consumption [kW]')),
+    ("existingboileroutputs", "fuel_consumption_series_mmbtu_per_hour", dict(default=list)),
+    ("existingboileroutputs", "thermal_to_storage_series_mmbtu_per_hour", dict(default=list)),
+    ("existingboileroutputs", "thermal_to_steamturbine_series_mmbtu_per_hour", dict(default=list)),
+    ("existingboileroutputs", "thermal_production_series_mmbtu_per_hour", dict(default=list)),
+    ("existingboileroutputs", "thermal_to_load_series_mmbtu_per_hour", dict(default=list)),
+    ("existingboileroutputs", "thermal_to_dhw_load_series_mmbtu_per_hour", dict(default=list)),
+    ("existingboileroutputs", "thermal_to_space_heating_load_series_mmbtu_per_hour", dict(default=list)),
+    ("existingboileroutputs", "thermal_to_process_heat_load_series_mmbtu_per_hour", dict(default=list)),
+    ("electricheateroutputs", "electric_consumption_series_kw", dict(default=list)),
+    ("electricheateroutputs", "thermal_to_storage_series_mmbtu_per_hour", dict(default=list)),
+    ("electricheateroutputs", "thermal_to_steamturbine_series_mmbtu_per_hour", dict(default=list)),
+    ("electricheateroutputs", "thermal_production_series_mmbtu_per_hour", dict(default=list)),
+    ("electricheateroutputs", "thermal_to_load_series_mmbtu_per_hour", dict(default=list)),
+    ("electricheateroutputs", "thermal_to_dhw_load_series_mmbtu_per_hour", dict(default=list)),
+    ("electricheateroutputs", "thermal_to_space_heating_load_series_mmbtu_per_hour", dict(default=list)),
+    ("electricheateroutputs", "thermal_to_process_heat_load_series_mmbtu_per_hour", dict(default=list)),
+    ("ashpspaceheateroutputs", "electric_consumption_series_kw", dict(default=list)),
+    ("ashpspaceheateroutputs", "thermal_to_storage_series_mmbtu_per_hour", dict(default=list)),
+    ("ashpspaceheateroutputs", "thermal_production_series_mmbtu_per_hour", dict(default=list)),
+    ("ashpspaceheateroutputs", "thermal_to_load_series_mmbtu_per_hour", dict(default=list)),
+    ("ashpspaceheateroutputs", "thermal_to_space_heating_load_series_mmbtu_per_hour", dict(default=list)),
+    ("ashpspaceheateroutputs", "thermal_to_storage_series_ton", dict(default=list)),
+    ("ashpspaceheateroutputs", "thermal_to_load_series_ton", dict(default=list)),
+    ("ashpspaceheateroutputs", "electric_consumption_for_cooling_series_kw", dict(default=list)),
+    ("ashpspaceheateroutputs", "electric_consumption_for_heating_series_kw", dict(default=list)),
+    ("ashpwaterheateroutputs", "electric_consumption_series_kw", dict(default=list)),
+    ("ashpwaterheateroutputs", "thermal_to_storage_series_mmbtu_per_hour", dict(default=list)),
+    ("ashpwaterheateroutputs", "thermal_production_series_mmbtu_per_hour", dict(default=list)),
+    ("ashpwaterheateroutputs", "thermal_to_load_series_mmbtu_per_hour", dict(default=list)),
+    ("ashpwaterheateroutputs", "thermal_to_dhw_load_series_mmbtu_per_hour", dict(default=list)),
+    ("boileroutputs", "fuel_consumption_series_mmbtu_per_hour", dict(default=list)),
+    ("boileroutputs", "thermal_to_load_series_mmbtu_per_hour", dict(default=list)),
+    ("boileroutputs", "thermal_to_steamturbine_series_mmbtu_per_hour", dict(default=list)),
+    ("boileroutputs", "thermal_production_series_mmbtu_per_hour", dict(default=list)),
+    ("boileroutputs", "thermal_to_storage_series_mmbtu_per_hour", dict(default=list)),
+    ("boileroutputs", "thermal_to_dhw_load_series_mmbtu_per_hour", dict(default=list)),
+    ("boileroutputs", "thermal_to_space_heating_load_series_mmbtu_per_hour", dict(default=list)),
+    ("boileroutputs", "thermal_to_process_heat_load_series_mmbtu_per_hour", dict(default=list)),
+    ("steamturbineoutputs", "thermal_consumption_series_mmbtu_per_hour", dict(default=list)),
+    ("steamturbineoutputs", "electric_production_series_kw", dict(default=list)),
+    ("steamturbineoutputs", "electric_to_grid_series_kw", dict(default=list)),
+    ("steamturbineoutputs", "electric_to_storage_series_kw", dict(default=list)),
+    ("steamturbineoutputs", "electric_to_load_series_kw", dict(default=list)),
+    ("steamturbineoutputs", "thermal_to_storage_series_mmbtu_per_hour", dict(default=list)),
+    ("steamturbineoutputs", "thermal_to_load_series_mmbtu_per_hour", dict(default=list)),
+    ("steamturbineoutputs", "thermal_to_dhw_load_series_mmbtu_per_hour", dict(default=list)),
+    ("steamturbineoutputs", "thermal_to_space_heating_load_series_mmbtu_per_hour", dict(default=list)),
+    ("steamturbineoutputs", "thermal_to_process_heat_load_series_mmbtu_per_hour", dict(default=list)),
+    ("hotthermalstorageoutputs", "soc_series_fraction", dict(default=list)),
+    ("hotthermalstorageoutputs", "storage_to_load_series_mmbtu_per_hour", dict(default=list)),
+    ("hotthermalstorageoutputs", "storage_to_dhw_load_series_mmbtu_per_hour", dict(default=list)),
+    ("hotthermalstorageoutputs", "storage_to_space_heating_load_series_mmbtu_per_hour", dict(default=list)),
+    ("hotthermalstorageoutputs", "storage_to_process_heat_load_series_mmbtu_per_hour", dict(default=list)),
+    ("coldthermalstorageoutputs", "soc_series_fraction", dict(default=list)),
+    ("coldthermalstorageoutputs", "storage_to_load_series_ton", dict(default=list)),
+    ("absorptionchilleroutputs", "thermal_to_storage_series_ton", dict(blank=True, null=True, default=list, help_text='Year one hourly time series of absorption chiller thermal to cold TES [Ton]')),
+    ("absorptionchilleroutputs", "thermal_to_load_series_ton", dict(blank=True, null=True, default=list, help_text='Year one hourly time series of absorption chiller thermal to cooling load [Ton]')),
+    ("absorptionchilleroutputs", "thermal_consumption_series_mmbtu_per_hour", dict(blank=True, null=True, default=list, help_text='Year one hourly time series of absorption chiller electric consumption [kW]')),
+    ("absorptionchilleroutputs", "electric_consumption_series_kw", dict(blank=True, null=True, default=list, help_text='Year one hourly time series of absorption chiller electric consumption [kW]')),
+    ("ghpoutputs", "thermal_to_space_heating_load_series_mmbtu_per_hour", dict(blank=True, null=True, default=list)),
+    ("ghpoutputs", "thermal_to_dhw_load_series_mmbtu_per_hour", dict(blank=True, null=True, default=list)),
+    ("ghpoutputs", "thermal_to_load_series_ton", dict(blank=True, null=True, default=list)),
+]
+TMP_SUFFIX = "_compressed"
+
+
+def temporary_field_kwargs(kwargs):
+    # without a default, adding the column does not write the existing rows
+    return dict({k: v for k, v in kwargs.items() if k != "default"}, null=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reoptjl', '0094_runsummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name=model_name,
+            name=field_name + TMP_SUFFIX,
+            field=reoptjl.fields.CompressedSeriesField(**temporary_field_kwargs(kwargs)),
+        ) for model_name, field_name, kwargs in SERIES_FIELDS
+    ]
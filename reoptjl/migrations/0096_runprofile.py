@@ -0,0 +1,31 @@
+# Generated by Django 4.0.7 on 2026-10-17 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import reoptjl.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reoptjl', '0095_compressed_output_series'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RunProfile',
+            fields=[
+                ('meta', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='RunProfile', serialize=False, to='reoptjl.apimeta')),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('validation_seconds', models.FloatField(blank=True, help_text='InputValidator clean_fields, clean, and cross_clean.', null=True)),
+                ('input_save_seconds', models.FloatField(blank=True, help_text='Saving the validated inputs.', null=True)),
+                ('queue_wait_seconds', models.FloatField(blank=True, help_text='Time between the job being queued and a Celery worker starting it.', null=True)),
+                ('input_dict_seconds', models.FloatField(blank=True, help_text='Assembling the inputs sent to the Julia API.', null=True)),
+                ('julia_seconds', models.FloatField(blank=True, help_text='Julia API round trip, until the response headers are received (includes the optimization).', null=True)),
+                ('json_decode_seconds', models.FloatField(blank=True, help_text='Reading and decoding the Julia API response body.', null=True)),
+                ('update_inputs_seconds', models.FloatField(blank=True, help_text='Saving the inputs with defaults set in REopt.jl (update_inputs_in_database).', null=True)),
+                ('process_results_seconds', models.FloatField(blank=True, help_text='Saving the results (process_results).', null=True)),
+            ],
+            bases=(reoptjl.models.BaseModel, models.Model),
+        ),
+    ]
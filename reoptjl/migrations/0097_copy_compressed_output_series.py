@@ -0,0 +1,66 @@
+# Generated by Django 4.0.7 on 2026-10-17 12:00
+"""
+Copy the float8[] output time series into the CompressedSeriesField columns added in 0095, one committed transaction
+per batch of rows, so that each table is only locked for the rows of the current batch.
+
+Expected runtime: about 5 to 10 ms per stored hourly series (about 3 ms of which is the compression), i.e. 1 to 2
+minutes per 1,000 rows of a table with 10 hourly series. The migration is not atomic: if it is interrupted, run migrate again and it
+continues with the rows that were not copied yet. Stop the Celery workers until 0098 is applied, so that no results
+are saved to the float8[] columns after their rows are copied.
+"""
+from importlib import import_module
+from django.db import migrations, transaction
+from django.db.models import Q
+
+compressed_output_series = import_module("reoptjl.migrations.0095_compressed_output_series")
+SERIES_FIELDS = compressed_output_series.SERIES_FIELDS
+TMP_SUFFIX = compressed_output_series.TMP_SUFFIX
+BATCH_SIZE = 100
+
+
+def copy_series(apps, schema_editor, from_suffix, to_suffix, convert, only_missing):
+    fields_by_model = dict()
+    for model_name, field_name, _ in SERIES_FIELDS:
+        fields_by_model.setdefault(model_name, []).append(field_name)
+    for model_name, field_names in fields_by_model.items():
+        model = apps.get_model("reoptjl", model_name)
+        to_fields = [f + to_suffix for f in field_names]
+        rows = model.objects.only(*[f + from_suffix for f in field_names])
+        if only_missing:  # rows copied before an interruption are not copied again
+            missing = Q()
+            for f in to_fields:
+                missing |= Q(**{f + "__isnull": True})
+            rows = rows.filter(missing)
+        last_pk = None
+        while True:
+            batch_rows = rows if last_pk is None else rows.filter(pk__gt=last_pk)
+            batch = list(batch_rows.order_by("pk")[:BATCH_SIZE])
+            if not batch:
+                break
+            for obj in batch:
+                for f in field_names:
+                    setattr(obj, f + to_suffix, convert(getattr(obj, f + from_suffix)))
+            with transaction.atomic(using=schema_editor.connection.alias):
+                model.objects.bulk_update(batch, to_fields)
+            last_pk = batch[-1].pk
+
+
+def compress_series(apps, schema_editor):
+    copy_series(apps, schema_editor, "", TMP_SUFFIX, lambda v: v, only_missing=True)
+
+
+def decompress_series(apps, schema_editor):
+    copy_series(apps, schema_editor, TMP_SUFFIX, "", lambda v: None if v is None else v.tolist(), only_missing=False)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('reoptjl', '0096_runprofile'),
+    ]
+
+    operations = [
+        migrations.RunPython(compress_series, decompress_series),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.0.7 on 2026-10-17 12:00
+"""
+Replace the float8[] output time series columns with the CompressedSeriesField columns filled in 0097. Dropping and
+renaming columns only changes the catalog and setting NOT NULL scans each table once, so the locks are held for about
+as long as Django takes to compute the migration states (about 25 s), not for the minutes of the copy.
+"""
+from importlib import import_module
+from django.db import migrations
+import reoptjl.fields
+
+compressed_output_series = import_module("reoptjl.migrations.0095_compressed_output_series")
+SERIES_FIELDS = compressed_output_series.SERIES_FIELDS
+TMP_SUFFIX = compressed_output_series.TMP_SUFFIX
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reoptjl', '0097_copy_compressed_output_series'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name=model_name,
+            name=field_name,
+        ) for model_name, field_name, _ in SERIES_FIELDS
+    ] + [
+        migrations.RenameField(
+            model_name=model_name,
+            old_name=field_name + TMP_SUFFIX,
+            new_name=field_name,
+        ) for model_name, field_name, _ in SERIES_FIELDS
+    ] + [
+        migrations.AlterField(
+            model_name=model_name,
+            name=field_name,
+            field=reoptjl.fields.CompressedSeriesField(**kwargs),
+        ) for model_name, field_name, kwargs in SERIES_FIELDS
+    ]
@@ -9,12 +9,13 @@ from django.core.validators import MaxValueValidator, MinValueValidator
 from picklefield.fields import PickledObjectField
 import numpy
 from reoptjl.urdb_rate_validator import URDB_RateValidator,URDB_LabelValidator
-import copy
+from reoptjl.fields import CompressedSeriesField, Series
+from reo.src.model_dict import model_dict
 import logging
 import os
 import json
 from ghpghx.models import GHPGHXInputs
-from ghpghx.models import ModelManager as ghpModelManager
+from ghpghx.models import ModelManager as ghpModelManager, SOLVED as GHPGHX_SOLVED
 
 log = logging.getLogger(__name__)
 
@@ -107,11 +108,10 @@ class BaseModel(object):
         NOTE: to get correct field types you must run self.clean_fields() first (eg. convert int to float)
         :return: dict
         """
-        d = copy.deepcopy(self.__dict__)
-        d.pop("_state", None)
-        d.pop("id", None)
-        d.pop("basemodel_ptr_id", None)
-        d.pop("meta_id", None)
+        d = model_dict(self, exclude_keys=("id", "basemodel_ptr_id", "meta_id"))
+        for k, v in d.items():
+            if isinstance(v, Series):  # CompressedSeriesField values
+                d[k] = v.tolist()
         return d
 
     @classmethod
@@ -191,6 +191,13 @@ class APIMeta(BaseModel, models.Model):
         help_text=("The unique ID of a portfolio (set of associated runs) created by the REopt Webtool. Note that this ID can be shared by "
                    "several REopt API Scenarios and one user can have one-to-many portfolio_uuid tied to them.")
     )
+    input_hash = models.TextField(
+        blank=True,
+        default="",
+        db_index=True,
+        help_text=("SHA-256 hash of the validated inputs and the REopt.jl version, used to reuse the results of a previous run "
+                   "with identical inputs.")
+    )
 
 class UserUnlinkedRuns(models.Model):
     run_uuid = models.UUIDField(unique=True)
@@ -213,6 +220,76 @@ class PortfolioUnlinkedRuns(models.Model):
         obj.save()
         return obj
 
+class RunSummary(models.Model):
+    """
+    One row per run with the summary returned by the summary endpoints, so that they read a single table instead of
+    rebuilding the summary from all of the input and output models.
+    Written by reoptjl.src.run_summary.refresh_run_summaries when a job is created or completed and when the run is
+    linked to or unlinked from a user or portfolio.
+    """
+    meta = models.OneToOneField(
+        APIMeta,
+        on_delete=models.CASCADE,
+        related_name="RunSummary",
+        primary_key=True
+    )
+    run_uuid = models.UUIDField(unique=True)
+    user_uuid = models.TextField(blank=True, default="", db_index=True)
+    created = models.DateTimeField(db_index=True)
+    in_user_summary = models.BooleanField(
+        default=True,
+        help_text=("False if the run belongs to a portfolio (and has not been unlinked from it) or has been unlinked from "
+                   "the user, in which case it is not returned by the user summary endpoints.")
+    )
+    summary = models.JSONField(default=dict)
+
+class RunProfile(BaseModel, models.Model):
+    """
+    Wall-clock seconds spent in each stage of a v3 job, returned as "profile" in the results and aggregated by the
+    job/profile_stats endpoint. Written by reoptjl.src.run_profile.save_run_profile.
+    """
+    key = "Profile"
+
+    meta = models.OneToOneField(
+        APIMeta,
+        on_delete=models.CASCADE,
+        related_name="RunProfile",
+        primary_key=True
+    )
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+    validation_seconds = models.FloatField(
+        null=True, blank=True,
+        help_text="InputValidator clean_fields, clean, and cross_clean."
+    )
+    input_save_seconds = models.FloatField(
+        null=True, blank=True,
+        help_text="Saving the validated inputs."
+    )
+    queue_wait_seconds = models.FloatField(
+        null=True, blank=True,
+        help_text="Time between the job being queued and a Celery worker starting it."
+    )
+    input_dict_seconds = models.FloatField(
+        null=True, blank=True,
+        help_text="Assembling the inputs sent to the Julia API."
+    )
+    julia_seconds = models.FloatField(
+        null=True, blank=True,
+        help_text="Julia API round trip, until the response headers are received (includes the optimization)."
+    )
+    json_decode_seconds = models.FloatField(
+        null=True, blank=True,
+        help_text="Reading and decoding the Julia API response body."
+    )
+    update_inputs_seconds = models.FloatField(
+        null=True, blank=True,
+        help_text="Saving the inputs with defaults set in REopt.jl (update_inputs_in_database)."
+    )
+    process_results_seconds = models.FloatField(
+        null=True, blank=True,
+        help_text="Saving the results (process_results)."
+    )
+
 class UserProvidedMeta(BaseModel, models.Model):
     """
     User provided values that are not necessary for running REopt
@@ -1487,17 +1564,11 @@ class ElectricLoadOutputs(BaseModel, models.Model):
         related_name="ElectricLoadOutputs"
     )
 
-    load_series_kw = ArrayField(
-        models.FloatField(
-            null=True, blank=True
-        ),
+    load_series_kw = CompressedSeriesField(
         default=list,
         help_text="Annual time series of BAU electric load. Does not include electric load for any new heating or cooling techs."
     )
-    critical_load_series_kw = ArrayField(
-        models.FloatField(
-            null=True, blank=True
-        ),
+    critical_load_series_kw = CompressedSeriesField(
         default=list,
         help_text=("Hourly critical load for outage simulator. Values are either uploaded by user, "
                    "or determined from typical load (either uploaded or simulated) and critical_load_fraction.")
@@ -1522,24 +1593,15 @@ class ElectricLoadOutputs(BaseModel, models.Model):
         null=True, blank=True,
         help_text="Percentage of total electric load met on an annual basis, for off-grid scenarios only"
     )
-    offgrid_annual_oper_res_required_series_kwh = ArrayField(
-        models.FloatField(
-            null=True, blank=True
-        ),
+    offgrid_annual_oper_res_required_series_kwh = CompressedSeriesField(
         default=list,
         help_text="Total operating reserves required (for load and techs) on an annual basis, for off-grid scenarios only"
     )
-    offgrid_annual_oper_res_provided_series_kwh = ArrayField(
-        models.FloatField(
-            null=True, blank=True
-        ),
+    offgrid_annual_oper_res_provided_series_kwh = CompressedSeriesField(
         default=list,
         help_text="Total operating reserves provided on an annual basis, for off-grid scenarios only"
     )
-    offgrid_load_met_series_kw = ArrayField(
-        models.FloatField(
-            null=True, blank=True
-        ),
+    offgrid_load_met_series_kw = CompressedSeriesField(
         default=list,
         help_text="Percentage of total electric load met on an annual basis, for off-grid scenarios only"
     )
@@ -1743,15 +1805,11 @@ class ElectricTariffInputs(BaseModel, models.Model):
         NOTE: to get correct field types you must run self.clean_fields() first (eg. convert int to float)
         :return: dict
         """
-        d = copy.deepcopy(self.__dict__)
+        d = model_dict(self, exclude_keys=("id", "basemodel_ptr_id", "meta_id"))
         if "coincident_peak_load_active_time_steps" in d.keys():
             # filter out repeated values created to make the inner arrays have equal length
             d["coincident_peak_load_active_time_steps"] = \
                 [list(set(l)) for l in d["coincident_peak_load_active_time_steps"]]
-        d.pop("_state", None)
-        d.pop("id", None)
-        d.pop("basemodel_ptr_id", None)
-        d.pop("meta_id", None)
         return d
 
 
@@ -2036,24 +2094,15 @@ class ElectricUtilityOutputs(BaseModel, models.Model):
         primary_key=True
     )
 
-    electric_to_load_series_kw = ArrayField(
-        models.FloatField(
-            blank=True
-        ),
+    electric_to_load_series_kw = CompressedSeriesField(
         default=list, blank=True,
         help_text=("Optimal average annual grid to load time series")
     )
-    electric_to_load_series_kw_bau = ArrayField(
-        models.FloatField(
-            blank=True
-        ),
+    electric_to_load_series_kw_bau = CompressedSeriesField(
         default=list, blank=True,
         help_text=("Business as usual average annual grid to load time series")
     )
-    electric_to_storage_series_kw = ArrayField(
-        models.FloatField(
-            blank=True
-        ),
+    electric_to_storage_series_kw = CompressedSeriesField(
         default=list, blank=True,
         help_text=("Optimal average annual grid to battery time series")
     )
@@ -2200,7 +2249,7 @@ class ElectricUtilityOutputs(BaseModel, models.Model):
 
     def calculate_peak_demand(self):
         if self.electric_to_load_series_kw and self.electric_to_storage_series_kw:
-            self.peak_grid_demand_kw = max(self.electric_to_load_series_kw + self.electric_to_storage_series_kw)
+            self.peak_grid_demand_kw = max(max(self.electric_to_load_series_kw), max(self.electric_to_storage_series_kw))
         if self.electric_to_load_series_kw_bau:
             self.peak_grid_demand_kw_bau = max(self.electric_to_load_series_kw_bau)
 
@@ -3115,25 +3164,20 @@ class PVOutputs(BaseModel, models.Model):
     annual_energy_exported_kwh = models.FloatField(null=True, blank=True)
     year_one_energy_produced_kwh = models.FloatField(null=True, blank=True)
     year_one_energy_produced_kwh_bau = models.FloatField(null=True, blank=True)
-    electric_to_storage_series_kw = ArrayField(
-        models.FloatField(null=True, blank=True),
+    electric_to_storage_series_kw = CompressedSeriesField(
         blank=True, default=list
     )
-    electric_to_load_series_kw = ArrayField(
-        models.FloatField(null=True, blank=True),
+    electric_to_load_series_kw = CompressedSeriesField(
         blank=True, default=list
     )
-    electric_to_grid_series_kw = ArrayField(
-        models.FloatField(null=True, blank=True),
+    electric_to_grid_series_kw = CompressedSeriesField(
         blank=True, default=list
     )
-    electric_curtailed_series_kw = ArrayField(
-        models.FloatField(null=True, blank=True),
+    electric_curtailed_series_kw = CompressedSeriesField(
         blank=True, default=list
     )
     lcoe_per_kwh = models.FloatField(null=True, blank=True)
-    production_factor_series = ArrayField(
-        models.FloatField(null=True, blank=True),
+    production_factor_series = CompressedSeriesField(
         default=list, blank=True
     )
 
@@ -3437,17 +3481,12 @@ class WindOutputs(BaseModel, models.Model):
     year_one_om_cost_before_tax = models.FloatField(null=True, blank=True)
     annual_energy_produced_kwh = models.FloatField(null=True, blank=True)
     annual_energy_exported_kwh = models.FloatField(null=True, blank=True)
-    electric_to_storage_series_kw = ArrayField(
-            models.FloatField(null=True, blank=True), blank=True, default=list)
-    electric_to_load_series_kw = ArrayField(
-            models.FloatField(null=True, blank=True), blank=True, default=list)
-    electric_to_grid_series_kw = ArrayField(
-            models.FloatField(null=True, blank=True), blank=True, default=list)
-    electric_curtailed_series_kw = ArrayField(
-            models.FloatField(null=True, blank=True), blank=True, default=list)
+    electric_to_storage_series_kw = CompressedSeriesField(blank=True, default=list)
+    electric_to_load_series_kw = CompressedSeriesField(blank=True, default=list)
+    electric_to_grid_series_kw = CompressedSeriesField(blank=True, default=list)
+    electric_curtailed_series_kw = CompressedSeriesField(blank=True, default=list)
     lcoe_per_kwh = models.FloatField(null=True, blank=True)
-    production_factor_series = ArrayField(
-        models.FloatField(null=True, blank=True),
+    production_factor_series = CompressedSeriesField(
         default=list, blank=True
     )
 
@@ -3728,12 +3767,10 @@ class ElectricStorageOutputs(BaseModel, models.Model):
     )
     size_kw = models.FloatField(null=True, blank=True)
     size_kwh = models.FloatField(null=True, blank=True)
-    soc_series_fraction = ArrayField(
-        models.FloatField(null=True, blank=True),
+    soc_series_fraction = CompressedSeriesField(
         blank=True, default=list
     )
-    storage_to_load_series_kw = ArrayField(
-        models.FloatField(null=True, blank=True),
+    storage_to_load_series_kw = CompressedSeriesField(
         blank=True, default=list
     )
     initial_capital_cost = models.FloatField(null=True, blank=True)
@@ -4132,12 +4169,9 @@ class GeneratorOutputs(BaseModel, models.Model):
     annual_fuel_consumption_gal_bau = models.FloatField(null=True, blank=True)
     size_kw = models.FloatField(null=True, blank=True)
     annual_energy_produced_kwh = models.FloatField(null=True, blank=True)
-    electric_to_storage_series_kw = ArrayField(
-            models.FloatField(null=True, blank=True), null=True, blank=True)
-    electric_to_load_series_kw = ArrayField(
-            models.FloatField(null=True, blank=True), null=True, blank=True, default=list)
-    electric_to_grid_series_kw = ArrayField(
-            models.FloatField(null=True, blank=True), null=True, blank=True, default=list)
+    electric_to_storage_series_kw = CompressedSeriesField(null=True, blank=True)
+    electric_to_load_series_kw = CompressedSeriesField(null=True, blank=True, default=list)
+    electric_to_grid_series_kw = CompressedSeriesField(null=True, blank=True, default=list)
     year_one_variable_om_cost_before_tax = models.FloatField(null=True, blank=True)
     year_one_variable_om_cost_before_tax_bau = models.FloatField(null=True, blank=True)
     year_one_fuel_cost_before_tax = models.FloatField(null=True, blank=True)
@@ -4705,59 +4739,35 @@ class CHPOutputs(BaseModel, models.Model):
         null=True, blank=True,
         help_text="Thermal energy produced in a year [MMBtu]"
     )
-    electric_production_series_kw = ArrayField(
-        models.FloatField(
-            null=True, blank=True
-        ),
+    electric_production_series_kw = CompressedSeriesField(
         default=list, blank=True,
         help_text="Electric power production time-series array [kW]"
     )
-    electric_to_grid_series_kw = ArrayField(
-        models.FloatField(
-            null=True, blank=True
-        ),
+    electric_to_grid_series_kw = CompressedSeriesField(
         default=list, blank=True,
         help_text="Electric power exported time-series array [kW]"
     )
-    electric_to_storage_series_kw = ArrayField(
-        models.FloatField(
-            null=True, blank=True
-        ),
+    electric_to_storage_series_kw = CompressedSeriesField(
         default=list, blank=True,
         help_text="Electric power to charge the battery storage time-series array [kW]"
     )
-    electric_to_load_series_kw = ArrayField(
-        models.FloatField(
-            null=True, blank=True
-        ),
+    electric_to_load_series_kw = CompressedSeriesField(
         default=list, blank=True,
         help_text="Electric power serving the electric load time-series array [kW]"
     )
-    thermal_to_storage_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(
-            null=True, blank=True
-        ),
+    thermal_to_storage_series_mmbtu_per_hour = CompressedSeriesField(
         default=list, blank=True,
         help_text="Thermal power to TES time-series array [MMBtu/hr]"
     )
-    thermal_curtailed_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(
-            null=True, blank=True
-        ),
+    thermal_curtailed_series_mmbtu_per_hour = CompressedSeriesField(
         default=list, blank=True,
         help_text="Thermal power wasted/unused/vented time-series array [MMBtu/hr]"
     )
-    thermal_to_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(
-            null=True, blank=True
-        ),
+    thermal_to_load_series_mmbtu_per_hour = CompressedSeriesField(
         default=list, blank=True,
         help_text="Thermal power to serve the heating load time-series array [MMBtu/hr]"
     )
-    thermal_to_steamturbine_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(
-            null=True, blank=True
-        ),
+    thermal_to_steamturbine_series_mmbtu_per_hour = CompressedSeriesField(
         default=list, blank=True,
         help_text="Thermal power to steam turbine time-series array [MMBtu/hr]"
     )    
@@ -4785,20 +4795,16 @@ class CHPOutputs(BaseModel, models.Model):
         null=True, blank=True,
         help_text="Present value of all CHP standby charges, after tax."
     )
-    thermal_production_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_production_series_mmbtu_per_hour = CompressedSeriesField(
         default = list,
     )
-    thermal_to_dhw_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_dhw_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list,
     )
-    thermal_to_space_heating_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_space_heating_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list,
     )
-    thermal_to_process_heat_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_process_heat_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list,
     )
     initial_capital_costs = models.FloatField(
@@ -5104,30 +5110,21 @@ class ExistingChillerOutputs(BaseModel, models.Model):
     size_ton = models.FloatField(null=True, blank=True)
     size_ton_bau = models.FloatField(null=True, blank=True)
 
-    thermal_to_storage_series_ton = ArrayField(
-        models.FloatField(
-            blank=True
-        ),
+    thermal_to_storage_series_ton = CompressedSeriesField(
         default=list,
         blank=True,
         null=True,
         help_text=("Annual hourly time series of electric chiller thermal to cold TES [Ton]")
     )
 
-    thermal_to_load_series_ton = ArrayField(
-        models.FloatField(
-            blank=True
-        ),
+    thermal_to_load_series_ton = CompressedSeriesField(
         default=list,
         blank=True,
         null=True,
         help_text=("Annual hourly time series of electric chiller thermal to cooling load [Ton]")
     )
 
-    electric_consumption_series_kw = ArrayField(
-        models.FloatField(
-            blank=True
-        ),
+    electric_consumption_series_kw = CompressedSeriesField(
         default=list,
         blank=True,
         null=True,
@@ -5397,8 +5394,7 @@ class ExistingBoilerOutputs(BaseModel, models.Model):
     annual_fuel_consumption_mmbtu = models.FloatField(null=True, blank=True)
     annual_fuel_consumption_mmbtu_bau = models.FloatField(null=True, blank=True)
 
-    fuel_consumption_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    fuel_consumption_series_mmbtu_per_hour = CompressedSeriesField(
         default=list,
     )
 
@@ -5411,38 +5407,31 @@ class ExistingBoilerOutputs(BaseModel, models.Model):
     year_one_fuel_cost_before_tax_bau = models.FloatField(null=True, blank=True)
     year_one_fuel_cost_after_tax_bau = models.FloatField(null=True, blank=True)
 
-    thermal_to_storage_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_storage_series_mmbtu_per_hour = CompressedSeriesField(
         default = list,
     )
 
-    thermal_to_steamturbine_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_steamturbine_series_mmbtu_per_hour = CompressedSeriesField(
         default = list,
     )
 
-    thermal_production_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_production_series_mmbtu_per_hour = CompressedSeriesField(
         default = list,
     )
 
-    thermal_to_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list,
     )
 
-    thermal_to_dhw_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_dhw_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
-    thermal_to_space_heating_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_space_heating_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
-    thermal_to_process_heat_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_process_heat_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
@@ -5575,45 +5564,37 @@ class ElectricHeaterOutputs(BaseModel, models.Model):
     size_mmbtu_per_hour = models.FloatField(null=True, blank=True)
     annual_electric_consumption_kwh = models.FloatField(null=True, blank=True)
 
-    electric_consumption_series_kw = ArrayField(
-        models.FloatField(null=True, blank=True),
+    electric_consumption_series_kw = CompressedSeriesField(
         default=list,
     )
 
     annual_thermal_production_mmbtu = models.FloatField(null=True, blank=True)
 
-    thermal_to_storage_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_storage_series_mmbtu_per_hour = CompressedSeriesField(
         default = list,
     )
 
-    thermal_to_steamturbine_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_steamturbine_series_mmbtu_per_hour = CompressedSeriesField(
         default = list,
     )
 
-    thermal_production_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_production_series_mmbtu_per_hour = CompressedSeriesField(
         default = list,
     )
 
-    thermal_to_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list,
     )
 
-    thermal_to_dhw_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_dhw_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
-    thermal_to_space_heating_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_space_heating_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
-    thermal_to_process_heat_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_process_heat_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
@@ -5868,41 +5849,34 @@ class ASHPSpaceHeaterOutputs(BaseModel, models.Model):
     size_ton = models.FloatField(null=True, blank=True)
     annual_electric_consumption_kwh = models.FloatField(null=True, blank=True)
 
-    electric_consumption_series_kw = ArrayField(
-        models.FloatField(null=True, blank=True),
+    electric_consumption_series_kw = CompressedSeriesField(
         default=list
     )
 
     annual_thermal_production_mmbtu = models.FloatField(null=True, blank=True)
     annual_thermal_production_tonhour = models.FloatField(null=True, blank=True)
 
-    thermal_to_storage_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_storage_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
-    thermal_production_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_production_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
-    thermal_to_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
-    thermal_to_space_heating_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_space_heating_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
-    thermal_to_storage_series_ton = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_storage_series_ton = CompressedSeriesField(
         default = list
     )
 
-    thermal_to_load_series_ton = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_load_series_ton = CompressedSeriesField(
         default = list
     )
 
@@ -5926,13 +5900,11 @@ class ASHPSpaceHeaterOutputs(BaseModel, models.Model):
         default = list
     )
 
-    electric_consumption_for_cooling_series_kw = ArrayField(
-        models.FloatField(null=True, blank=True),
+    electric_consumption_for_cooling_series_kw = CompressedSeriesField(
         default = list
     )
 
-    electric_consumption_for_heating_series_kw = ArrayField(
-        models.FloatField(null=True, blank=True),
+    electric_consumption_for_heating_series_kw = CompressedSeriesField(
         default = list
     )
 
@@ -6138,30 +6110,25 @@ class ASHPWaterHeaterOutputs(BaseModel, models.Model):
     size_ton = models.FloatField(null=True, blank=True)
     annual_electric_consumption_kwh = models.FloatField(null=True, blank=True)
 
-    electric_consumption_series_kw = ArrayField(
-        models.FloatField(null=True, blank=True),
+    electric_consumption_series_kw = CompressedSeriesField(
         default=list
     )
 
     annual_thermal_production_mmbtu = models.FloatField(null=True, blank=True)
 
-    thermal_to_storage_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_storage_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
-    thermal_production_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_production_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
-    thermal_to_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
-    thermal_to_dhw_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_dhw_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
@@ -6380,13 +6347,11 @@ class BoilerOutputs(BaseModel, models.Model):
         primary_key=True
     )
 
-    fuel_consumption_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    fuel_consumption_series_mmbtu_per_hour = CompressedSeriesField(
         default = list,
     )
 
-    thermal_to_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list,
     )
 
@@ -6398,18 +6363,15 @@ class BoilerOutputs(BaseModel, models.Model):
         null=True, blank=True
     )    
 
-    thermal_to_steamturbine_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_steamturbine_series_mmbtu_per_hour = CompressedSeriesField(
         default = list,
     )
 
-    thermal_production_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_production_series_mmbtu_per_hour = CompressedSeriesField(
         default = list,
     )
 
-    thermal_to_storage_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_storage_series_mmbtu_per_hour = CompressedSeriesField(
         default = list,
     )
 
@@ -6427,18 +6389,15 @@ class BoilerOutputs(BaseModel, models.Model):
 
     annual_thermal_production_mmbtu = models.FloatField(null=True, blank=True)
 
-    thermal_to_dhw_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_dhw_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
-    thermal_to_space_heating_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_space_heating_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
-    thermal_to_process_heat_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_process_heat_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
@@ -6742,53 +6701,43 @@ class SteamTurbineOutputs(BaseModel, models.Model):
         null=True, blank=True
     )
 
-    thermal_consumption_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_consumption_series_mmbtu_per_hour = CompressedSeriesField(
         default = list,
     )
 
-    electric_production_series_kw = ArrayField(
-        models.FloatField(null=True, blank=True),
+    electric_production_series_kw = CompressedSeriesField(
         default = list,
     )
 
-    electric_to_grid_series_kw = ArrayField(
-        models.FloatField(null=True, blank=True),
+    electric_to_grid_series_kw = CompressedSeriesField(
         default = list,
     )
 
-    electric_to_storage_series_kw = ArrayField(
-        models.FloatField(null=True, blank=True),
+    electric_to_storage_series_kw = CompressedSeriesField(
         default = list,
     )
 
-    electric_to_load_series_kw = ArrayField(
-        models.FloatField(null=True, blank=True),
+    electric_to_load_series_kw = CompressedSeriesField(
         default = list,
     )
 
-    thermal_to_storage_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_storage_series_mmbtu_per_hour = CompressedSeriesField(
         default = list,
     )
 
-    thermal_to_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list,
     )
 
-    thermal_to_dhw_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_dhw_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
-    thermal_to_space_heating_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_space_heating_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
-    thermal_to_process_heat_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    thermal_to_process_heat_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
@@ -6969,26 +6918,21 @@ class HotThermalStorageOutputs(BaseModel, models.Model):
         primary_key=True
     )
     size_gal = models.FloatField(null=True, blank=True)
-    soc_series_fraction = ArrayField(
-        models.FloatField(null=True, blank=True),
+    soc_series_fraction = CompressedSeriesField(
         default = list,
     )
-    storage_to_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    storage_to_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list,
     )
-    storage_to_dhw_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    storage_to_dhw_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
-    storage_to_space_heating_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    storage_to_space_heating_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
-    storage_to_process_heat_load_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(null=True, blank=True),
+    storage_to_process_heat_load_series_mmbtu_per_hour = CompressedSeriesField(
         default = list
     )
 
@@ -7154,12 +7098,10 @@ class ColdThermalStorageOutputs(BaseModel, models.Model):
         primary_key=True
     )
     size_gal = models.FloatField(null=True, blank=True)
-    soc_series_fraction = ArrayField(
-        models.FloatField(null=True, blank=True),
+    soc_series_fraction = CompressedSeriesField(
         default = list,
     )
-    storage_to_load_series_ton = ArrayField(
-        models.FloatField(null=True, blank=True),
+    storage_to_load_series_ton = CompressedSeriesField(
         default = list,
     )
 
@@ -8090,30 +8032,21 @@ class AbsorptionChillerOutputs(BaseModel, models.Model):
         help_text="Thermal power capacity of the absorption chiller [ton]"
     )
 
-    thermal_to_storage_series_ton = ArrayField(
-        models.FloatField(
-            blank=True
-        ),
+    thermal_to_storage_series_ton = CompressedSeriesField(
         default=list,
         blank=True,
         null=True,
         help_text=("Year one hourly time series of absorption chiller thermal to cold TES [Ton]")
     )
 
-    thermal_to_load_series_ton = ArrayField(
-        models.FloatField(
-            blank=True
-        ),
+    thermal_to_load_series_ton = CompressedSeriesField(
         default=list,
         blank=True,
         null=True,
         help_text=("Year one hourly time series of absorption chiller thermal to cooling load [Ton]")
     )
 
-    thermal_consumption_series_mmbtu_per_hour = ArrayField(
-        models.FloatField(
-            blank=True
-        ),
+    thermal_consumption_series_mmbtu_per_hour = CompressedSeriesField(
         default=list,
         blank=True,
         null=True,
@@ -8131,10 +8064,7 @@ class AbsorptionChillerOutputs(BaseModel, models.Model):
         blank=True,
         help_text=("Year one absorption chiller thermal production [Ton Hour")
     )
-    electric_consumption_series_kw = ArrayField(
-        models.FloatField(
-            blank=True
-        ),
+    electric_consumption_series_kw = CompressedSeriesField(
         default=list,
         blank=True,
         null=True,
@@ -8553,7 +8483,14 @@ class GHPInputs(BaseModel, models.Model):
         if self.ghpghx_response_uuids not in [None, []]:
             self.ghpghx_responses = []
             for ghp_uuid in self.ghpghx_response_uuids:
-                self.ghpghx_responses.append(ghpModelManager.make_response(ghp_uuid))
+                ghpghx_response = ghpModelManager.make_response(ghp_uuid)
+                # POST /ghpghx returns before the GHX is sized, so the design may still be solving or have failed
+                if ghpghx_response.pop("status", None) != GHPGHX_SOLVED or not ghpghx_response.get("outputs"):
+                    error_messages["ghpghx_response_uuids"] = (
+                        "ghp_uuid {} is not solved: GET /ghpghx/{}/results until its status is {}".format(
+                            ghp_uuid, ghp_uuid, GHPGHX_SOLVED))
+                    raise ValidationError(error_messages)
+                self.ghpghx_responses.append(ghpghx_response)
             # Remove this field from the POST because it's only relevant for the API and will throw an error in REopt.jl
             self.ghpghx_response_uuids = None
 
@@ -8577,9 +8514,9 @@ class GHPOutputs(BaseModel, models.Model):
     cooling_thermal_load_reduction_with_ghp_ton = ArrayField(
             models.FloatField(null=True, blank=True), default=list, null=True, blank=True)
     ghx_residual_value_present_value = models.FloatField(null=True, blank=True)
-    thermal_to_space_heating_load_series_mmbtu_per_hour = ArrayField(models.FloatField(null=True, blank=True), default=list, null=True, blank=True)
-    thermal_to_dhw_load_series_mmbtu_per_hour = ArrayField(models.FloatField(null=True, blank=True), default=list, null=True, blank=True)
-    thermal_to_load_series_ton = ArrayField(models.FloatField(null=True, blank=True), default=list, null=True, blank=True)
+    thermal_to_space_heating_load_series_mmbtu_per_hour = CompressedSeriesField(default=list, null=True, blank=True)
+    thermal_to_dhw_load_series_mmbtu_per_hour = CompressedSeriesField(default=list, null=True, blank=True)
+    thermal_to_load_series_ton = CompressedSeriesField(default=list, null=True, blank=True)
     avoided_capex_by_ghp_present_value = models.FloatField(null=True, blank=True) 
     annual_thermal_production_mmbtu = models.FloatField(null=True, blank=True)
     annual_thermal_production_tonhour = models.FloatField(null=True, blank=True)
@@ -8684,6 +8621,38 @@ def get_input_dict_from_run_uuid(run_uuid:str):
 
     return d
 
+# input models in the dict for REopt.run_reopt, see get_input_dict_from_run_uuid
+INPUT_DICT_MODELS = (
+    Settings, FinancialInputs, SiteInputs, ElectricLoadInputs, PVInputs, ElectricTariffInputs, ElectricUtilityInputs,
+    ElectricStorageInputs, GeneratorInputs, WindInputs, CoolingLoadInputs, ExistingChillerInputs, BoilerInputs,
+    ExistingBoilerInputs, SpaceHeatingLoadInputs, DomesticHotWaterLoadInputs, ProcessHeatLoadInputs,
+    HotThermalStorageInputs, ColdThermalStorageInputs, CHPInputs, SteamTurbineInputs, AbsorptionChillerInputs,
+    GHPInputs, ElectricHeaterInputs, ASHPSpaceHeaterInputs, ASHPWaterHeaterInputs
+)
+
+def get_input_dict_from_models(meta: APIMeta, input_models) -> dict:
+    """
+    Construct the input dict for REopt.run_reopt from saved input model objects, eg. InputValidator.models after
+    InputValidator.save, without reading them back from the database. Same as get_input_dict_from_run_uuid.
+    """
+    def filter_none_and_empty_array(d:dict):
+        return {k: v for (k, v) in d.items() if v not in [None, [], {}]}
+
+    d = dict()
+    d["user_uuid"] = meta.user_uuid
+    d["api_key"] = meta.api_key
+    pvs = []
+    for model in input_models:
+        if isinstance(model, PVInputs):
+            pvs.append(filter_none_and_empty_array(model.dict))
+        elif isinstance(model, INPUT_DICT_MODELS):
+            d[model.key] = filter_none_and_empty_array(model.dict)
+    if len(pvs) == 1:
+        d["PV"] = pvs[0]
+    elif len(pvs) > 1:
+        d["PV"] = pvs
+    return d
+
 '''
 If a scalar was provided where API expects a vector, extend it to 8760
 Upsampling handled in InputValidator.cross_clean
@@ -0,0 +1,139 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+"""
+Creation of several v3 jobs from one POST to the job/batch endpoint: all scenarios are validated, then saved in one
+transaction (nothing is saved if any is invalid), and the runs are queued as a Celery group of at most max_concurrency
+lanes, each of which runs its jobs one after the other.
+"""
+import logging
+import os
+import time
+import uuid
+from celery import group
+from django.db import transaction
+from reoptjl.models import APIMeta, Message, RunProfile
+from reoptjl.validators import InputValidator, validate_ghpghx_inputs
+from reoptjl.src.process_results import bulk_save_models
+from reoptjl.src.reuse_results import reuse_results_requested, hash_inputs, find_reusable_run, copy_results
+from reoptjl.src.run_jump_model import run_jump_model_lane
+from reoptjl.src.run_profile import StageTimer
+from reoptjl.src.input_handoff import hand_off, inline_max_bytes
+from reoptjl.src.run_summary import refresh_run_summaries
+log = logging.getLogger(__name__)
+
+MAX_BATCH_SCENARIOS = int(os.environ.get("REOPT_MAX_BATCH_SCENARIOS", 100))
+DEFAULT_BATCH_CONCURRENCY = int(os.environ.get("REOPT_BATCH_CONCURRENCY", 4))
+MAX_BATCH_CONCURRENCY = int(os.environ.get("REOPT_MAX_BATCH_CONCURRENCY", DEFAULT_BATCH_CONCURRENCY))
+
+
+class BatchValidationError(Exception):
+    """
+    Raised by create_batch when one or more scenarios are invalid, with the input_errors of each invalid scenario
+    (by index in the scenarios list)
+    """
+
+    def __init__(self, errors: dict):
+        super().__init__("Invalid inputs in scenarios {}.".format(", ".join(str(i) for i in errors)))
+        self.errors = errors
+
+
+def lanes(run_uuids: list, max_concurrency: int) -> list:
+    """
+    Split run_uuids round-robin into at most max_concurrency lists
+    """
+    n = max(1, min(max_concurrency, len(run_uuids)))
+    return [run_uuids[i::n] for i in range(n)]
+
+
+def lane_handoffs(lane: list, models: dict) -> dict:
+    """
+    Hand off the inputs of the run_uuids of lane, with at most inline_max_bytes() of input JSON embedded in the lane's
+    task message in total. The other inputs are handed off in Redis (or read from the database by run_jump_model).
+    :param models: dict of run_uuid to the saved InputValidator.models
+    :return: dict of run_uuid to the run_jump_model keyword arguments
+    """
+    handoffs = dict()
+    inline_bytes_left = inline_max_bytes()
+    for run_uuid in lane:
+        handoffs[run_uuid] = hand_off(run_uuid, models[run_uuid]["APIMeta"], models[run_uuid].values(),
+                                      max_inline_bytes=inline_bytes_left)
+        inline_bytes_left -= len(handoffs[run_uuid].get("input_json", ""))
+    return handoffs
+
+
+def create_batch(scenarios: list, meta_fields: dict) -> list:
+    """
+    Validate the inputs of all scenarios, then save them in one transaction.
+    :param scenarios: list of POSTed scenario dicts, as for the job endpoint
+    :param meta_fields: APIMeta fields shared by all scenarios, eg. user_uuid, portfolio_uuid, job_type
+    :return: list of the saved InputValidators, in the order of scenarios
+    :raises BatchValidationError: if any scenario is invalid (nothing is saved)
+    """
+    metas = [APIMeta.create(run_uuid=str(uuid.uuid4()), api_version=3, status="Optimizing...", **meta_fields)
+             for _ in scenarios]
+    validators, timers, errors = [], [], dict()
+    for i, (scenario, meta) in enumerate(zip(scenarios, metas)):
+        timer = StageTimer()
+        with timer.stage("validation"):
+            scenario = dict(scenario, APIMeta={"run_uuid": meta.run_uuid})
+            validator = InputValidator(scenario, ghpghx_inputs_validation_errors=validate_ghpghx_inputs(scenario),
+                                       meta=meta)
+            for step in (validator.clean_fields, validator.clean, validator.cross_clean):
+                step()
+                if not validator.is_valid:
+                    errors[i] = validator.validation_errors
+                    break
+        validators.append(validator)
+        timers.append(timer)
+    if errors:
+        raise BatchValidationError(errors)
+    for meta, validator in zip(metas, validators):
+        meta.input_hash = hash_inputs(validator.validated_input_dict)
+
+    with transaction.atomic():
+        t_start = time.perf_counter()
+        APIMeta.objects.bulk_create(metas)
+        input_models, messages = [], []
+        for validator in validators:
+            input_models += [m for m in validator.models.values() if not isinstance(m, APIMeta)]
+            messages += [Message.create(meta=validator.models["APIMeta"], message_type=msg_type, message=msg)
+                         for msg_type, msg in validator.messages.items()]
+        bulk_save_models(input_models + messages)
+        input_save_seconds = (time.perf_counter() - t_start) / len(validators)
+        for timer in timers:
+            timer.add("input_save", input_save_seconds)
+        RunProfile.objects.bulk_create([RunProfile(meta=meta, **timer.seconds) for meta, timer in zip(metas, timers)])
+    return validators
+
+
+def submit_batch(scenarios: list, meta_fields: dict, max_concurrency: int = DEFAULT_BATCH_CONCURRENCY) -> list:
+    """
+    Create the jobs of scenarios (see create_batch) and queue the ones that do not reuse earlier results as one Celery
+    group of at most max_concurrency lanes.
+    :return: list of run_uuids, in the order of scenarios
+    :raises BatchValidationError: if any scenario is invalid (nothing is saved or queued)
+    """
+    validators = create_batch(scenarios, meta_fields)
+    metas = [v.models["APIMeta"] for v in validators]
+    run_uuids = [str(meta.run_uuid) for meta in metas]
+
+    to_run, models = [], dict()
+    for scenario, validator in zip(scenarios, validators):
+        meta = validator.models["APIMeta"]
+        run_uuid = str(meta.run_uuid)
+        if reuse_results_requested(scenario):
+            reusable_meta = find_reusable_run(meta.input_hash, run_uuid, meta.user_uuid)
+            if reusable_meta is not None:
+                try:
+                    copy_results(reusable_meta, run_uuid)
+                    continue
+                except Exception as e:  # fall back to running the optimization
+                    log.warning("Could not reuse results of run_uuid {}: {}".format(reusable_meta.run_uuid, e))
+        to_run.append(run_uuid)
+        models[run_uuid] = validator.models
+
+    refresh_run_summaries(APIMeta.objects.filter(run_uuid__in=run_uuids))
+    if to_run:
+        queued_at = time.time()
+        group(run_jump_model_lane.s(lane, queued_at=queued_at, handoffs=lane_handoffs(lane, models))
+              for lane in lanes(to_run, max_concurrency)).apply_async()
+    return run_uuids
@@ -0,0 +1,85 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+"""
+Handoff of the validated input dict from the job endpoints to run_jump_model, which otherwise reads every input model
+back with get_input_dict_from_run_uuid. The mode is selected with REOPT_INPUT_HANDOFF:
+    "inline" (default): the JSON is a keyword argument of the Celery task, if it is at most
+        REOPT_INPUT_HANDOFF_MAX_BYTES, and handed off in Redis otherwise
+    "redis": the JSON is stored in Redis (the Celery broker's, or REOPT_INPUT_HANDOFF_REDIS_URL) under the run_uuid for
+        REOPT_INPUT_HANDOFF_TTL_SECONDS and deleted when the task reads it
+    "none": always read the inputs from the database
+run_jump_model falls back to the database when there is no handoff or it cannot be read.
+"""
+import json
+import logging
+import os
+from reoptjl.models import get_input_dict_from_models
+log = logging.getLogger(__name__)
+
+KEY_PREFIX = "reopt_input_handoff:"
+
+
+def handoff_mode() -> str:
+    return os.environ.get("REOPT_INPUT_HANDOFF", "inline").lower()
+
+
+def inline_max_bytes() -> int:
+    return int(os.environ.get("REOPT_INPUT_HANDOFF_MAX_BYTES", 512 * 1024))
+
+
+def _redis():
+    import redis
+    url = os.environ.get("REOPT_INPUT_HANDOFF_REDIS_URL")
+    if url is None:
+        from reopt_api.celery import app
+        url = app.conf.broker_url
+    return redis.Redis.from_url(url)
+
+
+def _json_default(o):
+    if hasattr(o, "tolist"):  # numpy arrays and scalars, Series
+        return o.tolist()
+    return str(o)  # eg. UUID
+
+
+def hand_off(run_uuid: str, meta, input_models, max_inline_bytes: int = None) -> dict:
+    """
+    :param meta: saved APIMeta of run_uuid
+    :param input_models: saved input model objects of run_uuid (other models are ignored)
+    :param max_inline_bytes: int, largest JSON embedded in the task message, default inline_max_bytes()
+    :return: dict of keyword arguments for run_jump_model, empty if the inputs should be read from the database
+    """
+    mode = handoff_mode()
+    if mode not in ("inline", "redis"):
+        return dict()
+    if max_inline_bytes is None:
+        max_inline_bytes = inline_max_bytes()
+    try:
+        input_json = json.dumps(get_input_dict_from_models(meta, input_models), default=_json_default)
+        if mode == "inline" and len(input_json) <= max_inline_bytes:  # ASCII JSON, so one byte per character
+            return {"input_json": input_json}
+        _redis().set(KEY_PREFIX + str(run_uuid), input_json,
+                     ex=int(os.environ.get("REOPT_INPUT_HANDOFF_TTL_SECONDS", 24 * 3600)))
+        return {"input_handoff": "redis"}
+    except Exception as e:  # run_jump_model reads the inputs from the database
+        log.warning("Could not hand off the inputs of run_uuid {}: {}".format(run_uuid, e))
+        return dict()
+
+
+def take_input_dict(run_uuid: str, input_json: str = None, input_handoff: str = None):
+    """
+    :param input_json: JSON from hand_off in "inline" mode
+    :param input_handoff: "redis" if hand_off stored the JSON in Redis
+    :return: input dict for REopt.run_reopt, or None if there is no (readable) handoff
+    """
+    try:
+        if input_handoff == "redis":
+            pipe = _redis().pipeline()
+            pipe.get(KEY_PREFIX + str(run_uuid))
+            pipe.delete(KEY_PREFIX + str(run_uuid))
+            input_json = pipe.execute()[0]
+        if input_json is None:
+            return None
+        return json.loads(input_json)
+    except Exception as e:  # run_jump_model reads the inputs from the database
+        log.warning("Could not read the handed off inputs of run_uuid {}: {}".format(run_uuid, e))
+        return None
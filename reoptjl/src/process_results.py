@@ -9,16 +9,32 @@ from reoptjl.models import FinancialOutputs, APIMeta, PVOutputs, ElectricStorage
                         SteamTurbineOutputs, GHPInputs, GHPOutputs, ExistingChillerInputs, \
                         ElectricHeaterOutputs, ASHPSpaceHeaterOutputs, ASHPWaterHeaterOutputs, \
                         SiteInputs, ASHPSpaceHeaterInputs, ASHPWaterHeaterInputs, PVInputs
+from reoptjl.src.typed_json import register_series_adapters
+from reoptjl.src.run_summary import refresh_run_summary
+from reo.exceptions import UnexpectedError
 import numpy as np
+from django.apps import apps
+from django.db import models, transaction
 import sys
 import traceback as tb
 import logging
 log = logging.getLogger(__name__)
 
+register_series_adapters()  # results may hold array('d') and numpy series, see reoptjl.src.typed_json
+
+# JSONField values cannot be encoded from typed series buffers, so they are decoded from Julia responses as lists
+JSON_FIELD_NAMES = tuple(set(
+    field.name for model in apps.get_app_config("reoptjl").get_models() for field in model._meta.get_fields()
+    if isinstance(getattr(field, "base_field", field), models.JSONField)
+))
+
 def process_results(results: dict, run_uuid: str) -> None:
     """
     Saves the results returned from the Julia API in the backend database.
+    The status and all output models are written in one transaction, with one bulk INSERT per model, so that readers
+    never see partially saved results.
     Called in reoptjl/run_jump_model (a celery task)
+    Raises UnexpectedError if the results cannot be saved.
     """
     try:
         keys_to_skip = []
@@ -26,46 +42,46 @@ def process_results(results: dict, run_uuid: str) -> None:
 
         meta = APIMeta.objects.get(run_uuid=run_uuid)
         meta.status = results.get("status")
-        meta.save(update_fields=["status"])
+        output_models = []
 
         if "Messages" in results.keys():
-            REoptjlMessageOutputs.create(meta=meta, **results["Messages"]).save()
+            output_models.append(REoptjlMessageOutputs.create(meta=meta, **results["Messages"]))
         if results.get("status") != "error":
-            FinancialOutputs.create(meta=meta, **results["Financial"]).save()
-            ElectricTariffOutputs.create(meta=meta, **results["ElectricTariff"]).save()
-            ElectricUtilityOutputs.create(meta=meta, **results["ElectricUtility"]).save()
-            ElectricLoadOutputs.create(meta=meta, **results["ElectricLoad"]).save()
-            SiteOutputs.create(meta=meta, **results["Site"]).save()
+            output_models.append(FinancialOutputs.create(meta=meta, **results["Financial"]))
+            output_models.append(ElectricTariffOutputs.create(meta=meta, **results["ElectricTariff"]))
+            output_models.append(ElectricUtilityOutputs.create(meta=meta, **results["ElectricUtility"]))
+            output_models.append(ElectricLoadOutputs.create(meta=meta, **results["ElectricLoad"]))
+            output_models.append(SiteOutputs.create(meta=meta, **results["Site"]))
             if "PV" in results.keys():
                 if isinstance(results["PV"], dict):
-                    PVOutputs.create(meta=meta, **results["PV"]).save()
+                    output_models.append(PVOutputs.create(meta=meta, **results["PV"]))
                 elif isinstance(results["PV"], list):
                     for pvdict in results["PV"]:
-                        PVOutputs.create(meta=meta, **pvdict).save()
+                        output_models.append(PVOutputs.create(meta=meta, **pvdict))
             if "ElectricStorage" in results.keys():
-                ElectricStorageOutputs.create(meta=meta, **results["ElectricStorage"]).save()
+                output_models.append(ElectricStorageOutputs.create(meta=meta, **results["ElectricStorage"]))
             if "Generator" in results.keys():
-                GeneratorOutputs.create(meta=meta, **results["Generator"]).save()
+                output_models.append(GeneratorOutputs.create(meta=meta, **results["Generator"]))
             if "Wind" in results.keys():
-                WindOutputs.create(meta=meta, **results["Wind"]).save()
+                output_models.append(WindOutputs.create(meta=meta, **results["Wind"]))
             if "Boiler" in results.keys():
-                BoilerOutputs.create(meta=meta, **results["Boiler"]).save()
+                output_models.append(BoilerOutputs.create(meta=meta, **results["Boiler"]))
             if "ExistingBoiler" in results.keys():
-                ExistingBoilerOutputs.create(meta=meta, **results["ExistingBoiler"]).save()
+                output_models.append(ExistingBoilerOutputs.create(meta=meta, **results["ExistingBoiler"]))
             if "ExistingChiller" in results.keys():
-                ExistingChillerOutputs.create(meta=meta, **results["ExistingChiller"]).save()
+                output_models.append(ExistingChillerOutputs.create(meta=meta, **results["ExistingChiller"]))
             if "HotThermalStorage" in results.keys():
-                HotThermalStorageOutputs.create(meta=meta, **results["HotThermalStorage"]).save()
+                output_models.append(HotThermalStorageOutputs.create(meta=meta, **results["HotThermalStorage"]))
             if "ColdThermalStorage" in results.keys():
-                ColdThermalStorageOutputs.create(meta=meta, **results["ColdThermalStorage"]).save()
+                output_models.append(ColdThermalStorageOutputs.create(meta=meta, **results["ColdThermalStorage"]))
             if "HeatingLoad" in results.keys():
-                HeatingLoadOutputs.create(meta=meta, **results["HeatingLoad"]).save()
+                output_models.append(HeatingLoadOutputs.create(meta=meta, **results["HeatingLoad"]))
             if "CoolingLoad" in results.keys():
-                CoolingLoadOutputs.create(meta=meta, **results["CoolingLoad"]).save()
+                output_models.append(CoolingLoadOutputs.create(meta=meta, **results["CoolingLoad"]))
             if "CHP" in results.keys():
-                CHPOutputs.create(meta=meta, **results["CHP"]).save()
+                output_models.append(CHPOutputs.create(meta=meta, **results["CHP"]))
             if "AbsorptionChiller" in results.keys():
-                AbsorptionChillerOutputs.create(meta=meta, **results["AbsorptionChiller"]).save()
+                output_models.append(AbsorptionChillerOutputs.create(meta=meta, **results["AbsorptionChiller"]))
             if "Outages" in results.keys():
                 for multi_dim_array_name in ["unserved_load_series_kw", "unserved_load_per_outage_kwh", 
                                             "storage_discharge_series_kw", "pv_to_storage_series_kw", 
@@ -78,28 +94,47 @@ def process_results(results: dict, run_uuid: str) -> None:
                                             "chp_to_load_series_kw", "chp_fuel_used_per_outage_mmbtu",
                                             "critical_loads_per_outage_series_kw", "soc_series_fraction"]:
                     if multi_dim_array_name in results["Outages"]:
-                        results["Outages"][multi_dim_array_name] = np.transpose(results["Outages"][multi_dim_array_name]).tolist()
-                OutageOutputs.create(meta=meta, **results["Outages"]).save()
+                        results["Outages"][multi_dim_array_name] = np.transpose(results["Outages"][multi_dim_array_name])
+                output_models.append(OutageOutputs.create(meta=meta, **results["Outages"]))
             if "SteamTurbine" in results.keys():
-                SteamTurbineOutputs.create(meta=meta, **results["SteamTurbine"]).save()
+                output_models.append(SteamTurbineOutputs.create(meta=meta, **results["SteamTurbine"]))
             if "GHP" in results.keys():
-                GHPOutputs.create(meta=meta, **results["GHP"]).save() 
+                output_models.append(GHPOutputs.create(meta=meta, **results["GHP"]))
             if "ElectricHeater" in results.keys():
-                ElectricHeaterOutputs.create(meta=meta, **results["ElectricHeater"]).save()
+                output_models.append(ElectricHeaterOutputs.create(meta=meta, **results["ElectricHeater"]))
             if "ASHPSpaceHeater" in results.keys():
-                ASHPSpaceHeaterOutputs.create(meta=meta, **results["ASHPSpaceHeater"]).save()
+                output_models.append(ASHPSpaceHeaterOutputs.create(meta=meta, **results["ASHPSpaceHeater"]))
             if "ASHPWaterHeater" in results.keys():
-                ASHPWaterHeaterOutputs.create(meta=meta, **results["ASHPWaterHeater"]).save()
+                output_models.append(ASHPWaterHeaterOutputs.create(meta=meta, **results["ASHPWaterHeater"]))
             # TODO process rest of results
-    except Exception as e:
+
+        with transaction.atomic():
+            meta.save(update_fields=["status"])
+            bulk_save_models(output_models)
+    except Exception:
+        # RunJumpModelTask.on_failure saves REoptErrors as the error status and message of the run, which would
+        # otherwise stay "Optimizing..." since the status is committed with the outputs
         exc_type, exc_value, exc_traceback = sys.exc_info()
-        debug_msg = "exc_type: {}; exc_value: {}; exc_traceback: {}".format(
-                                                                        exc_type, 
-                                                                        exc_value.args[0],
-                                                                        tb.format_tb(exc_traceback)
-                                                                    )
-        log.debug(debug_msg)
-        raise e
+        log.error("process_results raised an unexpected error: UUID: {}".format(run_uuid))
+        raise UnexpectedError(exc_type, exc_value, tb.format_tb(exc_traceback), task="process_results",
+                              run_uuid=run_uuid, message="Unexpected Error while saving the results.")
+    refresh_run_summary(run_uuid)
+
+def bulk_save_models(model_objects: list) -> None:
+    """
+    Inserts model_objects with one bulk_create per model class.
+    Models that override save (e.g. ElectricUtilityOutputs calculates peak demand) are saved one at a time because
+    bulk_create does not call save.
+    """
+    objects_by_model = dict()
+    for obj in model_objects:
+        objects_by_model.setdefault(type(obj), []).append(obj)
+    for model, objs in objects_by_model.items():
+        if model.save is models.Model.save:
+            model.objects.bulk_create(objs)
+        else:
+            for obj in objs:
+                obj.save()
 
 def pop_result_keys(r:dict, keys_to_skip:list):
     for k in r.keys():
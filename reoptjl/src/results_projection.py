@@ -0,0 +1,219 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+"""
+Field projection for the v3 results endpoint (?keys=status,outputs.Financial.npv and exclude_series=true), with one
+query of only the needed columns per requested model.
+"""
+import re
+from django.contrib.postgres.fields import ArrayField
+from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
+from django.db.models import Prefetch
+from reoptjl.fields import CompressedSeriesField
+from reoptjl.models import APIMeta
+
+# (response key, APIMeta related_name) of the models in the results response, in response order
+RESULTS_MODELS = {
+    "inputs": [
+        ("Financial", "FinancialInputs"), ("ElectricLoad", "ElectricLoadInputs"), ("Site", "SiteInputs"),
+        ("Settings", "Settings"), ("PV", "PVInputs"), ("Meta", "UserProvidedMeta"),
+        ("ElectricTariff", "ElectricTariffInputs"), ("ElectricUtility", "ElectricUtilityInputs"),
+        ("ElectricStorage", "ElectricStorageInputs"), ("Generator", "GeneratorInputs"), ("Wind", "WindInputs"),
+        ("CoolingLoad", "CoolingLoadInputs"), ("ExistingChiller", "ExistingChillerInputs"),
+        ("ExistingBoiler", "ExistingBoilerInputs"), ("Boiler", "BoilerInputs"),
+        ("HotThermalStorage", "HotThermalStorageInputs"), ("ColdThermalStorage", "ColdThermalStorageInputs"),
+        ("SpaceHeatingLoad", "SpaceHeatingLoadInputs"), ("DomesticHotWaterLoad", "DomesticHotWaterLoadInputs"),
+        ("ProcessHeatLoad", "ProcessHeatLoadInputs"), ("CHP", "CHPInputs"),
+        ("AbsorptionChiller", "AbsorptionChillerInputs"), ("SteamTurbine", "SteamTurbineInputs"),
+        ("GHP", "GHPInputs"), ("ElectricHeater", "ElectricHeaterInputs"),
+        ("ASHPSpaceHeater", "ASHPSpaceHeaterInputs"), ("ASHPWaterHeater", "ASHPWaterHeaterInputs"),
+    ],
+    "outputs": [
+        ("Financial", "FinancialOutputs"), ("ElectricTariff", "ElectricTariffOutputs"),
+        ("ElectricUtility", "ElectricUtilityOutputs"), ("ElectricLoad", "ElectricLoadOutputs"),
+        ("Site", "SiteOutputs"), ("PV", "PVOutputs"), ("ElectricStorage", "ElectricStorageOutputs"),
+        ("Generator", "GeneratorOutputs"), ("Wind", "WindOutputs"), ("ExistingChiller", "ExistingChillerOutputs"),
+        ("ExistingBoiler", "ExistingBoilerOutputs"), ("Boiler", "BoilerOutputs"), ("Outages", "OutageOutputs"),
+        ("HotThermalStorage", "HotThermalStorageOutputs"), ("ColdThermalStorage", "ColdThermalStorageOutputs"),
+        ("CHP", "CHPOutputs"), ("AbsorptionChiller", "AbsorptionChillerOutputs"),
+        ("HeatingLoad", "HeatingLoadOutputs"), ("CoolingLoad", "CoolingLoadOutputs"),
+        ("SteamTurbine", "SteamTurbineOutputs"), ("GHP", "GHPOutputs"), ("ElectricHeater", "ElectricHeaterOutputs"),
+        ("ASHPSpaceHeater", "ASHPSpaceHeaterOutputs"), ("ASHPWaterHeater", "ASHPWaterHeaterOutputs"),
+    ],
+}
+
+# time step arrays that do not have "series" in their name
+SERIES_FIELDS = {
+    "loads_kw", "critical_loads_kw", "fuel_loads_mmbtu_per_hour", "thermal_loads_ton",
+    "per_time_step_fractions_of_electric_load", "addressable_load_fraction", "outdoor_air_temperature_degF",
+    "tou_energy_rates_per_kwh", "wholesale_rate", "export_rate_beyond_net_metering_limit",
+    "wind_meters_per_sec", "wind_direction_degrees", "temperature_celsius", "pressure_atmospheres",
+    "heating_cop", "heating_cf", "cooling_cop", "cooling_cf",
+    "space_heating_thermal_load_reduction_with_ghp_mmbtu_per_hour", "cooling_thermal_load_reduction_with_ghp_ton",
+}
+
+MESSAGES_KEY = "messages"
+PROFILE_KEY = "profile"  # RunProfile, see reoptjl.src.run_profile
+
+
+def related_model(related_name: str):
+    return APIMeta._meta.get_field(related_name).related_model
+
+
+def is_series_field(model, field) -> bool:
+    if isinstance(field, CompressedSeriesField):
+        return True
+    if not isinstance(field, ArrayField):
+        return False
+    # every OutageOutputs array is (outages x durations) or (outages x durations x time steps)
+    return "series" in field.name or field.name in SERIES_FIELDS or model.__name__ == "OutageOutputs"
+
+
+def series_field_names(model) -> list:
+    return [f.name for f in model._meta.concrete_fields if is_series_field(model, f)]
+
+
+def meta_keys() -> list:
+    return [f.attname for f in APIMeta._meta.concrete_fields if f.attname != "id"]
+
+
+def parse_projection(keys: str):
+    """
+    :param keys: str, comma separated top-level keys ("status"), models ("inputs.Site") or fields
+        ("outputs.Financial.npv")
+    :return: None if keys is empty (everything), else dict of the requested top-level keys to None (all of it), with
+        "inputs" and "outputs" mapped to a dict of model key to None (all fields) or a set of field names
+    :raises ValueError: for unknown keys, models or fields
+    """
+    paths = [k.strip() for k in (keys or "").split(",") if k.strip()]
+    if not paths:
+        return None
+    projection = dict()
+    for path in paths:
+        parts = path.split(".")
+        top = parts[0]
+        if top in RESULTS_MODELS:
+            if len(parts) > 3:
+                raise ValueError("Invalid key {}, expected at most {}.<model>.<field>.".format(path, top))
+        elif top in meta_keys() or top in (MESSAGES_KEY, PROFILE_KEY):
+            if len(parts) > 1:
+                raise ValueError("Invalid key {}, {} cannot be subset.".format(path, top))
+        else:
+            raise ValueError("Invalid key {}, {} is not a key of the results.".format(path, top))
+        if len(parts) == 1:
+            projection[top] = None
+            continue
+        models = dict(RESULTS_MODELS[top])
+        if parts[1] not in models:
+            raise ValueError("Invalid key {}, {} is not one of {}.".format(path, parts[1], ", ".join(models)))
+        if len(parts) == 3:
+            try:
+                field = related_model(models[parts[1]])._meta.get_field(parts[2])
+            except FieldDoesNotExist:
+                field = None
+            if field is None or not field.concrete or field.primary_key or field.name == "meta":
+                raise ValueError("Invalid key {}, {} is not a field of {}.".format(path, parts[2], parts[1]))
+        section = projection.setdefault(top, dict())
+        if section is None:
+            continue
+        if len(parts) == 2:
+            section[parts[1]] = None
+            continue
+        fields = section.setdefault(parts[1], set())
+        if fields is not None:
+            fields.add(parts[2])
+    return projection
+
+
+def selected_models(projection):
+    """
+    :return: generator of (section, key, related_name, fields) for the models requested in projection, where fields
+        is None for all fields
+    """
+    for section, models in RESULTS_MODELS.items():
+        if projection is not None and section not in projection:
+            continue
+        selected = None if projection is None else projection[section]
+        for key, related_name in models:
+            if selected is not None and key not in selected:
+                continue
+            yield section, key, related_name, None if selected is None else selected[key]
+
+
+def results_prefetches(projection, exclude_series: bool) -> list:
+    """
+    :return: list of prefetch_related lookups that load only the columns of the requested models
+    """
+    lookups = []
+    for _, _, related_name, fields in selected_models(projection):
+        model = related_model(related_name)
+        queryset = model.objects.order_by("pk")
+        if fields:
+            queryset = queryset.only("meta", *fields)
+        elif exclude_series:
+            queryset = queryset.defer(*series_field_names(model))
+        lookups.append(Prefetch(related_name, queryset=queryset))
+    if projection is None or MESSAGES_KEY in projection:
+        lookups += ["Message", "REoptjlMessageOutputs"]
+    if projection is None or PROFILE_KEY in projection:
+        lookups.append("RunProfile")
+    return lookups
+
+
+def results_messages(meta) -> dict:
+    """
+    Messages saved for the run, plus the warnings and errors from REopt.jl
+    """
+    messages = dict()
+    try:
+        for msg in meta.Message.all():
+            messages[msg.message_type] = msg.message
+
+        # Add a dictionary of warnings and errors from REopt
+        # key = location of warning, error, or uncaught error
+        # value = vector of text from REopt
+        #   In case of uncaught error, vector length > 1
+        reopt_messages = meta.REoptjlMessageOutputs.dict
+        for msg_type in ["errors", "warnings"]:
+            messages[msg_type] = dict()
+            for m in range(0, len(reopt_messages[msg_type])):
+                txt = reopt_messages[msg_type][m]
+                txt = re.sub('[^0-9a-zA-Z_.,() ]+', '', txt)
+                k = txt.split(',')[0]
+                v = txt.split(',')[1:]
+                messages[msg_type][k] = v
+        messages["has_stacktrace"] = reopt_messages["has_stacktrace"]
+    except:
+        pass
+    return messages
+
+
+def projected_results(meta, projection) -> dict:
+    """
+    :param meta: APIMeta loaded with results_prefetches(projection, exclude_series)
+    :param projection: return value of parse_projection
+    :return: dict, the results response limited to the projection
+    """
+    keys = meta_keys() if projection is None else projection
+    # meta.dict also holds the prefetched querysets in _prefetched_objects_cache
+    r = {k: v for k, v in meta.dict.items() if k in keys}
+    for section, key, related_name, _ in selected_models(projection):
+        r.setdefault(section, dict())
+        try:
+            related = getattr(meta, related_name)
+        except ObjectDoesNotExist:
+            continue
+        if APIMeta._meta.get_field(related_name).one_to_many:
+            objs = related.all()
+            if len(objs) == 1:
+                r[section][key] = objs[0].dict
+            elif len(objs) > 1:
+                r[section][key] = [obj.dict for obj in objs]
+        else:
+            r[section][key] = related.dict
+    if projection is None or MESSAGES_KEY in projection:
+        r[MESSAGES_KEY] = results_messages(meta)
+    if projection is None or PROFILE_KEY in projection:
+        try:
+            r[PROFILE_KEY] = meta.RunProfile.dict
+        except ObjectDoesNotExist:
+            pass
+    return r
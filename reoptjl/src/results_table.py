@@ -0,0 +1,98 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+"""
+Bulk loading of only the result fields that a custom table configuration (reoptjl.custom_table_config) reads, with one
+query per model for all of the run_uuids, in the shape of the results endpoint response after sum_vectors.
+"""
+import types
+import uuid
+from django.core.exceptions import FieldDoesNotExist
+from reoptjl.custom_table_helpers import sum_vectors
+from reoptjl.fields import Series
+from reoptjl.models import APIMeta
+from reoptjl.src.results_projection import RESULTS_MODELS, related_model, meta_keys
+
+TABLE_VALUE_FUNCTIONS = ("bau_value", "scenario_value")
+
+
+def _string_constants(code) -> set:
+    strings = set()
+    for const in code.co_consts:
+        if isinstance(const, str):
+            strings.add(const)
+        elif isinstance(const, types.CodeType):  # nested lambdas and comprehensions
+            strings |= _string_constants(const)
+    return strings
+
+
+def referenced_keys(config: list) -> set:
+    """
+    :param config: custom table configuration, eg. custom_table_webtool
+    :return: set of the strings in the bau_value and scenario_value functions of the config, which include every
+        flattened results key that they read
+    """
+    keys = set()
+    for entry in config:
+        for name in TABLE_VALUE_FUNCTIONS:
+            func = entry.get(name)
+            if isinstance(func, types.FunctionType):
+                keys |= _string_constants(func.__code__)
+    return keys
+
+
+def table_fields(config: list):
+    """
+    :return: (set of APIMeta fields, dict of (section, model key, related_name) to set of fields) read by config
+    """
+    meta_fields, model_fields = set(), dict()
+    models = {section: dict(section_models) for section, section_models in RESULTS_MODELS.items()}
+    for key in referenced_keys(config):
+        parts = key.split(".")
+        if len(parts) == 1 and parts[0] in meta_keys():
+            meta_fields.add(parts[0])
+        elif len(parts) >= 3 and parts[0] in models and parts[1] in models[parts[0]]:
+            related_name = models[parts[0]][parts[1]]
+            try:  # nested keys like outputs.GHP.ghpghx_chosen_outputs.number_of_boreholes are in a JSONField
+                field = related_model(related_name)._meta.get_field(parts[2])
+            except FieldDoesNotExist:
+                continue
+            if field.concrete and not field.primary_key:
+                model_fields.setdefault((parts[0], parts[1], related_name), set()).add(field.attname)
+    return meta_fields, model_fields
+
+
+def _value(v):
+    return v.tolist() if isinstance(v, Series) else v
+
+
+def table_data(run_uuids: list, config: list) -> dict:
+    """
+    :return: dict of run_uuid to the subset of its results read by config, with vectors summed as in sum_vectors, or
+        to {"error": ...} for runs that do not exist or ended in error (as the results endpoint returns no data for
+        those)
+    """
+    meta_fields, model_fields = table_fields(config)
+    metas = {str(m["run_uuid"]): m for m in
+             APIMeta.objects.filter(run_uuid__in=run_uuids).values("id", "run_uuid", "status", *meta_fields)}
+    data_by_meta_id = dict()
+    for m in metas.values():
+        data_by_meta_id[m["id"]] = {k: m[k] for k in meta_fields}
+        data_by_meta_id[m["id"]].update({section: dict() for section in RESULTS_MODELS})
+
+    meta_ids = list(data_by_meta_id)
+    for (section, key, related_name), fields in model_fields.items():
+        rows_by_meta_id = dict()
+        for row in related_model(related_name).objects.filter(meta_id__in=meta_ids).order_by("pk").values(
+                "meta_id", *fields):
+            rows_by_meta_id.setdefault(row.pop("meta_id"), []).append({k: _value(v) for k, v in row.items()})
+        for meta_id, rows in rows_by_meta_id.items():
+            # one model is a dict and several (eg. PV) are a list, as in the results response
+            data_by_meta_id[meta_id][section][key] = rows[0] if len(rows) == 1 else rows
+
+    data = dict()
+    for run_uuid in run_uuids:
+        m = metas.get(str(uuid.UUID(str(run_uuid))))
+        if m is None or m["status"] == "error":
+            data[run_uuid] = {"error": f"Failed to fetch data for run_uuid {run_uuid}"}
+        else:
+            data[run_uuid] = sum_vectors(data_by_meta_id[m["id"]])
+    return data
@@ -0,0 +1,116 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+"""
+Reuse of the results of a previous optimal run with the same APIMeta.input_hash (a hash of the validated inputs and
+the REopt.jl version) instead of solving again.
+"""
+import hashlib
+import json
+import os
+from functools import lru_cache
+from django.apps import apps
+from django.db import transaction
+from reoptjl.models import APIMeta, Message, PVInputs, FinancialInputs, ElectricUtilityInputs, SiteInputs, \
+    CHPInputs, SteamTurbineInputs, GHPInputs, ExistingChillerInputs, ASHPSpaceHeaterInputs, ASHPWaterHeaterInputs
+from reoptjl.src.process_results import bulk_save_models
+
+# inputs that do not change the optimization
+UNHASHED_INPUT_KEYS = ["APIMeta", "Meta"]
+
+# input models updated with defaults set in REopt.jl, see reoptjl.src.process_results.update_inputs_in_database
+JULIA_UPDATED_INPUT_MODELS = [FinancialInputs, ElectricUtilityInputs, SiteInputs, CHPInputs, SteamTurbineInputs,
+                              GHPInputs, ExistingChillerInputs, ASHPSpaceHeaterInputs, ASHPWaterHeaterInputs]
+
+MANIFEST_PATH = os.path.join("julia_src", "Manifest.toml")
+
+
+@lru_cache(maxsize=1)
+def reopt_jl_version() -> str:
+    """
+    REopt.jl version used by the Julia API, from the REOPT_JL_VERSION environment variable or julia_src/Manifest.toml
+    """
+    version = os.environ.get("REOPT_JL_VERSION")
+    if version:
+        return version
+    try:
+        with open(MANIFEST_PATH, "r") as f:
+            in_reopt = False
+            for line in f:
+                line = line.strip()
+                if line.startswith("[["):
+                    in_reopt = line == "[[deps.REopt]]"
+                elif in_reopt and line.startswith("version"):
+                    return line.split("=")[1].strip().strip('"')
+    except IOError:
+        pass
+    return ""
+
+
+def reuse_results_requested(data: dict) -> bool:
+    default = os.environ.get("REOPT_REUSE_RESULTS", "false").lower() == "true"
+    return bool(data.get("reuse_results", default))
+
+
+def hash_inputs(validated_input_dict: dict) -> str:
+    """
+    :param validated_input_dict: InputValidator.validated_input_dict
+    :return: str, SHA-256 hex digest of the canonicalized inputs and the REopt.jl version
+    """
+    inputs = {k: v for k, v in validated_input_dict.items() if k not in UNHASHED_INPUT_KEYS}
+    canonical = json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256((reopt_jl_version() + canonical).encode()).hexdigest()
+
+
+def find_reusable_run(input_hash: str, run_uuid: str, user_uuid: str):
+    """
+    :param user_uuid: only runs of this user are reused, since their run_uuid gives access to their results
+    :return: APIMeta of the latest optimal run of user_uuid with the same input_hash and REopt.jl version, or None
+    """
+    if not input_hash or not user_uuid:
+        return None
+    return APIMeta.objects.filter(
+        input_hash=input_hash, user_uuid=user_uuid, status="optimal", reopt_version=reopt_jl_version()
+    ).exclude(run_uuid=run_uuid).order_by("-created").first()
+
+
+def _copies_for(model, source_meta, meta) -> list:
+    objs = list(model.objects.filter(meta=source_meta).order_by("pk"))
+    for obj in objs:
+        if model._meta.pk.name != "meta":
+            obj.pk = None
+        obj.meta = meta
+        obj._state.adding = True
+    return objs
+
+
+def copy_results(source_meta: APIMeta, run_uuid: str) -> None:
+    """
+    Copy the outputs of source_meta, and the inputs that REopt.jl updated for it, to the (already saved) run_uuid.
+    """
+    meta = APIMeta.objects.get(run_uuid=run_uuid)
+    output_models = [model for model in apps.get_app_config("reoptjl").get_models()
+                     if model.__name__.endswith("Outputs")]
+    with transaction.atomic():
+        copies = []
+        for model in output_models:
+            copies += _copies_for(model, source_meta, meta)
+        for model in JULIA_UPDATED_INPUT_MODELS:
+            values = model.objects.filter(meta=source_meta).values().first()
+            if values is None:
+                continue
+            for k in ["id", "meta_id"]:
+                values.pop(k, None)
+            if not model.objects.filter(meta=meta).update(**values):
+                copies.append(model.create(meta=meta, **values))
+        for source_pv, pv in zip(PVInputs.objects.filter(meta=source_meta).order_by("pk"),
+                                 PVInputs.objects.filter(meta=meta).order_by("pk")):
+            values = PVInputs.objects.filter(pk=source_pv.pk).values().first()
+            for k in ["id", "meta_id"]:
+                values.pop(k, None)
+            PVInputs.objects.filter(pk=pv.pk).update(**values)
+        bulk_save_models(copies)
+        Message.create(meta=meta, message_type="reused_results",
+                       message="Results copied from a previous run with identical inputs.").save()
+        APIMeta.objects.filter(run_uuid=run_uuid).update(status=source_meta.status,
+                                                         reopt_version=source_meta.reopt_version,
+                                                         input_hash=source_meta.input_hash)
+
@@ -7,8 +7,12 @@ import requests
 from celery import shared_task, Task
 from reo.exceptions import REoptError, OptimizationTimeout, UnexpectedError, NotOptimal, REoptFailedToStartError
 from reoptjl.models import APIMeta, Message, get_input_dict_from_run_uuid
-from reo.src.profiler import Profiler
-from reoptjl.src.process_results import process_results, update_inputs_in_database
+from reo.src.julia_client import julia_client
+from reoptjl.src.process_results import process_results, update_inputs_in_database, JSON_FIELD_NAMES
+from reoptjl.src.typed_json import load_json_with_typed_series
+from reoptjl.src.run_summary import refresh_run_summary
+from reoptjl.src.run_profile import StageTimer, save_run_profile
+from reoptjl.src.input_handoff import take_input_dict
 from celery.utils.log import get_task_logger
 logger = get_task_logger(__name__)
 
@@ -38,6 +42,7 @@ class RunJumpModelTask(Task):
             meta.status = "An error occurred. See messages for more."
             meta.save(update_fields=["status"])
             Message.create(meta=meta, message_type="error", message=msg).save()
+            refresh_run_summary(exc.run_uuid)
 
         # TODO is it possible for non-REoptErrors to get here? if so what do we do?
 
@@ -46,12 +51,23 @@ class RunJumpModelTask(Task):
         self.request.chord = None  # this seems to stop the infinite chord_unlock call
 
 
-@shared_task(base=RunJumpModelTask)
-def run_jump_model(run_uuid):
-    profiler = Profiler()  # TODO? are we still using the Profile?
+@shared_task(base=RunJumpModelTask, ignore_result=True)
+def run_jump_model(run_uuid, queued_at=None, input_json=None, input_handoff=None):
+    """
+    :param run_uuid: str
+    :param queued_at: float, time.time() when the task was queued, to record the queue wait in RunProfile
+    :param input_json: str, input dict serialized when the job was created (see reoptjl.src.input_handoff)
+    :param input_handoff: str, "redis" if the input dict was stored in Redis when the job was created
+    """
+    timer = StageTimer()
+    if queued_at is not None:
+        timer.add("queue_wait", max(time.time() - queued_at, 0.0))
     time_dict = dict()
     name = 'run_jump_model'
-    data = get_input_dict_from_run_uuid(run_uuid)
+    with timer.stage("input_dict"):
+        data = take_input_dict(run_uuid, input_json=input_json, input_handoff=input_handoff)
+        if data is None:
+            data = get_input_dict_from_run_uuid(run_uuid)
     user_uuid = data.get('user_uuid')
     
     data.pop('user_uuid',None) # Remove user uuid from inputs dict to avoid downstream errors
@@ -63,9 +79,12 @@ def run_jump_model(run_uuid):
     logger.info("Running JuMP model ...")
     try:
         t_start = time.time()
-        julia_host = os.environ.get('JULIA_HOST', "julia")
-        response = requests.post("http://" + julia_host + ":8081/reopt/", json=data)
-        response_json = response.json()
+        # stream the response to decode time series into compact buffers as they arrive
+        with timer.stage("julia"):
+            response = julia_client.post("reopt", json=data, stream=True)
+        with response, timer.stage("json_decode"):
+            response.raw.decode_content = True
+            response_json = load_json_with_typed_series(response.raw, untyped_keys=JSON_FIELD_NAMES)
         if response.status_code == 500:
             raise REoptFailedToStartError(task=name, message=response_json["error"], run_uuid=run_uuid, user_uuid=user_uuid)
         results = response_json["results"]
@@ -105,11 +124,32 @@ def run_jump_model(run_uuid):
         elif status.strip().lower() != 'optimal':
             logger.error("REopt status not optimal. Raising NotOptimal Exception.")
             raise NotOptimal(task=name, run_uuid=run_uuid, status=status.strip(), user_uuid=user_uuid)
+    finally:
+        save_run_profile(run_uuid, timer.seconds)
 
-    profiler.profileEnd()
-    # TODO save profile times
     APIMeta.objects.filter(run_uuid=run_uuid).update(reopt_version=reopt_version)
     if status.strip().lower() != 'error':
-        update_inputs_in_database(inputs_with_defaults_set_in_julia, run_uuid)
-    process_results(results, run_uuid)
+        with timer.stage("update_inputs"):
+            update_inputs_in_database(inputs_with_defaults_set_in_julia, run_uuid)
+    with timer.stage("process_results"):
+        process_results(results, run_uuid)
+    save_run_profile(run_uuid, timer.seconds)
+    return True
+
+
+@shared_task(ignore_result=True)
+def run_jump_model_lane(run_uuids, queued_at=None, handoffs=None):
+    """
+    Run the jobs of run_uuids one after the other in this worker, for the batch endpoint (see reoptjl.src.batch_jobs).
+    run_jump_model.apply runs each job eagerly with its on_failure handling, so a failed job does not stop the lane.
+    :param run_uuids: list of str
+    :param queued_at: float, time.time() when the lane was queued
+    :param handoffs: dict of run_uuid to the run_jump_model keyword arguments from reoptjl.src.input_handoff.hand_off
+    """
+    handoffs = handoffs or dict()
+    for run_uuid in run_uuids:
+        try:
+            run_jump_model.apply(args=(run_uuid,), kwargs=dict(queued_at=queued_at, **handoffs.get(run_uuid, {})))
+        except Exception as e:
+            logger.error("run_jump_model failed for run_uuid {} in batch lane: {}".format(run_uuid, e))
     return True
@@ -0,0 +1,66 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+"""
+Timing of the stages of a v3 job (validation and input save in reoptjl.api.Job, the other stages in run_jump_model),
+saved per run in RunProfile.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+import numpy as np
+from django.utils import timezone
+from reoptjl.models import APIMeta, RunProfile
+log = logging.getLogger(__name__)
+
+STAGES = ["validation", "input_save", "queue_wait", "input_dict", "julia", "json_decode", "update_inputs",
+          "process_results"]
+STAGE_FIELDS = [stage + "_seconds" for stage in STAGES]
+
+
+class StageTimer(object):
+
+    def __init__(self):
+        self.seconds = dict()  # RunProfile field name to seconds
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Add the time spent in the with block to the seconds of stage name (also when the block raises)
+        """
+        t_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - t_start)
+
+    def add(self, name: str, seconds: float) -> None:
+        key = name + "_seconds"
+        self.seconds[key] = self.seconds.get(key, 0.0) + seconds
+
+
+def save_run_profile(run_uuid: str, seconds: dict) -> None:
+    """
+    Create or update the RunProfile of run_uuid with seconds.
+    """
+    try:
+        if not RunProfile.objects.filter(meta__run_uuid=run_uuid).update(**seconds):
+            RunProfile.objects.create(meta=APIMeta.objects.get(run_uuid=run_uuid), **seconds)
+    except Exception as e:  # timing is diagnostic and must not fail the job
+        log.warning("Could not save the profile of run_uuid {}: {}".format(run_uuid, e))
+
+
+def profile_stats(days: float) -> dict:
+    """
+    :param days: only include runs created in the last days
+    :return: dict of stage field name to the count, mean, p50 and p95 of its seconds
+    """
+    rows = RunProfile.objects.filter(created__gte=timezone.now() - timedelta(days=days)).values_list(*STAGE_FIELDS)
+    columns = np.array(list(rows), dtype=float).reshape(-1, len(STAGE_FIELDS))  # None becomes nan
+    stats = dict()
+    for field, values in zip(STAGE_FIELDS, columns.T):
+        values = values[~np.isnan(values)]
+        stats[field] = {"count": len(values)}
+        if len(values):
+            p50, p95 = np.percentile(values, [50, 95])
+            stats[field].update({"mean": float(values.mean()), "p50": float(p50), "p95": float(p95)})
+    return stats
@@ -0,0 +1,258 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+"""
+Summaries of runs for the reoptjl summary endpoints, saved in one RunSummary row per run. The rows are refreshed when a
+job is created, completes or fails, and when a run is linked or unlinked; missing rows are built when a user's summary
+is read, or with python manage.py backfill_run_summaries.
+"""
+import logging
+import uuid
+from django.db import models, transaction
+from django.db.models import Q, F, ExpressionWrapper
+from reoptjl.models import APIMeta, RunSummary, UserProvidedMeta, ElectricUtilityInputs, SiteOutputs, SiteInputs, \
+    Settings, ElectricTariffInputs, ElectricTariffOutputs, ElectricLoadInputs, FinancialOutputs, ElectricStorageOutputs, \
+    PVOutputs, WindOutputs, GeneratorOutputs, CHPOutputs, GHPOutputs, ElectricHeaterOutputs, ASHPSpaceHeaterOutputs, \
+    ASHPWaterHeaterOutputs, HotThermalStorageOutputs, ColdThermalStorageOutputs, AbsorptionChillerOutputs, \
+    UserUnlinkedRuns, PortfolioUnlinkedRuns
+log = logging.getLogger(__name__)
+
+
+# Query all django models for 1 or more run_uuids provided in inputs
+# Return summary_dict which contains summary information for valid run_uuids
+# Each model is read with one values() query on the APIMeta ids, so the number of queries does not grow with the number of runs
+def queryset_for_summary(api_metas,summary_dict:dict):
+
+    # Loop over all the APIMetas associated with a user_uuid, do something if needed
+    run_uuid_by_meta_id = dict()
+    for m in api_metas.values('id', 'run_uuid', 'user_uuid', 'portfolio_uuid', 'status', 'created'):
+        run_uuid = str(m['run_uuid'])
+        run_uuid_by_meta_id[m['id']] = run_uuid
+        summary_dict[run_uuid] = dict()
+        summary_dict[run_uuid]['status'] = m['status']
+        summary_dict[run_uuid]['run_uuid'] = run_uuid
+        summary_dict[run_uuid]['user_uuid'] = str(m['user_uuid'])
+        summary_dict[run_uuid]['portfolio_uuid'] = str(m['portfolio_uuid'])
+        summary_dict[run_uuid]['created'] = str(m['created'])
+
+    def rows(model, *fields, **expressions):
+        """
+        :return: list of (summary dict of the run, dict of the fields) for each model object of the api_metas
+        """
+        values = model.objects.filter(meta_id__in=run_uuid_by_meta_id.keys()).order_by('pk').values(
+            'meta_id', *fields, **expressions)
+        return [(summary_dict[run_uuid_by_meta_id[m['meta_id']]], m) for m in values]
+
+    if not run_uuid_by_meta_id:
+        return summary_dict
+
+    # Create query of all UserProvidedMeta objects where their run_uuid is in api_metas run_uuids.
+    for d, m in rows(UserProvidedMeta, 'description', 'address'):
+        d['description'] = m['description']
+        d['address'] = m['address']
+
+    for d, m in rows(ElectricUtilityInputs, 'outage_start_time_step', 'outage_end_time_step', 'outage_durations',
+                     'outage_start_time_steps'):
+        if 'focus' not in d.keys():
+            d['focus'] = ''
+        if m['outage_start_time_step'] is None:
+            if len(m['outage_start_time_steps']) == 0:
+                d['focus'] += "Financial,"
+            else:
+                d['focus'] += "Resilience,"
+                d['outage_duration'] = m['outage_durations'][0] # all durations are same.
+        else:
+            # outage start timestep was provided, is 1 or more
+            d['outage_duration'] = m['outage_end_time_step'] - m['outage_start_time_step'] + 1
+            d['focus'] += "Resilience,"
+
+    for d, m in rows(SiteOutputs, 'lifecycle_emissions_reduction_CO2_fraction'):
+        d['emission_reduction_pct'] = m['lifecycle_emissions_reduction_CO2_fraction']
+
+    for d, m in rows(SiteInputs, 'renewable_electricity_min_fraction', 'renewable_electricity_max_fraction'):
+        # if focus key doesnt exist, create it
+        if 'focus' not in d.keys():
+            d['focus'] = ''
+        if (m['renewable_electricity_min_fraction'] or 0) > 0:  # can be NoneType
+            d['focus'] += "Clean-energy,"
+        if (m['renewable_electricity_max_fraction'] or 0) > 0:  # can be NoneType
+            d['focus'] += "Clean-energy,"
+
+    # Use settings to find out if it is an off-grid evaluation
+    for d, m in rows(Settings, 'off_grid_flag', 'include_climate_in_objective', 'include_health_in_objective'):
+        # if focus key doesnt exist, create it
+        if 'focus' not in d.keys():
+            d['focus'] = ''
+        if m['off_grid_flag']:
+            d['focus'] += "Off-grid,"
+        if m['include_climate_in_objective'] or m['include_health_in_objective']:
+            d['focus'] += "Clean-energy,"
+
+    for d, m in rows(ElectricTariffInputs, 'urdb_rate_name'):
+        if m['urdb_rate_name'] is None:
+            d['urdb_rate_name'] = 'Custom'
+        else:
+            d['urdb_rate_name'] = m['urdb_rate_name']
+
+    for d, m in rows(ElectricTariffOutputs, 'year_one_bill_before_tax', 'year_one_bill_before_tax_bau'):
+        if (m['year_one_bill_before_tax_bau'] is not None) and (m['year_one_bill_before_tax'] is not None):
+            d['year_one_savings_us_dollars'] = m['year_one_bill_before_tax_bau'] - m['year_one_bill_before_tax']
+        else:
+            d['year_one_savings_us_dollars'] = None
+
+    # loads_kw is only checked for null, so it is not read from the database
+    for d, m in rows(ElectricLoadInputs, 'doe_reference_name',
+                     loads_kw_is_null=ExpressionWrapper(Q(loads_kw__isnull=True), output_field=models.BooleanField())):
+        if m['loads_kw_is_null']:
+            d['doe_reference_name'] = m['doe_reference_name']
+        else:
+            d['doe_reference_name'] = 'Custom'
+
+    for d, m in rows(FinancialOutputs, 'npv', 'initial_capital_costs_after_incentives', 'lcc',
+                     'replacements_present_cost_after_tax', 'lifecycle_capital_costs_plus_om_after_tax',
+                     'lifecycle_generation_tech_capital_costs', 'lifecycle_storage_capital_costs',
+                     'lifecycle_production_incentive_after_tax'):
+        d['npv_us_dollars'] = m['npv']
+        d['net_capital_costs'] = m['initial_capital_costs_after_incentives']
+        d['lcc_us_dollars'] = m['lcc']
+        d['replacements_present_cost_after_tax'] = m['replacements_present_cost_after_tax']
+        d['lifecycle_capital_costs_plus_om_after_tax'] = m['lifecycle_capital_costs_plus_om_after_tax']
+        d['total_capital_costs'] = m['lifecycle_generation_tech_capital_costs'] + m['lifecycle_storage_capital_costs'] - m['lifecycle_production_incentive_after_tax']
+
+    for d, m in rows(ElectricStorageOutputs, 'size_kw', 'size_kwh'):
+        d['batt_kw'] = m['size_kw']
+        d['batt_kwh'] = m['size_kwh']
+
+    for d, m in rows(PVOutputs, 'size_kw'):
+        d['pv_kw'] = m['size_kw']
+
+    for d, m in rows(WindOutputs, 'size_kw'):
+        d['wind_kw'] = m['size_kw']
+
+    for d, m in rows(GeneratorOutputs, 'size_kw'):
+        d['gen_kw'] = m['size_kw']
+
+    # assumes run_uuids exist in both CHPInputs and CHPOutputs
+    for d, m in rows(CHPOutputs, 'size_kw', thermal_efficiency_full_load=F('meta__CHPInputs__thermal_efficiency_full_load')):
+        if m['thermal_efficiency_full_load'] == 0:
+            d['prime_gen_kw'] = m['size_kw']
+        else:
+            d['chp_kw'] = m['size_kw']
+
+    for d, m in rows(GHPOutputs, 'ghp_option_chosen', 'ghpghx_chosen_outputs', 'size_heat_pump_ton',
+                     'size_wwhp_heating_pump_ton', 'size_wwhp_cooling_pump_ton'):
+        if m['ghp_option_chosen'] > 0:
+            if m['size_heat_pump_ton'] is not None:
+                d['ghp_ton'] = m['size_heat_pump_ton']
+            else:
+                d['ghp_cooling_ton'] = m['size_wwhp_cooling_pump_ton']
+                d['ghp_heating_ton'] = m['size_wwhp_heating_pump_ton']
+            d['ghp_n_bores'] = m['ghpghx_chosen_outputs']['number_of_boreholes']
+
+    for d, m in rows(ElectricHeaterOutputs, 'size_mmbtu_per_hour'):
+        d['electric_heater_mmbtu_per_hour'] = m['size_mmbtu_per_hour']
+
+    for d, m in rows(ASHPSpaceHeaterOutputs, 'size_ton'):
+        d['ASHPSpace_heater_ton'] = m['size_ton']
+
+    for d, m in rows(ASHPWaterHeaterOutputs, 'size_ton'):
+        d['ASHPWater_heater_ton'] = m['size_ton']
+
+    for d, m in rows(HotThermalStorageOutputs, 'size_gal'):
+        d['hottes_gal'] = m['size_gal']
+
+    for d, m in rows(ColdThermalStorageOutputs, 'size_gal'):
+        d['coldtes_gal'] = m['size_gal']
+
+    for d, m in rows(AbsorptionChillerOutputs, 'size_ton'):
+        d['absorpchl_ton'] = m['size_ton']
+
+    return summary_dict
+
+def _normalized_uuid(value) -> str:
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return str(value)
+
+
+def refresh_run_summaries(api_metas) -> bool:
+    """
+    Rebuild the RunSummary rows of the runs in the api_metas queryset.
+    :return: bool, False if the rows could not be rebuilt (they are then deleted, so that they are rebuilt when read)
+    """
+    try:
+        metas = list(api_metas.values('id', 'run_uuid', 'user_uuid', 'portfolio_uuid', 'created'))
+        if not metas:
+            return True
+        summary_dict = queryset_for_summary(APIMeta.objects.filter(id__in=[m['id'] for m in metas]), dict())
+        run_uuids = [m['run_uuid'] for m in metas]
+        # unlinked runs are (run_uuid, user_uuid) pairs, a run is only unlinked for the user that unlinked it
+        portfolio_unlinked = set((r, _normalized_uuid(u)) for r, u in PortfolioUnlinkedRuns.objects.filter(
+            run_uuid__in=run_uuids).values_list('run_uuid', 'user_uuid'))
+        user_unlinked = set((r, _normalized_uuid(u)) for r, u in UserUnlinkedRuns.objects.filter(
+            run_uuid__in=run_uuids).values_list('run_uuid', 'user_uuid'))
+        for m in metas:
+            m['unlinked_key'] = (m['run_uuid'], _normalized_uuid(m['user_uuid']))
+        run_summaries = [
+            RunSummary(
+                meta_id=m['id'],
+                run_uuid=m['run_uuid'],
+                user_uuid=m['user_uuid'],
+                created=m['created'],
+                in_user_summary=((m['portfolio_uuid'] == "" or m['unlinked_key'] in portfolio_unlinked)
+                                 and m['unlinked_key'] not in user_unlinked),
+                summary=summary_dict[str(m['run_uuid'])]
+            )
+            for m in metas
+        ]
+        with transaction.atomic():
+            RunSummary.objects.filter(meta_id__in=[m['id'] for m in metas]).delete()
+            RunSummary.objects.bulk_create(run_summaries)
+        return True
+    except Exception as e:  # a job must not fail because of its summary
+        log.warning("Could not refresh run summaries: {}".format(e))
+    try:  # drop the stale rows, refresh_missing_run_summaries rebuilds them when they are read
+        RunSummary.objects.filter(meta__in=api_metas).delete()
+    except Exception as e:
+        log.warning("Could not delete stale run summaries: {}".format(e))
+    return False
+
+
+def refresh_run_summary(run_uuid) -> None:
+    refresh_run_summaries(APIMeta.objects.filter(run_uuid=run_uuid))
+
+
+def refresh_missing_run_summaries(api_metas, batch_size=500) -> None:
+    """
+    Build the RunSummary rows of the runs in the api_metas queryset that do not have one, batch_size runs at a time.
+    """
+    missing = api_metas.filter(RunSummary__isnull=True)
+    last_id = 0
+    while True:
+        ids = list(missing.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return
+        refresh_run_summaries(APIMeta.objects.filter(id__in=ids))
+        last_id = ids[-1]
+
+
+def user_run_summaries(user_uuid):
+    """
+    :return: RunSummary queryset of the runs in the summary of the user, newest first
+    """
+    refresh_missing_run_summaries(APIMeta.objects.filter(user_uuid=user_uuid))
+    return RunSummary.objects.filter(user_uuid=user_uuid, in_user_summary=True).order_by("-created", "-meta_id")
+
+
+def keyset_after(run_summaries, cursor: str):
+    """
+    Keyset pagination: the runs in run_summaries (ordered newest first) that come after the run with run_uuid=cursor
+    """
+    created, meta_id = RunSummary.objects.values_list('created', 'meta_id').get(run_uuid=uuid.UUID(cursor))
+    return run_summaries.filter(Q(created__lt=created) | Q(created=created, meta_id__lt=meta_id))
+
+
+def summaries(run_summaries) -> dict:
+    """
+    :return: dict of run_uuid to summary for the RunSummary queryset, in the order of the queryset
+    """
+    return {str(run_uuid): summary for run_uuid, summary in run_summaries.values_list('run_uuid', 'summary')}
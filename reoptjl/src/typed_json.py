@@ -0,0 +1,114 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+"""
+Incremental decoding of the JSON responses of the Julia API into compact array('d') series, and the psycopg2 adapters
+that save array('d') and numpy series to ArrayFields.
+"""
+from array import array
+import ijson
+import numpy as np
+from psycopg2.extensions import AsIs, adapt, register_adapter
+
+MIN_TYPED_ARRAY_LENGTH = 24
+
+
+class _ArrayBuilder(object):
+    """
+    Collects the items of one JSON array. Items are kept in an array('d') buffer while they are all numbers and moved
+    to a list as soon as a string, null, boolean, object or nested array shows up.
+    """
+    def __init__(self, typed):
+        self.buffer = array('d') if typed else None
+        self.items = None if typed else []
+        self.has_float = False
+
+    def append(self, value):
+        if self.buffer is not None:
+            if type(value) in (int, float):
+                self.has_float = self.has_float or type(value) is float
+                self.buffer.append(value)
+                return
+            self.items = self._buffer_to_list()
+            self.buffer = None
+        self.items.append(value)
+
+    def _buffer_to_list(self):
+        if self.has_float:
+            return self.buffer.tolist()
+        return [int(v) for v in self.buffer]
+
+    def value(self):
+        if self.buffer is None:
+            return self.items
+        if self.has_float and len(self.buffer) >= MIN_TYPED_ARRAY_LENGTH:
+            return self.buffer
+        return self._buffer_to_list()  # keep integer arrays (e.g. time steps) and short arrays as lists
+
+
+def load_json_with_typed_series(fp, untyped_keys=()):
+    """
+    Decode a JSON document from the file-like object fp as it is read.
+    Arrays with at least MIN_TYPED_ARRAY_LENGTH numbers, at least one of which is a float, are returned as array('d');
+    everything else is decoded as json.load would.
+    :param fp: file-like object with a read method, e.g. requests.Response.raw
+    :param untyped_keys: object keys whose values are always decoded to plain lists (e.g. values saved to JSONFields)
+    :return: decoded document
+    """
+    stack = []  # open objects (dict) and arrays (_ArrayBuilder)
+    keys = []  # current key in each open object
+    untyped_depth = None  # depth in the stack at which an untyped key was entered
+    root = None
+
+    def add(value):
+        nonlocal root
+        if not stack:
+            root = value
+        elif isinstance(stack[-1], dict):
+            stack[-1][keys[-1]] = value
+        else:
+            stack[-1].append(value)
+
+    for _, event, value in ijson.parse(fp, use_float=True):
+        if event == 'map_key':
+            keys[-1] = value
+            if untyped_depth is None or untyped_depth == len(stack):
+                untyped_depth = len(stack) if value in untyped_keys else None
+        elif event == 'start_map':
+            stack.append(dict())
+            keys.append(None)
+        elif event == 'start_array':
+            stack.append(_ArrayBuilder(typed=untyped_depth is None))
+        elif event == 'end_map':
+            if untyped_depth == len(stack):
+                untyped_depth = None
+            keys.pop()
+            add(stack.pop())
+        elif event == 'end_array':
+            add(stack.pop().value())
+        else:
+            add(value)
+    return root
+
+
+def _adapt_float_buffer(buffer):
+    return AsIs("'{%s}'::float8[]" % ",".join(map(repr, buffer)))
+
+
+def _ndarray_literal(values):
+    if values.ndim == 1:
+        return "{" + ",".join(map(repr, values.tolist())) + "}"
+    return "{" + ",".join(_ndarray_literal(v) for v in values) + "}"
+
+
+def _adapt_ndarray(values):
+    if values.dtype.kind == 'f':
+        return AsIs("'%s'::float8[]" % (_ndarray_literal(values) if values.size > 0 else "{}"))
+    return adapt(values.tolist())
+
+
+def register_series_adapters():
+    """
+    Let psycopg2 write array('d') buffers and numpy arrays as PostgreSQL float8 arrays.
+    Django's ArrayField only converts lists and tuples item by item and passes other values through to psycopg2.
+    """
+    register_adapter(array, _adapt_float_buffer)
+    register_adapter(np.ndarray, _adapt_ndarray)
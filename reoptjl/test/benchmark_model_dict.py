@@ -0,0 +1,74 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+"""
+Benchmark of BaseModel.dict for the input and output models of a 15-minute run (35,040 time steps).
+The former implementation deep copied the model __dict__, which copies every float of every series one at a time.
+Run from the repository root with:
+    python manage.py shell -c "from reoptjl.test.benchmark_model_dict import main; main()"
+"""
+import copy
+import tracemalloc
+from time import perf_counter
+import numpy as np
+from reoptjl.fields import Series
+from reoptjl.models import ElectricLoadInputs, ElectricTariffInputs, PVInputs, ElectricLoadOutputs, PVOutputs, \
+    ElectricUtilityOutputs
+
+
+def dict_reference(obj):
+    """ BaseModel.dict as implemented before reo.src.model_dict """
+    d = copy.deepcopy(obj.__dict__)
+    d.pop("_state", None)
+    d.pop("id", None)
+    d.pop("basemodel_ptr_id", None)
+    d.pop("meta_id", None)
+    for k, v in d.items():
+        if isinstance(v, Series):
+            d[k] = v.tolist()
+    return d
+
+
+def models_of_run(n_timesteps):
+    rng = np.random.default_rng(42)
+    series = lambda: (rng.random(n_timesteps) * 100).tolist()
+    return [
+        ElectricLoadInputs(loads_kw=series(), critical_loads_kw=series()),
+        ElectricTariffInputs(tou_energy_rates_per_kwh=series(), wholesale_rate=series(),
+                             export_rate_beyond_net_metering_limit=series()),
+        PVInputs(production_factor_series=series()),
+        ElectricLoadOutputs(load_series_kw=Series.from_values(series()),
+                            critical_load_series_kw=Series.from_values(series())),
+        PVOutputs(electric_to_load_series_kw=Series.from_values(series()),
+                  electric_to_grid_series_kw=Series.from_values(series()),
+                  electric_curtailed_series_kw=Series.from_values(series()),
+                  production_factor_series=Series.from_values(series())),
+        ElectricUtilityOutputs(electric_to_load_series_kw=Series.from_values(series()),
+                               electric_to_storage_series_kw=Series.from_values(series())),
+    ]
+
+
+def measure(func, objs, repeat):
+    start = perf_counter()
+    for _ in range(repeat):
+        for obj in objs:
+            func(obj)
+    seconds = (perf_counter() - start) / repeat
+    tracemalloc.start()
+    for obj in objs:
+        func(obj)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main(n_timesteps=35040, repeat=10):
+    objs = models_of_run(n_timesteps)
+    for obj in objs:
+        assert obj.dict == dict_reference(obj), type(obj).__name__
+    print("{:>10} {:>12} {:>16}".format("", "time [ms]", "peak alloc [MB]"))
+    for name, func in [("reference", dict_reference), ("current", lambda obj: obj.dict)]:
+        seconds, peak = measure(func, objs, repeat)
+        print("{:>10} {:>12.1f} {:>16.1f}".format(name, seconds * 1000, peak / 1e6))
+
+
+if __name__ == "__main__":
+    main()
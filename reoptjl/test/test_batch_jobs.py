@@ -0,0 +1,99 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+import copy
+import json
+import os
+import uuid
+from unittest import mock
+from django.test import TestCase
+from reoptjl.models import APIMeta, SiteInputs, PVInputs, ElectricTariffInputs, RunProfile, RunSummary
+from reoptjl.src.batch_jobs import lanes
+from reoptjl.src import input_handoff
+
+
+class TestBatchJobs(TestCase):
+
+    def setUp(self):
+        post_file = os.path.join('reoptjl', 'test', 'posts', 'validator_post.json')
+        self.post = json.load(open(post_file, 'r'))
+        self.post.pop("CHP")
+
+    def scenarios(self, n):
+        scenarios = []
+        for i in range(n):
+            scenario = copy.deepcopy(self.post)
+            scenario["Site"]["latitude"] += 0.01 * i
+            scenarios.append(scenario)
+        return scenarios
+
+    def test_lanes(self):
+        self.assertEqual(lanes(list(range(5)), 2), [[0, 2, 4], [1, 3]])
+        self.assertEqual(lanes(list(range(2)), 4), [[0], [1]])
+
+    @mock.patch("reoptjl.src.batch_jobs.group")
+    def test_batch(self, mock_group):
+        portfolio_uuid = str(uuid.uuid4())
+        resp = self.client.post('/v3/job/batch', content_type='application/json', data={
+            "scenarios": self.scenarios(5), "portfolio_uuid": portfolio_uuid, "max_concurrency": 2})
+        self.assertEqual(resp.status_code, 201)
+        run_uuids = json.loads(resp.content)["run_uuids"]
+        self.assertEqual(len(run_uuids), 5)
+
+        metas = APIMeta.objects.filter(run_uuid__in=run_uuids)
+        self.assertEqual(metas.count(), 5)
+        self.assertEqual(set(metas.values_list("status", flat=True)), {"Optimizing..."})
+        self.assertEqual({str(p) for p in metas.values_list("portfolio_uuid", flat=True)}, {portfolio_uuid})
+        self.assertEqual(SiteInputs.objects.filter(meta__in=metas).count(), 5)
+        self.assertAlmostEqual(SiteInputs.objects.get(meta__run_uuid=run_uuids[2]).latitude,
+                               self.post["Site"]["latitude"] + 0.02)
+        self.assertEqual(PVInputs.objects.filter(meta__in=metas).count(), 5)
+        self.assertEqual(ElectricTariffInputs.objects.filter(meta__in=metas).count(), 5)
+        self.assertEqual(RunProfile.objects.filter(meta__in=metas, validation_seconds__gt=0).count(), 5)
+        self.assertEqual(RunSummary.objects.filter(run_uuid__in=run_uuids).count(), 5)
+
+        # one group of two lanes with all of the run_uuids
+        signatures = list(mock_group.call_args[0][0])
+        self.assertEqual(len(signatures), 2)
+        self.assertEqual(sorted(r for s in signatures for r in s.args[0]), sorted(run_uuids))
+        mock_group.return_value.apply_async.assert_called_once()
+
+        # max_concurrency is capped on the server
+        with mock.patch("reoptjl.views.MAX_BATCH_CONCURRENCY", 3):
+            resp = self.client.post('/v3/job/batch', content_type='application/json', data={
+                "scenarios": self.scenarios(5), "max_concurrency": 1000})
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(len(list(mock_group.call_args[0][0])), 3)
+
+    @mock.patch("reoptjl.src.batch_jobs.group")
+    def test_lane_inline_inputs_are_capped(self, mock_group):
+        redis = mock.MagicMock()
+        with mock.patch.object(input_handoff, "_redis", return_value=redis):
+            resp = self.client.post('/v3/job/batch', content_type='application/json', data={
+                "scenarios": self.scenarios(3), "max_concurrency": 1})
+            self.assertEqual(resp.status_code, 201)
+            handoffs = list(mock_group.call_args[0][0])[0].kwargs["handoffs"]
+            input_json_bytes = [len(h["input_json"]) for h in handoffs.values() if "input_json" in h]
+            self.assertEqual(len(input_json_bytes), 3)
+
+            mock_group.reset_mock()
+            with mock.patch.dict(os.environ, {"REOPT_INPUT_HANDOFF_MAX_BYTES": str(input_json_bytes[0] + 1)}):
+                resp = self.client.post('/v3/job/batch', content_type='application/json', data={
+                    "scenarios": self.scenarios(3), "max_concurrency": 1})
+                handoffs = list(mock_group.call_args[0][0])[0].kwargs["handoffs"]  # group consumes the generator
+            self.assertEqual([set(handoffs[r]) for r in json.loads(resp.content)["run_uuids"]],
+                             [{"input_json"}, {"input_handoff"}, {"input_handoff"}])
+            self.assertEqual(redis.set.call_count, 2)
+
+    @mock.patch("reoptjl.src.batch_jobs.group")
+    def test_invalid_scenario_saves_nothing(self, mock_group):
+        scenarios = self.scenarios(3)
+        scenarios[1].pop("ElectricLoad")
+        n_metas = APIMeta.objects.count()
+        resp = self.client.post('/v3/job/batch', content_type='application/json', data={"scenarios": scenarios})
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(list(json.loads(resp.content)["messages"]["input_errors"]), ["1"])
+        self.assertEqual(APIMeta.objects.count(), n_metas)
+        mock_group.assert_not_called()
+
+        self.assertEqual(self.client.post('/v3/job/batch', content_type='application/json',
+                                          data={"scenarios": []}).status_code, 400)
+        self.assertEqual(self.client.get('/v3/job/batch').status_code, 405)
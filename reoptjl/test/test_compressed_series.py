@@ -0,0 +1,39 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+import uuid
+from array import array
+import numpy as np
+from django.test import TestCase
+from reoptjl.fields import Series, encode_series, decode_series
+from reoptjl.models import APIMeta, ElectricLoadOutputs
+
+
+class TestCompressedSeries(TestCase):
+
+    def test_encode_decode(self):
+        values = np.random.default_rng(42).random(8760) * 100
+        for v in [values, values.tolist(), array('d', values)]:
+            data = encode_series(v)
+            self.assertLess(len(data), values.nbytes)
+            np.testing.assert_array_equal(decode_series(data), values)
+
+        s = Series.from_values(values, dtype="float32")
+        self.assertEqual(s.dtype, np.dtype("float32"))
+        np.testing.assert_allclose(s.array, values, rtol=1e-6)
+
+        self.assertLess(len(encode_series([0.0] * 35040)), 1000)
+        self.assertEqual(Series.from_values([1.0, None, 2.0]).tolist(), [1.0, None, 2.0])
+        self.assertEqual(Series.from_values([]).tolist(), [])
+
+    def test_model_round_trip(self):
+        meta = APIMeta.objects.create(run_uuid=uuid.uuid4(), user_uuid=uuid.uuid4(), status="optimal",
+                                      api_version=3)
+        load = [float(i % 24) for i in range(8760)]
+        ElectricLoadOutputs.objects.create(meta=meta, load_series_kw=array('d', load),
+                                           critical_load_series_kw=np.array(load) / 2)
+        obj = ElectricLoadOutputs.objects.get(meta=meta)
+        self.assertIsInstance(obj.load_series_kw, Series)
+        self.assertEqual(obj.load_series_kw, load)
+        self.assertEqual(max(obj.critical_load_series_kw), 11.5)
+        d = obj.dict
+        self.assertEqual(d["load_series_kw"], load)
+        self.assertEqual(d["offgrid_load_met_series_kw"], [])
@@ -0,0 +1,70 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+import json
+import os
+import uuid
+from unittest import mock
+from django.test import TestCase
+from reoptjl.models import get_input_dict_from_models, get_input_dict_from_run_uuid
+from reoptjl.validators import InputValidator
+from reoptjl.src import input_handoff
+from reoptjl.src.input_handoff import hand_off, take_input_dict
+
+
+class TestInputHandoff(TestCase):
+
+    def setUp(self):
+        post_file = os.path.join('reoptjl', 'test', 'posts', 'validator_post.json')
+        self.post = json.load(open(post_file, 'r'))
+        self.post["APIMeta"]["run_uuid"] = str(uuid.uuid4())
+        self.post["APIMeta"]["user_uuid"] = str(uuid.uuid4())
+        self.post["PV"] = [dict(self.post["PV"], name="roof"), dict(self.post["PV"], name="ground")]
+
+    def save_job(self):
+        validator = InputValidator(self.post)
+        validator.clean_fields()
+        validator.clean()
+        validator.cross_clean()
+        self.assertTrue(validator.is_valid)
+        validator.save()
+        return validator
+
+    def test_input_dict_from_models_matches_database(self):
+        validator = self.save_job()
+        from_models = get_input_dict_from_models(validator.models["APIMeta"], validator.models.values())
+        from_db = get_input_dict_from_run_uuid(self.post["APIMeta"]["run_uuid"])
+        self.assertEqual(from_models, from_db)
+        self.assertEqual(len(from_models["PV"]), 2)
+
+    def test_handoff_matches_database(self):
+        validator = self.save_job()
+        run_uuid = self.post["APIMeta"]["run_uuid"]
+
+        handoff = hand_off(run_uuid, validator.models["APIMeta"], validator.models.values())
+        self.assertEqual(set(handoff), {"input_json"})
+        data = take_input_dict(run_uuid, **handoff)
+        from_db = json.loads(json.dumps(get_input_dict_from_run_uuid(run_uuid), default=str))
+        self.assertEqual(data, from_db)
+        self.assertEqual([pv["name"] for pv in data["PV"]], ["roof", "ground"])
+
+        with mock.patch.dict(os.environ, {"REOPT_INPUT_HANDOFF": "none"}):
+            self.assertEqual(hand_off(run_uuid, validator.models["APIMeta"], validator.models.values()), {})
+        self.assertIsNone(take_input_dict(run_uuid))
+        self.assertIsNone(take_input_dict(run_uuid, input_json="{not json"))
+
+    def test_inline_size_cap(self):
+        validator = self.save_job()
+        run_uuid = self.post["APIMeta"]["run_uuid"]
+        args = (run_uuid, validator.models["APIMeta"], validator.models.values())
+        redis = mock.MagicMock()
+        with mock.patch.object(input_handoff, "_redis", return_value=redis):
+            self.assertEqual(set(hand_off(*args)), {"input_json"})
+            redis.set.assert_not_called()
+
+            with mock.patch.dict(os.environ, {"REOPT_INPUT_HANDOFF_MAX_BYTES": "1000"}):
+                self.assertEqual(hand_off(*args), {"input_handoff": "redis"})
+            self.assertEqual(hand_off(*args, max_inline_bytes=0), {"input_handoff": "redis"})
+            self.assertEqual(redis.set.call_count, 2)
+            self.assertEqual(redis.set.call_args[0][0], input_handoff.KEY_PREFIX + run_uuid)
+
+        with mock.patch.object(input_handoff, "_redis", side_effect=ConnectionError):
+            self.assertEqual(hand_off(*args, max_inline_bytes=0), {})
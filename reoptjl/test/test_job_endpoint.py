@@ -11,6 +11,7 @@ import logging
 import requests
 logging.disable(logging.CRITICAL)
 import os
+import uuid
 
 
 class TestJobEndpoint(ResourceTestCaseMixin, TransactionTestCase):
@@ -341,4 +342,55 @@ class TestJobEndpoint(ResourceTestCaseMixin, TransactionTestCase):
         r = json.loads(resp.content)
         
         self.assertEquals(r["inputs"]["PV"]["size_class"], 2)
-        self.assertAlmostEqual(r["inputs"]["PV"]["installed_cost_per_kw"], 2914.6, delta=0.05 * 2914.6)
\ No newline at end of file
+        self.assertAlmostEqual(r["inputs"]["PV"]["installed_cost_per_kw"], 2914.6, delta=0.05 * 2914.6)
+
+    def test_reuse_results_of_identical_inputs(self):
+        post_file = os.path.join('reoptjl', 'test', 'posts', 'pv_batt_emissions.json')
+        post = json.load(open(post_file, 'r'))
+        post["user_uuid"] = str(uuid.uuid4())
+
+        resp = self.api_client.post('/v3/job/', format='json', data=post)
+        self.assertHttpCreated(resp)
+        first_run_uuid = json.loads(resp.content).get('run_uuid')
+        first = json.loads(self.api_client.get(f'/v3/job/{first_run_uuid}/results').content)
+
+        post["reuse_results"] = True
+        resp = self.api_client.post('/v3/job/', format='json', data=post)
+        self.assertHttpCreated(resp)
+        run_uuid = json.loads(resp.content).get('run_uuid')
+        self.assertNotEqual(run_uuid, first_run_uuid)
+        r = json.loads(self.api_client.get(f'/v3/job/{run_uuid}/results').content)
+
+        self.assertEqual(r["status"], "optimal")
+        self.assertIn("reused_results", r["messages"])
+        self.assertNotIn(first_run_uuid, r["messages"]["reused_results"])
+        self.assertEqual(r["outputs"]["Financial"]["lcc"], first["outputs"]["Financial"]["lcc"])
+        self.assertEqual(r["outputs"]["PV"]["size_kw"], first["outputs"]["PV"]["size_kw"])
+        self.assertEqual(r["inputs"]["Financial"]["NOx_grid_cost_per_tonne"],
+                         first["inputs"]["Financial"]["NOx_grid_cost_per_tonne"])
+
+    def test_reuse_results_of_same_user_only(self):
+        from reoptjl.models import APIMeta
+        from reoptjl.src.reuse_results import find_reusable_run, reopt_jl_version
+        user_uuid = str(uuid.uuid4())
+        source = APIMeta.objects.create(run_uuid=uuid.uuid4(), user_uuid=user_uuid, status="optimal",
+                                        reopt_version=reopt_jl_version(), input_hash="abc")
+        run_uuid = str(uuid.uuid4())
+
+        self.assertEqual(find_reusable_run("abc", run_uuid, user_uuid), source)
+        self.assertIsNone(find_reusable_run("abc", run_uuid, str(uuid.uuid4())))
+        self.assertIsNone(find_reusable_run("abc", run_uuid, ""))
+
+    def test_unsolved_ghpghx_response_uuid(self):
+        from ghpghx.models import GHPGHXInputs, SOLVING
+        ghp_uuid = str(uuid.uuid4())
+        GHPGHXInputs(ghp_uuid=ghp_uuid, status=SOLVING).save()
+
+        post_file = os.path.join('reoptjl', 'test', 'posts', 'hybrid_ghp.json')
+        post = json.load(open(post_file, 'r'))
+        post["GHP"].pop("ghpghx_inputs")
+        post["GHP"]["ghpghx_response_uuids"] = [ghp_uuid]
+        resp = self.api_client.post('/v3/job/', format='json', data=post)
+        self.assertHttpBadRequest(resp)
+        r = json.loads(resp.content)
+        self.assertIn("ghpghx_response_uuids", r["messages"]["input_errors"]["GHP"])
@@ -0,0 +1,20 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+from django.test import SimpleTestCase
+from reoptjl.models import ElectricTariffInputs
+from reoptjl.test.benchmark_model_dict import dict_reference, models_of_run
+
+
+class TestModelDict(SimpleTestCase):
+
+    def test_dict_matches_deepcopy(self):
+        for obj in models_of_run(96):
+            self.assertEqual(obj.dict, dict_reference(obj), type(obj).__name__)
+
+    def test_dict_does_not_share_mutable_values(self):
+        obj = ElectricTariffInputs(tou_energy_rates_per_kwh=[0.1] * 8760, urdb_response={"energyratestructure": [[]]},
+                                   coincident_peak_load_active_time_steps=[[1, 2], [3]])
+        d = obj.dict
+        d["tou_energy_rates_per_kwh"][0] = 1.0
+        d["urdb_response"]["energyratestructure"].append([])
+        self.assertEqual(obj.tou_energy_rates_per_kwh[0], 0.1)
+        self.assertEqual(obj.urdb_response, {"energyratestructure": [[]]})
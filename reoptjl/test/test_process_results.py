@@ -0,0 +1,28 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+import uuid
+from django.test import TestCase
+from reo.exceptions import UnexpectedError
+from reoptjl.models import APIMeta, FinancialOutputs, Message
+from reoptjl.src.process_results import process_results
+from reoptjl.src.run_jump_model import run_jump_model
+
+
+class TestProcessResults(TestCase):
+
+    def test_failed_save_sets_error_status(self):
+        run_uuid = str(uuid.uuid4())
+        meta = APIMeta.objects.create(run_uuid=run_uuid, user_uuid=uuid.uuid4(), status="Optimizing...",
+                                      api_version=3)
+        results = {"status": "optimal", "Financial": {"lcc": 1.0e7}}  # missing ElectricTariff etc.
+
+        with self.assertRaises(UnexpectedError) as cm:
+            process_results(results, run_uuid)
+        self.assertEqual(cm.exception.run_uuid, run_uuid)
+        meta.refresh_from_db()
+        self.assertEqual(meta.status, "Optimizing...")
+        self.assertFalse(FinancialOutputs.objects.filter(meta=meta).exists())
+
+        run_jump_model.on_failure(cm.exception, "task_id", (run_uuid,), {}, None)
+        meta.refresh_from_db()
+        self.assertEqual(meta.status, "An error occurred. See messages for more.")
+        self.assertTrue(Message.objects.filter(meta=meta, message_type="error").exists())
@@ -0,0 +1,60 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+import json
+import uuid
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from reoptjl.models import APIMeta, SiteInputs, Settings, FinancialInputs, ElectricLoadInputs, FinancialOutputs, \
+    PVOutputs
+
+
+class TestResultsProjection(TestCase):
+
+    def setUp(self):
+        self.meta = APIMeta.objects.create(run_uuid=uuid.uuid4(), user_uuid=uuid.uuid4(), status="optimal",
+                                           api_version=3)
+        SiteInputs.objects.create(meta=self.meta, latitude=39.7, longitude=-105.2,
+                                  outdoor_air_temperature_degF=[50.0] * 8760)
+        for model in [Settings, FinancialInputs, ElectricLoadInputs]:  # read by the results endpoint without keys
+            model.objects.create(meta=self.meta)
+        FinancialOutputs.objects.create(meta=self.meta, npv=1000.0, lcc=5000.0)
+        for i in range(2):
+            PVOutputs.objects.create(meta=self.meta, name="PV{}".format(i), size_kw=float(i),
+                                     electric_to_load_series_kw=[1.0] * 8760)
+        self.url = '/v3/job/{}/results'.format(self.meta.run_uuid)
+
+    def get(self, params):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(self.url + params)
+        return resp, len(queries)
+
+    def test_keys(self):
+        resp, n_queries = self.get("?keys=status,inputs.Site.latitude,outputs.Financial.npv,outputs.PV.size_kw")
+        self.assertEqual(resp.status_code, 200)
+        r = json.loads(resp.content)
+        self.assertEqual(r, {
+            "status": "optimal",
+            "inputs": {"Site": {"latitude": 39.7}},
+            "outputs": {"Financial": {"npv": 1000.0}, "PV": [{"size_kw": 0.0}, {"size_kw": 1.0}]},
+        })
+        self.assertEqual(n_queries, 4)  # APIMeta plus one per model
+
+        resp, _ = self.get("?keys=outputs.Financial.not_a_field")
+        self.assertEqual(resp.status_code, 400)
+        resp, _ = self.get("?keys=outputs.NotAModel")
+        self.assertEqual(resp.status_code, 400)
+
+    def test_exclude_series(self):
+        full = json.loads(self.get("")[0].content)
+        r = json.loads(self.get("?exclude_series=true")[0].content)
+        self.assertIn("outdoor_air_temperature_degF", full["inputs"]["Site"])
+        self.assertNotIn("outdoor_air_temperature_degF", r["inputs"]["Site"])
+        self.assertEqual(r["inputs"]["Site"]["latitude"], 39.7)
+        self.assertNotIn("electric_to_load_series_kw", r["outputs"]["PV"][0])
+        self.assertEqual(r["outputs"]["PV"][1]["size_kw"], 1.0)
+        self.assertEqual(r["outputs"]["Financial"], full["outputs"]["Financial"])
+        self.assertEqual(r["status"], full["status"])
+
+        # explicitly requested series are returned
+        r = json.loads(self.get("?exclude_series=true&keys=outputs.PV.electric_to_load_series_kw")[0].content)
+        self.assertEqual(len(r["outputs"]["PV"][0]["electric_to_load_series_kw"]), 8760)
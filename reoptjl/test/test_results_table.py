@@ -0,0 +1,57 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+import json
+import uuid
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from reoptjl.custom_table_config import custom_table_webtool
+from reoptjl.custom_table_helpers import flatten_dict, safe_get, sum_vectors
+from reoptjl.models import APIMeta, UserProvidedMeta, Settings, FinancialInputs, ElectricLoadInputs, SiteInputs, \
+    FinancialOutputs, PVOutputs, ElectricUtilityOutputs, ElectricTariffOutputs, ElectricLoadOutputs, SiteOutputs
+from reoptjl.src.results_table import referenced_keys, table_data
+
+
+class TestResultsTable(TestCase):
+
+    def add_run(self, i):
+        meta = APIMeta.objects.create(run_uuid=uuid.uuid4(), user_uuid=uuid.uuid4(), status="optimal",
+                                      api_version=3, webtool_uuid=str(uuid.uuid4()))
+        UserProvidedMeta.objects.create(meta=meta, description="run {}".format(i), address="")
+        SiteInputs.objects.create(meta=meta, latitude=39.7, longitude=-105.2)
+        for model in [Settings, FinancialInputs, ElectricLoadInputs]:  # read by the results endpoint
+            model.objects.create(meta=meta)
+        FinancialOutputs.objects.create(meta=meta, npv=1000.0 * i, lcc=5000.0, lcc_bau=6000.0)
+        PVOutputs.objects.create(meta=meta, size_kw=10.0 * i, electric_to_load_series_kw=[0.5] * 8760)
+        ElectricUtilityOutputs.objects.create(meta=meta, electric_to_load_series_kw=[2.0] * 8760,
+                                              electric_to_storage_series_kw=[0.0] * 8760)
+        for model in [ElectricTariffOutputs, ElectricLoadOutputs, SiteOutputs]:  # saved with the Financial outputs
+            model.objects.create(meta=meta)
+        return str(meta.run_uuid)
+
+    def test_table_data_matches_results(self):
+        run_uuids = [self.add_run(i) for i in range(3)] + [str(uuid.uuid4())]
+        with CaptureQueriesContext(connection) as queries:
+            data = table_data(run_uuids, custom_table_webtool)
+        n_queries = len(queries)
+        self.assertLessEqual(n_queries, 30)  # one per model, independent of the number of runs
+
+        keys = referenced_keys(custom_table_webtool)
+        for run_uuid in run_uuids[:3]:
+            expected = flatten_dict(sum_vectors(json.loads(self.client.get('/v3/job/{}/results'.format(run_uuid)).content)))
+            actual = flatten_dict(data[run_uuid])
+            for key in keys:
+                self.assertEqual(safe_get(actual, key), safe_get(expected, key), key)
+        self.assertEqual(flatten_dict(data[run_uuids[1]])["outputs.PV.electric_to_load_series_kw"], 4380.0)
+        self.assertIn("error", data[run_uuids[3]])
+
+        run_uuids += [self.add_run(i) for i in range(3, 10)]
+        with CaptureQueriesContext(connection) as queries:
+            table_data(run_uuids, custom_table_webtool)
+        self.assertEqual(len(queries), n_queries)
+
+    def test_generate_results_table(self):
+        run_uuids = [self.add_run(i) for i in range(2)]
+        params = "&".join("run_uuid[{}]={}".format(i, r) for i, r in enumerate(run_uuids))
+        resp = self.client.get('/v3/job/generate_results_table/?' + params)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['Content-Type'], 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
@@ -0,0 +1,48 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+import json
+import uuid
+from django.test import TestCase
+from reoptjl.models import APIMeta, RunProfile
+from reoptjl.src.run_profile import StageTimer, save_run_profile, STAGE_FIELDS
+
+
+class TestRunProfile(TestCase):
+
+    def add_run(self, seconds):
+        meta = APIMeta.objects.create(run_uuid=uuid.uuid4(), user_uuid=uuid.uuid4(), status="optimal",
+                                      api_version=3)
+        save_run_profile(str(meta.run_uuid), seconds)
+        return str(meta.run_uuid)
+
+    def test_stage_timer(self):
+        timer = StageTimer()
+        with timer.stage("validation"):
+            pass
+        with self.assertRaises(ValueError):
+            with timer.stage("julia"):
+                raise ValueError
+        timer.add("julia", 1.0)
+        self.assertEqual(set(timer.seconds), {"validation_seconds", "julia_seconds"})
+        self.assertGreaterEqual(timer.seconds["julia_seconds"], 1.0)
+        self.assertTrue(set(timer.seconds).issubset(STAGE_FIELDS))
+
+    def test_save_and_stats(self):
+        run_uuid = self.add_run({"validation_seconds": 0.5, "input_save_seconds": 0.25})
+        save_run_profile(run_uuid, {"julia_seconds": 30.0, "process_results_seconds": 1.5})
+        profile = RunProfile.objects.get(meta__run_uuid=run_uuid)
+        self.assertEqual((profile.validation_seconds, profile.julia_seconds), (0.5, 30.0))
+        for i in range(1, 20):
+            self.add_run({"validation_seconds": 0.5 + i, "julia_seconds": 30.0 + i})
+
+        r = json.loads(self.client.get('/v3/job/{}/results?keys=status,profile'.format(run_uuid)).content)
+        self.assertEqual(r["profile"]["julia_seconds"], 30.0)
+        self.assertEqual(r["profile"]["process_results_seconds"], 1.5)
+
+        resp = self.client.get('/v3/job/profile_stats?days=1')
+        self.assertEqual(resp.status_code, 200)
+        stages = json.loads(resp.content)["stages"]
+        self.assertEqual(stages["julia_seconds"]["count"], 20)
+        self.assertAlmostEqual(stages["julia_seconds"]["p50"], 39.5)
+        self.assertAlmostEqual(stages["julia_seconds"]["p95"], 48.05)
+        self.assertEqual(stages["queue_wait_seconds"], {"count": 0})
+        self.assertEqual(self.client.get('/v3/job/profile_stats?days=-1').status_code, 400)
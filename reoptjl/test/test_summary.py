@@ -0,0 +1,111 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+import io
+import json
+import os
+import uuid
+from unittest import mock
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from reoptjl.models import APIMeta, UserProvidedMeta, PVOutputs, ElectricStorageOutputs, RunSummary, UserUnlinkedRuns
+from reoptjl.src.run_summary import refresh_run_summaries
+
+
+class TestSummary(TestCase):
+
+    def setUp(self):
+        self.user_uuid = str(uuid.uuid4())
+
+    def add_runs(self, n, summarize=True):
+        run_uuids = []
+        for i in range(n):
+            meta = APIMeta.objects.create(run_uuid=uuid.uuid4(), user_uuid=self.user_uuid, status="optimal", api_version=3)
+            UserProvidedMeta.objects.create(meta=meta, description="run {}".format(i), address="")
+            PVOutputs.objects.create(meta=meta, size_kw=float(i))
+            ElectricStorageOutputs.objects.create(meta=meta, size_kw=1.0, size_kwh=4.0)
+            run_uuids.append(str(meta.run_uuid))
+        if summarize:  # as done when the jobs complete
+            refresh_run_summaries(APIMeta.objects.filter(run_uuid__in=run_uuids))
+        return run_uuids
+
+    def get_summary(self, params=""):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get('/v3/user/{}/summary{}'.format(self.user_uuid, params))
+        return len(queries), json.loads(resp.content)
+
+    def test_summary_query_count_does_not_grow_with_runs(self):
+        self.add_runs(2)
+        n_queries_few_runs, r = self.get_summary()
+        self.assertEqual(len(r["scenarios"]), 2)
+
+        self.add_runs(25)
+        n_queries_many_runs, r = self.get_summary()
+        self.assertEqual(len(r["scenarios"]), 27)
+        self.assertEqual(n_queries_few_runs, n_queries_many_runs)
+        self.assertEqual(r["scenarios"][0]["batt_kwh"], 4.0)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/v3/user/{}/summary_by_chunk/2?chunk_size=10'.format(self.user_uuid))
+        self.assertEqual(len(queries), n_queries_many_runs + 1)  # plus the count for the number of chunks
+
+    def test_summary_keyset_pagination(self):
+        run_uuids = self.add_runs(7)
+        self.client.get('/v3/user/{}/unlink/{}'.format(self.user_uuid, run_uuids[3]))
+        expected = [s["run_uuid"] for s in self.get_summary()[1]["scenarios"]]
+        self.assertEqual(sorted(expected), sorted(run_uuids[:3] + run_uuids[4:]))
+
+        paged, cursor = [], ""
+        while True:
+            r = self.get_summary("?limit=4&cursor={}".format(cursor))[1]
+            paged += [s["run_uuid"] for s in r["scenarios"]]
+            cursor = r["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(paged, expected)
+
+        resp = self.client.get('/v3/user/{}/summary?limit=0'.format(self.user_uuid))
+        self.assertEqual(resp.status_code, 400)
+
+    def test_backfill_run_summaries(self):
+        run_uuids = self.add_runs(3, summarize=False)
+        self.assertEqual(RunSummary.objects.count(), 0)
+        call_command('backfill_run_summaries', batch_size=2, stdout=open(os.devnull, 'w'))
+        r = self.get_summary()[1]
+        self.assertEqual(sorted(s["run_uuid"] for s in r["scenarios"]), sorted(run_uuids))
+        self.assertEqual({s["description"] for s in r["scenarios"]}, {"run 0", "run 1", "run 2"})
+
+    def test_failed_refresh_drops_stale_summary(self):
+        run_uuids = self.add_runs(2)
+        APIMeta.objects.filter(run_uuid=run_uuids[0]).update(status="error")
+        with mock.patch("reoptjl.src.run_summary.queryset_for_summary", side_effect=ValueError):
+            self.assertFalse(refresh_run_summaries(APIMeta.objects.filter(run_uuid=run_uuids[0])))
+        self.assertFalse(RunSummary.objects.filter(run_uuid=run_uuids[0]).exists())
+        statuses = {s["run_uuid"]: s["status"] for s in self.get_summary()[1]["scenarios"]}
+        self.assertEqual(statuses, {run_uuids[0]: "error", run_uuids[1]: "optimal"})
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with mock.patch("reoptjl.src.run_summary.queryset_for_summary", side_effect=ValueError):
+            call_command('backfill_run_summaries', '--all', batch_size=1, stdout=stdout, stderr=stderr)
+        self.assertIn("Summarized 0 runs, could not summarize 2 runs.", stdout.getvalue())
+        self.assertIn("Could not summarize", stderr.getvalue())
+        self.assertEqual(RunSummary.objects.count(), 0)
+
+    def test_runs_without_summary_rows(self):
+        run_uuids = self.add_runs(3, summarize=False)  # eg. created before RunSummary
+        r = self.get_summary()[1]
+        self.assertEqual(sorted(s["run_uuid"] for s in r["scenarios"]), sorted(run_uuids))
+        self.assertEqual(RunSummary.objects.count(), 3)
+
+        # a run unlinked by another user stays in this user's summary
+        UserUnlinkedRuns.objects.create(run_uuid=run_uuids[0], user_uuid=uuid.uuid4())
+        refresh_run_summaries(APIMeta.objects.filter(run_uuid__in=run_uuids))
+        self.assertEqual(len(self.get_summary()[1]["scenarios"]), 3)
+
+    def test_invalid_job_in_summary(self):
+        post = json.load(open(os.path.join('reoptjl', 'test', 'posts', 'validator_post.json'), 'r'))
+        post["user_uuid"] = self.user_uuid
+        post["Site"]["latitude"] = 100.0
+        resp = self.client.post('/v3/job/', data=json.dumps(post), content_type='application/json')
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(RunSummary.objects.filter(user_uuid=self.user_uuid).count(), 1)
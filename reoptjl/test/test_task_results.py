@@ -0,0 +1,53 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+import os
+from datetime import timedelta
+from unittest import mock
+from django.test import TestCase
+from django.utils import timezone
+from django_celery_results.models import TaskResult
+from reo.src import task_results
+
+
+class FakeRedis(dict):
+
+    def set(self, key, value, ex=None):
+        self[key] = value.encode()
+
+    def delete(self, key):
+        self.pop(key, None)
+
+
+class TestTaskResults(TestCase):
+
+    def test_cap_and_resolve(self):
+        redis = FakeRedis()
+        with mock.patch.object(task_results, "_redis", return_value=redis), \
+                mock.patch.dict(os.environ, {"REOPT_RESULT_MAX_BYTES": "100"}):
+            small = {"resilience_hours_min": 4}
+            self.assertIs(task_results.cap_result(small), small)
+            self.assertIs(task_results.resolve_result(small), small)
+
+            large = list(range(8760))
+            ref = task_results.cap_result(large)
+            self.assertEqual(list(ref), [task_results.REF_KEY])
+            self.assertEqual(task_results.resolve_result(ref), large)
+            self.assertEqual(task_results.resolve_result(ref, delete=True), large)
+            self.assertEqual(redis, {})
+            with self.assertRaises(KeyError):
+                task_results.resolve_result(ref)
+
+        with mock.patch.object(task_results, "_redis", side_effect=ConnectionError), \
+                mock.patch.dict(os.environ, {"REOPT_RESULT_MAX_BYTES": "100"}):
+            self.assertEqual(task_results.cap_result(large), large)
+
+    def test_expire_task_results(self):
+        for i in range(5):
+            TaskResult.objects.create(task_id="old-{}".format(i), status="SUCCESS")
+        TaskResult.objects.create(task_id="new", status="SUCCESS")
+        TaskResult.objects.filter(task_id__startswith="old").update(date_done=timezone.now() - timedelta(days=8))
+
+        self.assertEqual(task_results.expire_task_results(max_age_days=7, batch_size=2), 5)
+        self.assertEqual(list(TaskResult.objects.values_list("task_id", flat=True)), ["new"])
+        stats = task_results.task_result_stats()
+        self.assertEqual(stats["task_results"], 1)
+        self.assertEqual(stats["task_results_by_status"], {"SUCCESS": 1})
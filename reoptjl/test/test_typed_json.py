@@ -0,0 +1,113 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+import io
+import json
+import math
+from array import array
+import numpy as np
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from reoptjl.src.typed_json import load_json_with_typed_series, MIN_TYPED_ARRAY_LENGTH, _adapt_float_buffer, \
+    _adapt_ndarray
+
+N = MIN_TYPED_ARRAY_LENGTH
+
+
+def plain(value):
+    """
+    :return: value with the array('d') series converted to lists, for comparison with json.loads
+    """
+    if isinstance(value, array):
+        return value.tolist()
+    if isinstance(value, dict):
+        return {k: plain(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [plain(v) for v in value]
+    return value
+
+
+def load(doc, untyped_keys=()):
+    return load_json_with_typed_series(io.BytesIO(json.dumps(doc).encode()), untyped_keys=untyped_keys)
+
+
+class TestLoadJsonWithTypedSeries(SimpleTestCase):
+
+    def test_array_types(self):
+        doc = {
+            "floats": [0.5 * i for i in range(N)],
+            "ints_and_floats": [1] + [0.5] * (N - 1),
+            "ints": list(range(N)),
+            "short": [0.5] * (N - 1),
+            "mixed": [0.5] * N + ["x", None, True],
+            "nested": [[0.25] * N, [1, 2]],
+            "objects": [{"a": [0.5] * N}],
+            "empty": [],
+            "scalars": {"lcc": 1.5e7, "status": "optimal", "n": 3, "ok": False, "none": None},
+        }
+        r = load(doc)
+        self.assertIsInstance(r["floats"], array)
+        self.assertIsInstance(r["ints_and_floats"], array)
+        for key in ["ints", "short", "mixed", "empty"]:
+            self.assertIsInstance(r[key], list, key)
+        self.assertTrue(all(type(v) is int for v in r["ints"]))
+        self.assertIsInstance(r["nested"], list)
+        self.assertIsInstance(r["nested"][0], array)
+        self.assertEqual(r["nested"][1], [1, 2])
+        self.assertIsInstance(r["objects"][0]["a"], array)
+        self.assertEqual(plain(r), json.loads(json.dumps(doc)))
+
+    def test_untyped_keys(self):
+        doc = {
+            "urdb_response": {"rates": [0.5] * N, "urdb_response": 1, "inner": {"x": [[0.5] * N]}, "after": [0.5] * N},
+            "sibling": [0.5] * N,
+            "outputs": {"untyped": [0.5] * N, "typed": [0.5] * N},
+            "last": {"untyped": [0.5] * N},
+        }
+        r = load(doc, untyped_keys=("urdb_response", "untyped"))
+        self.assertIsInstance(r["urdb_response"]["rates"], list)
+        self.assertIsInstance(r["urdb_response"]["inner"]["x"][0], list)
+        self.assertIsInstance(r["urdb_response"]["after"], list)
+        self.assertIsInstance(r["sibling"], array)
+        self.assertIsInstance(r["outputs"]["untyped"], list)
+        self.assertIsInstance(r["outputs"]["typed"], array)
+        self.assertIsInstance(r["last"]["untyped"], list)
+        self.assertEqual(plain(r), json.loads(json.dumps(doc)))
+
+    def test_root_values(self):
+        self.assertEqual(plain(load([0.5] * N)), [0.5] * N)
+        self.assertEqual(load("optimal"), "optimal")
+        self.assertEqual(load({}), {})
+
+
+class TestSeriesAdapters(TestCase):
+
+    def select(self, adapted):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT %s" % adapted.getquoted().decode())
+            return cursor.fetchone()[0]
+
+    def assertSameFloats(self, actual, expected):
+        self.assertEqual(len(actual), len(expected))
+        for a, e in zip(actual, expected):
+            if isinstance(e, list):
+                self.assertSameFloats(a, e)
+            elif math.isnan(e):
+                self.assertTrue(math.isnan(a))
+            else:
+                self.assertEqual(a, e)
+
+    def test_float_buffer(self):
+        values = [0.1, -2.5e-300, 1e300, 3.0, float("nan"), float("inf"), float("-inf")]
+        self.assertSameFloats(self.select(_adapt_float_buffer(array('d', values))), values)
+        self.assertEqual(self.select(_adapt_float_buffer(array('d'))), [])
+
+    def test_ndarray(self):
+        one_d = [0.1, 1e-7, float("nan"), float("inf"), float("-inf")]
+        self.assertSameFloats(self.select(_adapt_ndarray(np.array(one_d))), one_d)
+        two_d = [[0.1, 0.2, 0.3], [1.0, float("nan"), -4.5]]
+        self.assertSameFloats(self.select(_adapt_ndarray(np.array(two_d))), two_d)
+        self.assertSameFloats(self.select(_adapt_ndarray(np.array(one_d, dtype=np.float32))),
+                              np.array(one_d, dtype=np.float32).tolist())
+        self.assertEqual(self.select(_adapt_ndarray(np.array([1, 2, 3]))), [1, 2, 3])
+        self.assertEqual(self.select(_adapt_ndarray(np.array([[1, 2], [3, 4]]))), [[1, 2], [3, 4]])
+        self.assertEqual(self.select(_adapt_ndarray(np.array([True, False]))), [True, False])
+        self.assertEqual(self.select(_adapt_ndarray(np.array([], dtype=float))), [])
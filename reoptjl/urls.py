@@ -6,6 +6,7 @@ from django.urls import re_path
 urlpatterns = [
     re_path(r'^job/(?P<run_uuid>[0-9a-f-]+)/results/?$', views.results),
     re_path(r'^help/?$', views.help),
+    re_path(r'^job/batch/?$', views.job_batch),
     re_path(r'^job/inputs/?$', views.inputs),
     re_path(r'^job/outputs/?$', views.outputs),
     re_path(r'^chp_defaults/?$', views.chp_defaults),
@@ -23,6 +24,9 @@ urlpatterns = [
     re_path(r'^invalid_urdb/?$', reoviews.invalid_urdb),
     re_path(r'^schedule_stats/?$', reoviews.schedule_stats),
     re_path(r'^get_existing_chiller_default_cop/?$', views.get_existing_chiller_default_cop),
+    re_path(r'^julia_response_cache_stats/?$', views.julia_response_cache_stats),
+    re_path(r'^task_result_stats/?$', views.task_result_stats),
+    re_path(r'^job/profile_stats/?$', views.profile_stats),
     re_path(r'^job/generate_results_table/?$', views.generate_results_table),
     re_path(r'^get_ashp_defaults/?$', views.get_ashp_defaults),
     re_path(r'^pv_cost_defaults/?$', views.pv_cost_defaults),
@@ -6,6 +6,7 @@ from reoptjl.models import MAX_BIG_NUMBER, APIMeta, ExistingBoilerInputs, UserPr
     DomesticHotWaterLoadInputs, CHPInputs, CoolingLoadInputs, ExistingChillerInputs, HotThermalStorageInputs, ColdThermalStorageInputs, \
     AbsorptionChillerInputs, BoilerInputs, SteamTurbineInputs, GHPInputs, ProcessHeatLoadInputs, ElectricHeaterInputs, ASHPSpaceHeaterInputs, \
     ASHPWaterHeaterInputs
+from ghpghx.models import GHPGHXInputs
 from django.core.exceptions import ValidationError
 from pyproj import Proj
 from typing import Tuple
@@ -35,12 +36,31 @@ def scrub_fields(obj: BaseModel, raw_fields: dict):
     return scrubbed_dict
 
 
+def validate_ghpghx_inputs(raw_inputs: dict) -> list:
+    """
+    Validate the GHP.ghpghx_inputs that will be sent to the /ghpghx app (when ghpghx_response_uuids are not provided)
+    :return: list of error strings, passed to InputValidator as ghpghx_inputs_validation_errors
+    """
+    errors = []
+    if raw_inputs.get("GHP") is not None and \
+        raw_inputs["GHP"].get("ghpghx_inputs") not in [None, []] and \
+        raw_inputs["GHP"].get("ghpghx_response_uuids") in [None, []]:
+        for ghpghx_inputs in raw_inputs["GHP"]["ghpghx_inputs"]:
+            ghpghxM = GHPGHXInputs(**ghpghx_inputs)
+            try:
+                # Validate individual model fields
+                ghpghxM.clean_fields()
+            except ValidationError as ve:
+                errors += [key + ": " + val[i] + " " for key, val in ve.message_dict.items() for i in range(len(val))]
+    return errors
+
+
 class InputValidator(object):
 
-    def __init__(self, raw_inputs: dict, ghpghx_inputs_validation_errors=None):
+    def __init__(self, raw_inputs: dict, ghpghx_inputs_validation_errors=None, meta: APIMeta = None):
         """
         Validate user inputs
-        Used in reoptjl/api.py to:
+        Used in reoptjl/api.py (and reoptjl/src/batch_jobs.py for several scenarios) to:
         1. Clean each Model's individual fields, which checks:
             - required inputs provided
             - inputs have correct types
@@ -50,6 +70,8 @@ class InputValidator(object):
             - eg. if user provides outage_start_time_step then must also provide outage_end_time_step
         3. Check requirements across Model fields
             - eg. the time_steps_per_hour must align with the length of loads_kw
+        :param meta: APIMeta to use instead of creating and saving one from raw_inputs["APIMeta"] (the batch endpoint
+            validates all scenarios before it inserts their APIMetas with one bulk_create)
         """
         # TODO figure out how to align with MessagesModel from v1 with validation errors, resampling messages, etc.
         self.validation_errors = dict()
@@ -96,9 +118,10 @@ class InputValidator(object):
         
         filtered_user_post = dict()
         filtered_user_post[APIMeta.key] = scrub_fields(APIMeta, raw_inputs[APIMeta.key])
-        meta = APIMeta.create(**filtered_user_post[APIMeta.key])
+        if meta is None:
+            meta = APIMeta.create(**filtered_user_post[APIMeta.key])
+            meta.save()  # must save the APIMeta first to use it as a OneToOneField/ForeignKey in other models
         self.models[APIMeta.key] = meta
-        meta.save()  # must save the APIMeta first to use it as a OneToOneField/ForeignKey in other models
 
         for obj in self.objects:
             if obj == APIMeta: continue  # already created and saved
@@ -177,9 +200,12 @@ class InputValidator(object):
         Run all models' clean_fields methods
         :return: None
         """
+        exclude = ["coincident_peak_load_active_time_steps"]
+        if self.models[APIMeta.key].pk is None:
+            exclude.append("meta")  # the batch endpoint saves the APIMetas after validating all scenarios
         for model in self.models.values():
             try:
-                model.clean_fields(exclude=["coincident_peak_load_active_time_steps"])
+                model.clean_fields(exclude=exclude)
                 # coincident_peak_load_active_time_steps can have unequal inner lengths (it's an array of array),
                 # which is not allowed in the database. We fix the lengths with repeated last values by overriding the
                 # Django Model save method on ElectricTariffInputs. We then remove the repeated values before
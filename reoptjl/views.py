@@ -1,6 +1,6 @@
 # REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
 from django.db import models
-from django.db.models import Q
+from django.db.models import Q, F, ExpressionWrapper
 import uuid
 from typing import List, Dict, Any
 import sys
@@ -8,6 +8,9 @@ import traceback as tb
 import re
 from django.http import JsonResponse, HttpResponse
 from reo.exceptions import UnexpectedError
+from reo.src.julia_client import julia_client
+from reo.src.julia_response_cache import julia_response_cache
+from reo.src import task_results
 from reoptjl.models import Settings, PVInputs, ElectricStorageInputs, WindInputs, GeneratorInputs, ElectricLoadInputs,\
     ElectricTariffInputs, ElectricUtilityInputs, SpaceHeatingLoadInputs, PVOutputs, ElectricStorageOutputs,\
     WindOutputs, ExistingBoilerInputs, GeneratorOutputs, ElectricTariffOutputs, ElectricUtilityOutputs, \
@@ -17,7 +20,16 @@ from reoptjl.models import Settings, PVInputs, ElectricStorageInputs, WindInputs
     ColdThermalStorageInputs, ColdThermalStorageOutputs, AbsorptionChillerInputs, AbsorptionChillerOutputs,\
     FinancialInputs, FinancialOutputs, UserUnlinkedRuns, BoilerInputs, BoilerOutputs, SteamTurbineInputs, \
     SteamTurbineOutputs, GHPInputs, GHPOutputs, ProcessHeatLoadInputs, ElectricHeaterInputs, ElectricHeaterOutputs, \
-    ASHPSpaceHeaterInputs, ASHPSpaceHeaterOutputs, ASHPWaterHeaterInputs, ASHPWaterHeaterOutputs, PortfolioUnlinkedRuns
+    ASHPSpaceHeaterInputs, ASHPSpaceHeaterOutputs, ASHPWaterHeaterInputs, ASHPWaterHeaterOutputs, PortfolioUnlinkedRuns, \
+    RunSummary
+from reoptjl.src.run_summary import refresh_run_summaries, refresh_run_summary, user_run_summaries, keyset_after, summaries
+from reoptjl.src.results_projection import parse_projection, results_prefetches, projected_results, results_messages
+from reoptjl.src.results_table import table_data
+from reoptjl.src.run_profile import profile_stats as run_profile_stats
+from reoptjl.src.batch_jobs import submit_batch, BatchValidationError, MAX_BATCH_SCENARIOS, DEFAULT_BATCH_CONCURRENCY, \
+    MAX_BATCH_CONCURRENCY
+from reoptjl.api import request_job_type
+import keys
 
 import os
 import requests
@@ -26,11 +38,10 @@ import pandas as pd
 import json
 import logging
 
-from reoptjl.custom_table_helpers import flatten_dict, clean_data_dict, sum_vectors, colnum_string
+from reoptjl.custom_table_helpers import flatten_dict, clean_data_dict, colnum_string
 from reoptjl.custom_table_config import *
 
 import xlsxwriter
-from collections import defaultdict
 import io
 
 log = logging.getLogger(__name__)
@@ -155,15 +166,29 @@ def results(request, run_uuid):
             err.save_to_db()
             return JsonResponse({"Error": str(err.args[0])}, status=400)
 
+    # optional projection, eg. ?keys=status,outputs.Financial.npv,outputs.PV.size_kw and/or ?exclude_series=true
+    exclude_series = request.GET.get("exclude_series", "false").lower() == "true"
     try:
-        # get all required inputs/outputs
-        meta = APIMeta.objects.select_related(
-            'Settings',
-            'FinancialInputs', 'FinancialOutputs',
-            'SiteInputs', 'SiteOutputs',
-            'ElectricLoadInputs',
-            'ElectricUtilityOutputs'
-        ).get(run_uuid=run_uuid)
+        projection = parse_projection(request.GET.get("keys", ""))
+    except ValueError as e:
+        return JsonResponse({"Error": str(e.args[0])}, status=400)
+    project = projection is not None or exclude_series
+
+    try:
+        if project:
+            # only the requested columns of the requested models
+            meta = APIMeta.objects.prefetch_related(
+                *results_prefetches(projection, exclude_series)
+            ).get(run_uuid=run_uuid)
+        else:
+            # get all required inputs/outputs
+            meta = APIMeta.objects.select_related(
+                'Settings',
+                'FinancialInputs', 'FinancialOutputs',
+                'SiteInputs', 'SiteOutputs',
+                'ElectricLoadInputs',
+                'ElectricUtilityOutputs'
+            ).get(run_uuid=run_uuid)
     except Exception as e:
         if isinstance(e, models.ObjectDoesNotExist):
             resp = {"messages": {}}
@@ -181,6 +206,20 @@ def results(request, run_uuid):
             resp = make_error_resp(err.message)
             return JsonResponse(resp, status=500)
 
+    if project:
+        try:
+            r = projected_results(meta, projection)
+        except Exception:
+            exc_type, exc_value, exc_traceback = sys.exc_info()
+            err = UnexpectedError(exc_type, exc_value.args[0], tb.format_tb(exc_traceback), task='reoptjl.views.results',
+                run_uuid=run_uuid)
+            err.save_to_db()
+            resp = make_error_resp(err.message)
+            return JsonResponse(resp, status=500)
+        if meta.status == "error":
+            return JsonResponse(r, status=400)
+        return JsonResponse(r)
+
     r = meta.dict
     r["inputs"] = dict()
     r["inputs"]["Financial"] = meta.FinancialInputs.dict
@@ -267,26 +306,9 @@ def results(request, run_uuid):
 
     try:
         r["outputs"] = dict()
-        r["messages"] = dict()
-        try:
-            msgs = meta.Message.all()
-            for msg in msgs:
-                r["messages"][msg.message_type] = msg.message
-            
-            # Add a dictionary of warnings and errors from REopt
-            # key = location of warning, error, or uncaught error
-            # value = vector of text from REopt
-            #   In case of uncaught error, vector length > 1
-            reopt_messages = meta.REoptjlMessageOutputs.dict
-            for msg_type in ["errors","warnings"]:
-                r["messages"][msg_type] = dict()
-                for m in range(0,len(reopt_messages[msg_type])):
-                    txt = reopt_messages[msg_type][m]
-                    txt = re.sub('[^0-9a-zA-Z_.,() ]+', '', txt)
-                    k = txt.split(',')[0]
-                    v = txt.split(',')[1:]
-                    r["messages"][msg_type][k] = v
-            r["messages"]["has_stacktrace"] = reopt_messages["has_stacktrace"]            
+        r["messages"] = results_messages(meta)
+
+        try: r["profile"] = meta.RunProfile.dict
         except: pass
 
         try:
@@ -433,8 +455,7 @@ def chp_defaults(request):
         inputs["thermal_efficiency"] = request.GET.get("thermal_efficiency")  # Conversion to correct type happens in http.jl
 
     try:
-        julia_host = os.environ.get('JULIA_HOST', "julia")
-        http_jl_response = requests.get("http://" + julia_host + ":8081/chp_defaults/", json=inputs)
+        http_jl_response = julia_response_cache.get("chp_defaults", json=inputs)
         response = JsonResponse(
             http_jl_response.json(),
             status=http_jl_response.status_code
@@ -462,8 +483,7 @@ def absorption_chiller_defaults(request):
         "load_max_tons": request.GET.get("load_max_tons")
     }
     try:
-        julia_host = os.environ.get('JULIA_HOST', "julia")
-        http_jl_response = requests.get("http://" + julia_host + ":8081/absorption_chiller_defaults/", json=inputs)
+        http_jl_response = julia_response_cache.get("absorption_chiller_defaults", json=inputs)
         response = JsonResponse(
             http_jl_response.json()
         )
@@ -493,8 +513,7 @@ def get_ashp_defaults(request):
     else: 
         return JsonResponse({"Error: Missing input force_into_system in get_ashp_defaults endpoint."}, status=400)
     try:
-        julia_host = os.environ.get('JULIA_HOST', "julia")
-        http_jl_response = requests.get("http://" + julia_host + ":8081/get_ashp_defaults/", json=inputs)
+        http_jl_response = julia_response_cache.get("get_ashp_defaults", json=inputs)
         response = JsonResponse(
             http_jl_response.json(),
             status=http_jl_response.status_code
@@ -537,8 +556,7 @@ def pv_cost_defaults(request):
     inputs = {k: v for k, v in inputs.items() if v is not None}
 
     try:
-        julia_host = os.environ.get('JULIA_HOST', "julia")
-        http_jl_response = requests.get("http://" + julia_host + ":8081/pv_cost_defaults/", json=inputs)
+        http_jl_response = julia_response_cache.get("pv_cost_defaults", json=inputs)
         response = JsonResponse(
             http_jl_response.json()
         )
@@ -657,8 +675,7 @@ def simulated_load(request):
         
         # TODO consider changing all requests to POST so that we don't have to do the weird array processing like percent_share[0], [1], etc?
         # json.dump(inputs, open("sim_load_post.json", "w"))
-        julia_host = os.environ.get('JULIA_HOST', "julia")
-        http_jl_response = requests.get("http://" + julia_host + ":8081/simulated_load/", json=inputs)
+        http_jl_response = julia_client.get("simulated_load", json=inputs)
         response = JsonResponse(
             http_jl_response.json(),
             status=http_jl_response.status_code
@@ -699,8 +716,7 @@ def ghp_efficiency_thermal_factors(request):
                         "longitude": longitude,
                         "doe_reference_name": doe_reference_name}
 
-        julia_host = os.environ.get('JULIA_HOST', "julia")
-        http_jl_response = requests.get("http://" + julia_host + ":8081/ghp_efficiency_thermal_factors/", json=inputs_dict)
+        http_jl_response = julia_response_cache.get("ghp_efficiency_thermal_factors", json=inputs_dict)
         response = JsonResponse(
             http_jl_response.json()
         )
@@ -719,6 +735,112 @@ def ghp_efficiency_thermal_factors(request):
         log.debug(debug_msg)
         return JsonResponse({"Error": "Unexpected error in ghp_efficiency_thermal_factors endpoint. Check log for more."}, status=500)
 
+def julia_response_cache_stats(request):
+    """
+    GET hit and miss counts of the cache of responses from the Julia default/lookup endpoints
+    (see reo.src.julia_response_cache)
+    """
+    try:
+        return JsonResponse(julia_response_cache.stats())
+
+    except Exception:
+        exc_type, exc_value, exc_traceback = sys.exc_info()
+        debug_msg = "exc_type: {}; exc_value: {}; exc_traceback: {}".format(exc_type, exc_value.args[0],
+                                                                            tb.format_tb(exc_traceback))
+        log.debug(debug_msg)
+        return JsonResponse({"Error": "Unexpected error in julia_response_cache_stats endpoint. Check log for more."}, status=500)
+
+def task_result_stats(request):
+    """
+    GET the number of rows (by status) and the size of the Celery result backend tables (see reo.src.task_results)
+    """
+    try:
+        return JsonResponse(task_results.task_result_stats())
+
+    except Exception:
+        exc_type, exc_value, exc_traceback = sys.exc_info()
+        debug_msg = "exc_type: {}; exc_value: {}; exc_traceback: {}".format(exc_type, exc_value.args[0],
+                                                                            tb.format_tb(exc_traceback))
+        log.debug(debug_msg)
+        return JsonResponse({"Error": "Unexpected error in task_result_stats endpoint. Check log for more."}, status=500)
+
+def profile_stats(request):
+    """
+    GET count, mean, p50, and p95 of the seconds spent in each stage of the v3 jobs created in the last ?days=
+    (default 7), see reoptjl.src.run_profile
+    """
+    try:
+        days = float(request.GET.get("days", 7))
+        if not 0 < days <= 3650:
+            raise ValueError
+    except ValueError:
+        return JsonResponse({"Error": "days must be a number greater than 0 and at most 3650."}, status=400)
+
+    try:
+        return JsonResponse({"days": days, "stages": run_profile_stats(days)})
+
+    except Exception:
+        exc_type, exc_value, exc_traceback = sys.exc_info()
+        debug_msg = "exc_type: {}; exc_value: {}; exc_traceback: {}".format(exc_type, exc_value.args[0],
+                                                                            tb.format_tb(exc_traceback))
+        log.debug(debug_msg)
+        return JsonResponse({"Error": "Unexpected error in profile_stats endpoint. Check log for more."}, status=500)
+
+def job_batch(request):
+    """
+    POST {"scenarios": [...], "portfolio_uuid": optional, "user_uuid": optional, "webtool_uuid": optional,
+    "max_concurrency": optional, at most MAX_BATCH_CONCURRENCY} to create a job for each scenario (each as POSTed to the
+    job endpoint), see reoptjl.src.batch_jobs. Nothing is saved if any scenario is invalid.
+    :return: 201 {"run_uuids": [...]} in the order of scenarios, or 400 with the input_errors of each invalid scenario
+    """
+    if request.method != "POST":
+        return JsonResponse({"Error": "Must POST a list of scenarios."}, status=405)
+    try:
+        request_body = json.loads(request.body)
+        scenarios = request_body["scenarios"]
+        if not isinstance(scenarios, list) or not all(isinstance(s, dict) for s in scenarios) or len(scenarios) == 0:
+            raise ValueError
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({"Error": "Must POST a JSON object with a non-empty list of scenarios."}, status=400)
+    if len(scenarios) > MAX_BATCH_SCENARIOS:
+        return JsonResponse({"Error": "At most {} scenarios can be POSTed in one batch.".format(MAX_BATCH_SCENARIOS)},
+                            status=400)
+
+    meta_fields = {"job_type": request_job_type(request)}
+    if keys.developer_nrel_gov_key != "":
+        meta_fields["api_key"] = keys.developer_nrel_gov_key
+    for key in ["user_uuid", "webtool_uuid", "portfolio_uuid"]:
+        if request_body.get(key) is not None:
+            try:
+                meta_fields[key] = str(uuid.UUID(request_body[key]))
+            except (ValueError, TypeError, AttributeError):
+                return JsonResponse({"Error": "{} must be a UUID string.".format(key)}, status=400)
+    try:
+        max_concurrency = int(request_body.get("max_concurrency", DEFAULT_BATCH_CONCURRENCY))
+        if max_concurrency < 1:
+            raise ValueError
+    except (ValueError, TypeError):
+        return JsonResponse({"Error": "max_concurrency must be a positive integer."}, status=400)
+    max_concurrency = min(max_concurrency, MAX_BATCH_CONCURRENCY)
+
+    try:
+        run_uuids = submit_batch(scenarios, meta_fields, max_concurrency=max_concurrency)
+        return JsonResponse({"run_uuids": run_uuids}, status=201)
+
+    except BatchValidationError as e:
+        return JsonResponse({
+            "status": "Invalid inputs. No optimization tasks have been created. See messages for details.",
+            "run_uuids": [],
+            "messages": {"error": "Invalid inputs. See input_errors (by scenario index).",
+                         "input_errors": e.errors}
+        }, status=400)
+
+    except Exception:
+        exc_type, exc_value, exc_traceback = sys.exc_info()
+        err = UnexpectedError(exc_type, exc_value, tb.format_tb(exc_traceback), task='job_batch')
+        err.save_to_db()
+        return JsonResponse({"Error": err.message}, status=500)
+
 def get_existing_chiller_default_cop(request):
     """
     GET default existing chiller COP using the max thermal cooling load.
@@ -752,8 +874,7 @@ def get_existing_chiller_default_cop(request):
             "max_load_kw_thermal": max_load_kw_thermal
         }
 
-        julia_host = os.environ.get('JULIA_HOST', "julia")
-        http_jl_response = requests.get("http://" + julia_host + ":8081/get_existing_chiller_default_cop/", json=inputs_dict)
+        http_jl_response = julia_response_cache.get("get_existing_chiller_default_cop", json=inputs_dict)
         response = JsonResponse(
             http_jl_response.json()
         )
@@ -806,16 +927,15 @@ def summary_by_runuuids(request):
         summary_dict = dict()
 
         # Create Querysets: Select all objects associate with a user_uuid, Order by `created` column
-        scenarios = APIMeta.objects.filter(run_uuid__in=run_uuids).only(
-            'run_uuid',
-            'status',
-            'created'
-        ).order_by("-created")
+        run_summaries = RunSummary.objects.filter(run_uuid__in=run_uuids).order_by("-created", "-meta_id")
+        if run_summaries.count() < len(set(run_uuids)):
+            # summarize runs that have not been backfilled yet
+            refresh_run_summaries(APIMeta.objects.filter(run_uuid__in=run_uuids, RunSummary__isnull=True))
 
-        if len(scenarios) > 0: # this should be either 0 or 1 as there are no duplicate run_uuids
-            
-            # Get summary information for all selected scenarios
-            summary_dict = queryset_for_summary(scenarios, summary_dict)
+        # Get summary information for all selected scenarios
+        summary_dict = summaries(run_summaries)
+
+        if len(summary_dict) > 0:
 
             # Create eventual response dictionary
             return_dict = dict()
@@ -898,6 +1018,7 @@ def link_run_uuids_to_portfolio_uuid(request):
                     resp_str = ' and deleted run entry from PortfolioUnlinkedRuns'
                 else:
                     resp_str = ''
+                refresh_run_summary(r_uuid)
             else:
                 # Stop processing on first bad run_uuid
                 response = JsonResponse({"Error": "No scenarios found for run_uuid '{}'".format(r_uuid)}, content_type='application/json', status=500)
@@ -944,8 +1065,12 @@ def summary(request, user_uuid):
                   "batt_kw",                    # Battery Power (kW)
                   "batt_kwh"                    # Battery Capacity (kWh)
                   ""
-                }]
+                }],
+            "next_cursor"                       # only with the limit parameter
         }
+    Optional URL parameters for keyset pagination (newest runs first):
+        limit: positive integer, maximum number of scenarios to return
+        cursor: the next_cursor of the previous response, which is the run_uuid of the last scenario returned
     """
 
     # Validate that user UUID is valid.
@@ -965,24 +1090,35 @@ def summary(request, user_uuid):
         # Dictionary to store all results. Primary key = run_uuid and secondary key = data values from each uuid
         summary_dict = dict()
 
-        # Create Querysets: Select all objects associate with a user_uuid. portfolio_uuid must be "" (empty) or in unlinked portfolio runs
+        # Select the RunSummary of all runs associated with a user_uuid. portfolio_uuid must be "" (empty) or in unlinked portfolio runs
         # Remove any unlinked runs and finally order by `created` column
-        api_metas = APIMeta.objects.filter(
-            Q(user_uuid=user_uuid),
-            Q(portfolio_uuid = "") | Q(run_uuid__in=[i.run_uuid for i in PortfolioUnlinkedRuns.objects.filter(user_uuid=user_uuid)])
-        ).exclude(
-            run_uuid__in=[i.run_uuid for i in UserUnlinkedRuns.objects.filter(user_uuid=user_uuid)]
-        ).only(
-            'run_uuid',
-            'user_uuid',
-            'portfolio_uuid',
-            'status',
-            'created'
-        ).order_by("-created")
-
-        if len(api_metas) > 0:
-            summary_dict = queryset_for_summary(api_metas, summary_dict)
-            response = JsonResponse(create_summary_dict(user_uuid,summary_dict), status=200, safe=False)
+        run_summaries = user_run_summaries(user_uuid)
+
+        limit = request.GET.get('limit')
+        if limit is not None:
+            try:
+                limit = int(limit)
+                if limit < 1:
+                    raise ValueError
+            except ValueError:
+                return JsonResponse({"Error": "limit must be a positive integer."}, status=400)
+            cursor = request.GET.get('cursor')
+            if cursor:
+                try:
+                    run_summaries = keyset_after(run_summaries, cursor)
+                except (ValueError, RunSummary.DoesNotExist):
+                    return JsonResponse({"Error": "Invalid cursor '{}'.".format(cursor)}, status=400)
+            summary_dict = summaries(run_summaries[:limit])
+        else:
+            summary_dict = summaries(run_summaries)
+
+        if len(summary_dict) > 0:
+            response_dict = create_summary_dict(user_uuid,summary_dict)
+            if limit is not None:
+                last_run_uuid = next(reversed(summary_dict.keys()))
+                has_more = len(summary_dict) == limit and keyset_after(run_summaries, last_run_uuid).exists()
+                response_dict['next_cursor'] = last_run_uuid if has_more else None
+            response = JsonResponse(response_dict, status=200, safe=False)
             return response
         else:
             response = JsonResponse({"Error": "No scenarios found for user '{}'".format(user_uuid)}, content_type='application/json', status=404)
@@ -1035,19 +1171,10 @@ def summary_by_chunk(request, user_uuid, chunk):
         except:
             return JsonResponse({"Error": "Chunk number must be a 1-indexed integer."}, status=400)
         
-        # Create Querysets: Select all objects associate with a user_uuid, portfolio_uuid="", Order by `created` column
-        api_metas = APIMeta.objects.filter(
-            Q(user_uuid=user_uuid),
-            Q(portfolio_uuid = "") | Q(run_uuid__in=[i.run_uuid for i in PortfolioUnlinkedRuns.objects.filter(user_uuid=user_uuid)])
-        ).exclude(
-            run_uuid__in=[i.run_uuid for i in UserUnlinkedRuns.objects.filter(user_uuid=user_uuid)]
-        ).only(
-            'run_uuid',
-            'status',
-            'created'
-        ).order_by("-created")
+        # Select the RunSummary of all runs associated with a user_uuid, portfolio_uuid="", Order by `created` column
+        run_summaries = user_run_summaries(user_uuid)
         
-        total_scenarios = len(api_metas)
+        total_scenarios = run_summaries.count()
         if total_scenarios == 0:
             response = JsonResponse({"Error": "No scenarios found for user '{}'".format(user_uuid)}, content_type='application/json', status=404)
             return response
@@ -1070,9 +1197,7 @@ def summary_by_chunk(request, user_uuid, chunk):
         # Filter scenarios to the chunk
         start_idx = max((chunk-1) * chunk_size, 0)
         end_idx = min(chunk * chunk_size, total_scenarios)
-        api_metas_by_chunk = api_metas[start_idx: end_idx]
-
-        summary_dict = queryset_for_summary(api_metas_by_chunk, summary_dict)
+        summary_dict = summaries(run_summaries[start_idx: end_idx])
         response = JsonResponse(create_summary_dict(user_uuid,summary_dict), status=200, safe=False)
         return response
 
@@ -1106,296 +1231,6 @@ def create_summary_dict(user_uuid:str,summary_dict:dict):
     
     return return_dict
 
-# Query all django models for 1 or more run_uuids provided in inputs
-# Return summary_dict which contains summary information for valid run_uuids
-def queryset_for_summary(api_metas,summary_dict:dict):
-
-    # Loop over all the APIMetas associated with a user_uuid, do something if needed
-    for m in api_metas:
-        # print(3, meta.run_uuid) #acces Meta fields like this
-        summary_dict[str(m.run_uuid)] = dict()
-        summary_dict[str(m.run_uuid)]['status'] = m.status
-        summary_dict[str(m.run_uuid)]['run_uuid'] = str(m.run_uuid)
-        summary_dict[str(m.run_uuid)]['user_uuid'] = str(m.user_uuid)
-        summary_dict[str(m.run_uuid)]['portfolio_uuid'] = str(m.portfolio_uuid)
-        summary_dict[str(m.run_uuid)]['created'] = str(m.created)
-        
-    run_uuids = summary_dict.keys()
-
-    # Create query of all UserProvidedMeta objects where their run_uuid is in api_metas run_uuids.
-    usermeta = UserProvidedMeta.objects.filter(meta__run_uuid__in=run_uuids).only(
-        'meta__run_uuid',
-        'description',
-        'address'
-    )
-
-    if len(usermeta) > 0:
-        for m in usermeta:
-            summary_dict[str(m.meta.run_uuid)]['description'] = m.description
-            summary_dict[str(m.meta.run_uuid)]['address'] = m.address
-    
-    utility = ElectricUtilityInputs.objects.filter(meta__run_uuid__in=run_uuids).only(
-        'meta__run_uuid',
-        'outage_start_time_step',
-        'outage_end_time_step',
-        'outage_durations',
-        'outage_start_time_steps'
-    )
-    if len(utility) > 0:
-        for m in utility:
-            if 'focus' not in summary_dict[str(m.meta.run_uuid)].keys():
-                summary_dict[str(m.meta.run_uuid)]['focus'] = ''
-            if m.outage_start_time_step is None:
-                if len(m.outage_start_time_steps) == 0:
-                    summary_dict[str(m.meta.run_uuid)]['focus'] += "Financial,"
-                else:
-                    summary_dict[str(m.meta.run_uuid)]['focus'] += "Resilience,"
-                    summary_dict[str(m.meta.run_uuid)]['outage_duration'] = m.outage_durations[0] # all durations are same.
-            else:
-                # outage start timestep was provided, is 1 or more
-                summary_dict[str(m.meta.run_uuid)]['outage_duration'] = m.outage_end_time_step - m.outage_start_time_step + 1
-                summary_dict[str(m.meta.run_uuid)]['focus'] += "Resilience,"
-    
-    site = SiteOutputs.objects.filter(meta__run_uuid__in=run_uuids).only(
-        'meta__run_uuid',
-        'lifecycle_emissions_reduction_CO2_fraction'
-    )
-    if len(site) > 0:
-        for m in site:
-            try:
-                summary_dict[str(m.meta.run_uuid)]['emission_reduction_pct'] = m.lifecycle_emissions_reduction_CO2_fraction
-            except:
-                summary_dict[str(m.meta.run_uuid)]['emission_reduction_pct'] = 0.0
-
-    
-    site_inputs = SiteInputs.objects.filter(meta__run_uuid__in=run_uuids).only(
-        'meta__run_uuid',
-        'renewable_electricity_min_fraction',
-        'renewable_electricity_max_fraction'
-    )
-    if len(site_inputs) > 0:
-        for m in site_inputs:
-            # if focus key doesnt exist, create it
-            if 'focus' not in summary_dict[str(m.meta.run_uuid)].keys():
-                summary_dict[str(m.meta.run_uuid)]['focus'] = ''
-            try: # can be NoneType
-                if m.renewable_electricity_min_fraction > 0:
-                    summary_dict[str(m.meta.run_uuid)]['focus'] += "Clean-energy,"
-            except:
-                pass # is NoneType
-
-            try: # can be NoneType
-                if m.renewable_electricity_max_fraction > 0:
-                    summary_dict[str(m.meta.run_uuid)]['focus'] += "Clean-energy,"
-            except:
-                pass # is NoneType
-
-    # Use settings to find out if it is an off-grid evaluation
-    settings = Settings.objects.filter(meta__run_uuid__in=run_uuids).only(
-        'meta__run_uuid',
-        'off_grid_flag',
-        'include_climate_in_objective',
-        'include_health_in_objective'
-    )
-    if len(settings) > 0:
-        for m in settings:
-            # if focus key doesnt exist, create it
-            if 'focus' not in summary_dict[str(m.meta.run_uuid)].keys():
-                summary_dict[str(m.meta.run_uuid)]['focus'] = ''
-            if m.off_grid_flag:
-                summary_dict[str(m.meta.run_uuid)]['focus'] += "Off-grid,"
-            
-            if m.include_climate_in_objective or m.include_health_in_objective:
-                summary_dict[str(m.meta.run_uuid)]['focus'] += "Clean-energy,"
-
-    tariffInputs = ElectricTariffInputs.objects.filter(meta__run_uuid__in=run_uuids).only(
-        'meta__run_uuid',
-        'urdb_rate_name'
-    )
-    if len(tariffInputs) > 0:
-        for m in tariffInputs:
-            if m.urdb_rate_name is None:
-                summary_dict[str(m.meta.run_uuid)]['urdb_rate_name'] = 'Custom'
-            else:
-                summary_dict[str(m.meta.run_uuid)]['urdb_rate_name'] = m.urdb_rate_name
-    
-    tariffOuts = ElectricTariffOutputs.objects.filter(meta__run_uuid__in=run_uuids).only(
-        'meta__run_uuid',
-        'year_one_energy_cost_before_tax',
-        'year_one_demand_cost_before_tax',
-        'year_one_fixed_cost_before_tax',
-        'year_one_min_charge_adder_before_tax',
-        'year_one_energy_cost_before_tax_bau',
-        'year_one_demand_cost_before_tax_bau',
-        'year_one_fixed_cost_before_tax_bau',
-        'year_one_min_charge_adder_before_tax_bau',
-    )
-    if len(tariffOuts) > 0:
-        for m in tariffOuts:
-            if (m.year_one_bill_before_tax_bau is not None) and (m.year_one_bill_before_tax is not None):
-                summary_dict[str(m.meta.run_uuid)]['year_one_savings_us_dollars'] = m.year_one_bill_before_tax_bau - m.year_one_bill_before_tax
-            else:
-                summary_dict[str(m.meta.run_uuid)]['year_one_savings_us_dollars'] = None
-
-    load = ElectricLoadInputs.objects.filter(meta__run_uuid__in=run_uuids).only(
-        'meta__run_uuid',
-        'loads_kw',
-        'doe_reference_name'
-    )
-    if len(load) > 0:
-        for m in load:
-            if m.loads_kw is None:
-                summary_dict[str(m.meta.run_uuid)]['doe_reference_name'] = m.doe_reference_name
-            else:
-                summary_dict[str(m.meta.run_uuid)]['doe_reference_name'] = 'Custom'
-
-
-    fin = FinancialOutputs.objects.filter(meta__run_uuid__in=run_uuids).only(
-        'meta__run_uuid',
-        'npv',
-        'initial_capital_costs_after_incentives',
-        'lcc',
-        'replacements_present_cost_after_tax',
-        'lifecycle_capital_costs_plus_om_after_tax',
-        'lifecycle_generation_tech_capital_costs',
-        'lifecycle_storage_capital_costs',
-        'lifecycle_production_incentive_after_tax'
-    )
-    if len(fin) > 0:
-        for m in fin:
-            if m.npv is not None:
-                summary_dict[str(m.meta.run_uuid)]['npv_us_dollars'] = m.npv
-            else:
-                summary_dict[str(m.meta.run_uuid)]['npv_us_dollars'] = None
-            summary_dict[str(m.meta.run_uuid)]['net_capital_costs'] = m.initial_capital_costs_after_incentives
-            summary_dict[str(m.meta.run_uuid)]['lcc_us_dollars'] = m.lcc
-            summary_dict[str(m.meta.run_uuid)]['replacements_present_cost_after_tax'] = m.replacements_present_cost_after_tax
-            summary_dict[str(m.meta.run_uuid)]['lifecycle_capital_costs_plus_om_after_tax'] = m.lifecycle_capital_costs_plus_om_after_tax
-            summary_dict[str(m.meta.run_uuid)]['total_capital_costs'] = m.lifecycle_generation_tech_capital_costs + m.lifecycle_storage_capital_costs - m.lifecycle_production_incentive_after_tax
-
-    batt = ElectricStorageOutputs.objects.filter(meta__run_uuid__in=run_uuids).only(
-        'meta__run_uuid',
-        'size_kw',
-        'size_kwh'
-    )
-    if len(batt) > 0:
-        for m in batt:
-            summary_dict[str(m.meta.run_uuid)]['batt_kw'] = m.size_kw  
-            summary_dict[str(m.meta.run_uuid)]['batt_kwh'] = m.size_kwh
-    
-    pv = PVOutputs.objects.filter(meta__run_uuid__in=run_uuids).only(
-        'meta__run_uuid',
-        'size_kw'
-    )
-    if len(pv) > 0:
-        for m in pv:
-            summary_dict[str(m.meta.run_uuid)]['pv_kw'] = m.size_kw
-    
-    wind = WindOutputs.objects.filter(meta__run_uuid__in=run_uuids).only(
-        'meta__run_uuid',
-        'size_kw'
-    )
-    if len(wind) > 0:
-        for m in wind:
-            summary_dict[str(m.meta.run_uuid)]['wind_kw'] = m.size_kw
-
-    gen = GeneratorOutputs.objects.filter(meta__run_uuid__in=run_uuids).only(
-        'meta__run_uuid',
-        'size_kw'
-    )
-    if len(gen) > 0:
-        for m in gen:
-            summary_dict[str(m.meta.run_uuid)]['gen_kw'] = m.size_kw
-
-    # assumes run_uuids exist in both CHPInputs and CHPOutputs
-    chpInputs = CHPInputs.objects.filter(meta__run_uuid__in=run_uuids).only(
-            'meta__run_uuid',
-            'thermal_efficiency_full_load'
-    )
-    thermal_efficiency_full_load = dict()
-    if len(chpInputs) > 0:
-        for m in chpInputs:
-            thermal_efficiency_full_load[str(m.meta.run_uuid)] = m.thermal_efficiency_full_load
-    
-    chpOutputs = CHPOutputs.objects.filter(meta__run_uuid__in=run_uuids).only(
-            'meta__run_uuid',
-            'size_kw'
-    )
-    if len(chpOutputs) > 0:
-        for m in chpOutputs:
-            if thermal_efficiency_full_load[str(m.meta.run_uuid)] == 0:
-                summary_dict[str(m.meta.run_uuid)]['prime_gen_kw'] = m.size_kw
-            else:
-                summary_dict[str(m.meta.run_uuid)]['chp_kw'] = m.size_kw
-    
-    ghpOutputs = GHPOutputs.objects.filter(meta__run_uuid__in=run_uuids).only(
-            'meta__run_uuid',
-            'ghp_option_chosen',
-            'ghpghx_chosen_outputs',
-            'size_heat_pump_ton',
-            'size_wwhp_heating_pump_ton',
-            'size_wwhp_cooling_pump_ton'
-    )
-    if len(ghpOutputs) > 0:
-        for m in ghpOutputs:
-            if m.ghp_option_chosen > 0:
-                if m.size_heat_pump_ton is not None:
-                    summary_dict[str(m.meta.run_uuid)]['ghp_ton'] = m.size_heat_pump_ton
-                else:
-                    summary_dict[str(m.meta.run_uuid)]['ghp_cooling_ton'] = m.size_wwhp_cooling_pump_ton
-                    summary_dict[str(m.meta.run_uuid)]['ghp_heating_ton'] = m.size_wwhp_heating_pump_ton
-                summary_dict[str(m.meta.run_uuid)]['ghp_n_bores'] = m.ghpghx_chosen_outputs['number_of_boreholes']
-    
-    elecHeater = ElectricHeaterOutputs.objects.filter(meta__run_uuid__in=run_uuids).only(
-            'meta__run_uuid',
-            'size_mmbtu_per_hour'
-    )
-    if len(elecHeater) > 0:
-        for m in elecHeater:
-            summary_dict[str(m.meta.run_uuid)]['electric_heater_mmbtu_per_hour'] = m.size_mmbtu_per_hour
-
-    ashpSpaceHeater = ASHPSpaceHeaterOutputs.objects.filter(meta__run_uuid__in=run_uuids).only(
-            'meta__run_uuid',
-            'size_ton'
-    )
-    if len(ashpSpaceHeater) > 0:
-        for m in ashpSpaceHeater:
-            summary_dict[str(m.meta.run_uuid)]['ASHPSpace_heater_ton'] = m.size_ton
-
-    ashpWaterHeater = ASHPWaterHeaterOutputs.objects.filter(meta__run_uuid__in=run_uuids).only(
-            'meta__run_uuid',
-            'size_ton'
-    )
-    if len(ashpWaterHeater) > 0:
-        for m in ashpWaterHeater:
-            summary_dict[str(m.meta.run_uuid)]['ASHPWater_heater_ton'] = m.size_ton
-    hottes = HotThermalStorageOutputs.objects.filter(meta__run_uuid__in=run_uuids).only(
-        'meta__run_uuid',
-        'size_gal'
-    )
-    if len(hottes) > 0:
-        for m in hottes:
-            summary_dict[str(m.meta.run_uuid)]['hottes_gal'] = m.size_gal
-    
-    coldtes = ColdThermalStorageOutputs.objects.filter(meta__run_uuid__in=run_uuids).only(
-        'meta__run_uuid',
-        'size_gal'
-    )
-    if len(coldtes) > 0:
-        for m in coldtes:
-            summary_dict[str(m.meta.run_uuid)]['coldtes_gal'] = m.size_gal
-    
-
-    abschillTon = AbsorptionChillerOutputs.objects.filter(meta__run_uuid__in=run_uuids).only(
-        'meta__run_uuid',
-        'size_ton'
-    )
-    if len(abschillTon) > 0:
-        for m in abschillTon:
-            summary_dict[str(m.meta.run_uuid)]['absorpchl_ton'] = m.size_ton
-
-    return summary_dict
-
 # Inputs: user_uuid and run_uuid to unlink from the user
 # Outputs: 200 or OK
 # add an entry to the PortfolioUnlinkedRuns for the given portfolio_uuid and run_uuid, indicating they have been unlinked
@@ -1434,6 +1269,7 @@ def unlink(request, user_uuid, run_uuid):
 
         if not UserUnlinkedRuns.objects.filter(run_uuid=run_uuid).exists():
             UserUnlinkedRuns.create(**content)
+            refresh_run_summary(run_uuid)
             return JsonResponse({"Success": "user_uuid {} unlinked from run_uuid {}".format(user_uuid, run_uuid)},
                                 status=201)
         else:
@@ -1490,6 +1326,7 @@ def unlink_from_portfolio(request, user_uuid, portfolio_uuid, run_uuid):
         # Run exists and is tied to porfolio provided in request, hence unlink now.
         if not PortfolioUnlinkedRuns.objects.filter(run_uuid=run_uuid).exists():
             PortfolioUnlinkedRuns.create(**content)
+            refresh_run_summary(run_uuid)
             return JsonResponse({"Success": "run_uuid {} unlinked from portfolio_uuid {}".format(run_uuid, portfolio_uuid)},
                                 status=201)
         else:
@@ -1508,14 +1345,7 @@ def avert_emissions_profile(request):
             "longitude": request.GET['longitude'],
             "load_year": request.GET['load_year']
         }
-        julia_host = os.environ.get(
-            'JULIA_HOST', 
-            "julia"
-        )
-        http_jl_response = requests.get(
-            "http://" + julia_host + ":8081/avert_emissions_profile/", 
-            json=inputs
-        )
+        http_jl_response = julia_response_cache.get("avert_emissions_profile", json=inputs)
         response = JsonResponse(
             http_jl_response.json(),
             status=http_jl_response.status_code
@@ -1550,14 +1380,7 @@ def cambium_profile(request):
             # "time_steps_per_hour": request.GET['time_steps_per_hour'],
             "load_year": request.GET['load_year']
         }
-        julia_host = os.environ.get(
-            'JULIA_HOST', 
-            "julia"
-        )
-        http_jl_response = requests.get(
-            "http://" + julia_host + ":8081/cambium_profile/", 
-            json=inputs
-        )
+        http_jl_response = julia_response_cache.get("cambium_profile", json=inputs)
         response = JsonResponse(
             http_jl_response.json(),
             status=http_jl_response.status_code
@@ -1585,14 +1408,7 @@ def easiur_costs(request):
             "longitude": request.GET['longitude'],
             "inflation": request.GET['inflation']
         }
-        julia_host = os.environ.get(
-            'JULIA_HOST', 
-            "julia"
-        )
-        http_jl_response = requests.get(
-            "http://" + julia_host + ":8081/easiur_costs/", 
-            json=inputs
-        )
+        http_jl_response = julia_response_cache.get("easiur_costs", json=inputs)
         response = JsonResponse(
             http_jl_response.json(),
             status=http_jl_response.status_code
@@ -1656,16 +1472,18 @@ def easiur_costs(request):
 ##############################################################################################################################
 ################################################# START Results Table #########################################################
 ##############################################################################################################################
-def access_raw_data(run_uuids: List[str], request: Any) -> Dict[str, List[Dict[str, Any]]]:
+def access_raw_data(run_uuids: List[str], config: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
     try:
         usermeta = UserProvidedMeta.objects.filter(meta__run_uuid__in=run_uuids).only('meta__run_uuid', 'description', 'address')
         meta_data_dict = {um.meta.run_uuid: {"description": um.description, "address": um.address} for um in usermeta}
+        # only the fields that the config reads, for all runs at once
+        full_data = table_data(run_uuids, config)
 
         return {
             "scenarios": [
                 {
                     "run_uuid": str(run_uuid),
-                    "full_data": summarize_vector_data(request, run_uuid),
+                    "full_data": full_data[run_uuid],
                     "meta_data": meta_data_dict.get(run_uuid, {})
                 }
                 for run_uuid in run_uuids
@@ -1673,36 +1491,15 @@ def access_raw_data(run_uuids: List[str], request: Any) -> Dict[str, List[Dict[s
         }
     except Exception:
         log_and_raise_error('access_raw_data')
-    
-def summarize_vector_data(request: Any, run_uuid: str) -> Dict[str, Any]:
-    try:
-        response = results(request, run_uuid)
-        if response.status_code == 200:
-            return sum_vectors(json.loads(response.content))
-        return {"error": f"Failed to fetch data for run_uuid {run_uuid}"}
-    except Exception:
-        log_and_raise_error('summarize_vector_data')
 
-def generate_data_dict(config: List[Dict[str, Any]], df_gen: Dict[str, Any]) -> Dict[str, List[Any]]:
+def generate_reopt_row(data_f: Dict[str, Any], scenario_name: str, config: List[Dict[str, Any]]) -> Dict[str, Any]:
     try:
-        data_dict = defaultdict(list)
-        for entry in config:
-            val = entry["scenario_value"](df_gen)
-            data_dict[entry["label"]].append(val)
-        return data_dict
-    except Exception:
-        log_and_raise_error('generate_data_dict')
-
-def generate_reopt_dataframe(data_f: Dict[str, Any], scenario_name: str, config: List[Dict[str, Any]]) -> pd.DataFrame:
-    try:
-        scenario_name_str = str(scenario_name)
         df_gen = flatten_dict(data_f)
-        data_dict = generate_data_dict(config, df_gen)
-        data_dict["Scenario"] = [scenario_name_str]
-        col_order = ["Scenario"] + [entry["label"] for entry in config]
-        return pd.DataFrame(data_dict)[col_order]
+        row = {entry["label"]: entry["scenario_value"](df_gen) for entry in config}
+        row["Scenario"] = str(scenario_name)
+        return row
     except Exception:
-        log_and_raise_error('generate_reopt_dataframe')
+        log_and_raise_error('generate_reopt_row')
 
 def get_bau_values(scenarios: List[Dict[str, Any]], config: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
     try:
@@ -1731,20 +1528,18 @@ def get_bau_values(scenarios: List[Dict[str, Any]], config: List[Dict[str, Any]]
 def process_scenarios(scenarios: List[Dict[str, Any]], reopt_data_config: List[Dict[str, Any]]) -> pd.DataFrame:
     try:
         bau_values_per_scenario = get_bau_values(scenarios, reopt_data_config)
-        combined_df = pd.DataFrame()
+        rows = []
 
         for idx, scenario in enumerate(scenarios):
             run_uuid = scenario['run_uuid']
-            df_result = generate_reopt_dataframe(scenario['full_data'], run_uuid, reopt_data_config)
-            df_result["Scenario"] = run_uuid
-
-            bau_data = {key: [value] for key, value in bau_values_per_scenario[run_uuid].items()}
-            bau_data["Scenario"] = [f"BAU {idx + 1}"]
-            df_bau = pd.DataFrame(bau_data)
-
-            combined_df = pd.concat([combined_df, df_bau, df_result], axis=0) if not combined_df.empty else pd.concat([df_bau, df_result], axis=0)
-
-        combined_df.reset_index(drop=True, inplace=True)
+            bau_row = dict(bau_values_per_scenario[run_uuid])
+            bau_row["Scenario"] = f"BAU {idx + 1}"
+            rows.append(bau_row)
+            rows.append(generate_reopt_row(scenario['full_data'], run_uuid, reopt_data_config))
+
+        # build the frame once rather than concatenating a frame per scenario
+        columns = list(dict.fromkeys(entry["label"] for entry in reopt_data_config))
+        combined_df = pd.DataFrame(rows, columns=columns + ["Scenario"], dtype=object)
         combined_df = pd.DataFrame(clean_data_dict(combined_df.to_dict(orient="list")))
         return combined_df[["Scenario"] + [col for col in combined_df.columns if col != "Scenario"]]
     except Exception:
@@ -1770,7 +1565,7 @@ def generate_results_table(request: Any) -> HttpResponse:
         if not target_custom_table:
             return JsonResponse({"Error": f"Invalid table configuration: {table_config_name}. Please provide a valid configuration name."}, status=400)
 
-        scenarios = access_raw_data(run_uuids, request)
+        scenarios = access_raw_data(run_uuids, target_custom_table)
         final_df = process_scenarios(scenarios['scenarios'], target_custom_table)
         final_df_transpose = final_df.transpose()
         final_df_transpose.columns = final_df_transpose.iloc[0]
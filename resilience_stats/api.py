@@ -21,6 +21,7 @@ from celery.utils.log import get_task_logger
 logger = get_task_logger(__name__)
 
 from reo.exceptions import SaveToDatabase, UnexpectedError, REoptFailedToStartError
+from reo.src.julia_client import julia_client
 
 from reo.models import ScenarioModel, FinancialModel
 from reoptjl.models import APIMeta
@@ -408,7 +409,7 @@ class OutageSimJob(ModelResource):
 
         return bundle
 
-@shared_task
+@shared_task(ignore_result=True)
 def run_erp_task(run_uuid):
     name = 'run_erp_task'
     data = get_erp_input_dict_from_run_uuid(run_uuid)
@@ -418,8 +419,7 @@ def run_erp_task(run_uuid):
 
     logger.info("Running ERP tool ...")
     try:
-        julia_host = os.environ.get('JULIA_HOST', "julia")
-        response = requests.post("http://" + julia_host + ":8081/erp/", json=data)
+        response = julia_client.post("erp", json=data)
         response_json = response.json()
         if response.status_code == 500:
             raise REoptFailedToStartError(task=name, message=response_json["error"], run_uuid=run_uuid, user_uuid=user_uuid)
@@ -454,7 +454,7 @@ def process_erp_results(results: dict, run_uuid: str) -> None:
     ERPOutputs.create(meta=meta, **results).save()
     
 
-@shared_task
+@shared_task(ignore_result=True)
 def run_outage_sim_task(scenariomodel_id, run_uuid, bau):
 
     results = run_outage_sim(run_uuid, with_tech=True, bau=bau)
@@ -1,7 +1,6 @@
 # REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
 import sys
 import logging
-import copy
 from django.db import models
 from django.db.models.fields import NOT_PROVIDED
 from django.contrib.postgres.fields import ArrayField
@@ -9,6 +8,7 @@ from django.core.validators import MaxValueValidator, MinValueValidator
 from django.core.exceptions import ValidationError
 from reo.models import ScenarioModel
 from reo.exceptions import SaveToDatabase
+from reo.src.model_dict import model_dict
 log = logging.getLogger(__name__)
 
 class BaseModel(object):
@@ -20,12 +20,7 @@ class BaseModel(object):
         NOTE: to get correct field types you must run self.clean_fields() first (eg. convert int to float)
         :return: dict
         """
-        d = copy.deepcopy(self.__dict__)
-        d.pop("_state", None)
-        d.pop("id", None)
-        d.pop("basemodel_ptr_id", None)
-        d.pop("meta_id", None)
-        return d
+        return model_dict(self, exclude_keys=("id", "basemodel_ptr_id", "meta_id"))
 
     @classmethod
     def create(cls, **kwargs):
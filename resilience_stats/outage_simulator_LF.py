@@ -1,8 +1,13 @@
 # REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
 #!usr/bin/python
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 from math import floor
-import pandas as pd
+import numpy as np
 from celery import group, shared_task, chord
+from reo.src.calendar_index import step_calendar
+from reo.src.task_results import CappedResultTask, forget_results, resolve_result
 from time import sleep
 
 
@@ -12,6 +17,8 @@ def simulate_outage(init_time_step, diesel_kw, fuel_available, b, m, batt_kwh, b
     """
     Determine how long the critical load can be met with gas generator and energy storage.
     Celery task used to parallelize outage simulations starting every time step in a year.
+    NOTE: running one task per time step costs more in task management than it saves, prefer the "celery_chunks" or
+    "process_pool" engines of simulate_outages.
     :param init_time_step: int, initial time step
     :param diesel_kw: float, generator capacity
     :param fuel_available: float, gallons
@@ -78,9 +85,101 @@ def simulate_outage(init_time_step, diesel_kw, fuel_available, b, m, batt_kwh, b
     return n_timesteps / n_steps_per_hour  # met the critical load for all time steps
 
 
+def _load_not_met(load_kw):
+    """
+    Vectorized equivalent of `round(load_kw, 5) > 0` used by simulate_outage.
+    Values near the rounding threshold are checked with Python's round so that both engines agree exactly.
+    :param load_kw: numpy array of unmet load after dispatch
+    :return: numpy boolean array, True where the load was not met
+    """
+    not_met = load_kw >= 6e-6
+    near = np.flatnonzero((load_kw > 4e-6) & (load_kw < 6e-6))
+    for idx in near:
+        not_met[idx] = round(float(load_kw[idx]), 5) > 0
+    return not_met
+
+
+@shared_task(base=CappedResultTask)
+def simulate_outage_batch(init_time_steps, diesel_kw, fuel_available, b, m, batt_kwh, batt_kw,
+                          batt_roundtrip_efficiency, n_timesteps, n_steps_per_hour, batt_soc_kwh, crit_load, chp_kw):
+    """
+    Vectorized version of simulate_outage that advances the outages starting at every time step in init_time_steps
+    together. The state of each outage (battery state of charge, fuel remaining, survived) is held in numpy arrays and
+    outages are dropped from the active set as soon as they fail to meet the load, so the work per time step shrinks as
+    the simulation proceeds. Dispatch logic is identical to simulate_outage.
+    :param init_time_steps: list of int, initial time step of each outage
+    :param batt_soc_kwh: list of float, battery state of charge in kWh at each initial time step
+    (see simulate_outage for the remaining parameters)
+    :return: list of float, number of hours that the critical load can be met for each initial time step
+    """
+    starts = np.asarray(init_time_steps, dtype=int)
+    soc = np.array(batt_soc_kwh, dtype=float)
+    fuel = np.full(len(starts), fuel_available, dtype=float)
+    net_load = np.asarray(crit_load, dtype=float) - chp_kw  # Run CHP. No limit on fuel, no turndown constraint
+    r = np.full(len(starts), n_timesteps / n_steps_per_hour)  # met the critical load for all time steps
+    active = np.arange(len(starts))
+    batt_charge_limit = batt_kw / n_steps_per_hour * batt_roundtrip_efficiency
+    gen_max_fuel = (diesel_kw * m + b) / n_steps_per_hour
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for i in range(n_timesteps):
+            if active.size == 0:
+                break
+            load_kw = net_load[(starts[active] + i) % n_timesteps]  # for wrapping around end of year
+            soc_kwh = soc[active]
+            fuel_gal = fuel[active]
+
+            # load is met, charge battery if there's room in the battery
+            charge = (load_kw < 0) & (soc_kwh < batt_kwh)
+            if charge.any():
+                soc_kwh[charge] += np.minimum(
+                    np.minimum(batt_kwh - soc_kwh[charge], batt_charge_limit),  # room available, inverter capacity
+                    -load_kw[charge] / n_steps_per_hour * batt_roundtrip_efficiency,  # excess energy
+                )
+
+            # check if we can meet load with generator then storage
+            short = np.flatnonzero(load_kw >= 0)
+            if short.size > 0:
+                ld = load_kw[short]
+                soc_s = soc_kwh[short]
+                fuel_s = fuel_gal[short]
+                fuel_needed = (m * ld + b) / n_steps_per_hour
+                within_capacity = ld <= diesel_kw
+                enough_fuel = fuel_needed <= fuel_s
+
+                diesel_only = within_capacity & enough_fuel
+                fuel_s[diesel_only] -= fuel_needed[diesel_only]
+                ld[diesel_only] = 0
+
+                tank_limited = within_capacity & ~enough_fuel
+                ld[tank_limited] -= np.maximum(0, (fuel_s[tank_limited] * n_steps_per_hour - b) / m)
+                fuel_s[tank_limited] = 0
+
+                capacity_limited = ~within_capacity & enough_fuel
+                ld[capacity_limited] -= diesel_kw
+                fuel_s[capacity_limited] = np.maximum(0, fuel_s[capacity_limited] - gen_max_fuel)
+
+                # check if battery can carry balance, preventing battery charge from going negative
+                batt_carries = ~diesel_only & (np.minimum(batt_kw, soc_s * n_steps_per_hour) >= ld)
+                soc_s[batt_carries] = np.maximum(0, soc_s[batt_carries] - ld[batt_carries] / n_steps_per_hour)
+                ld[batt_carries] = 0
+
+                load_kw[short] = ld
+                soc_kwh[short] = soc_s
+                fuel_gal[short] = fuel_s
+
+            soc[active] = soc_kwh
+            fuel[active] = fuel_gal
+            failed = _load_not_met(load_kw)  # failed to meet load in this time step
+            r[active[failed]] = float(i) / float(n_steps_per_hour)
+            active = active[~failed]
+
+    return r.tolist()
+
+
 def simulate_outages(batt_kwh=0, batt_kw=0, pv_kw_ac_hourly=[], init_soc=0, critical_loads_kw=[], wind_kw_ac_hourly=None,
                      batt_roundtrip_efficiency=0.829, diesel_kw=0, fuel_available=0, b=0, m=0,
-                     celery_eager=True, chp_kw=0
+                     celery_eager=True, chp_kw=0, engine="vectorized", n_chunks=None
                      ):
     """
     :param batt_kwh: float, battery storage capacity
@@ -94,6 +193,16 @@ def simulate_outages(batt_kwh=0, batt_kw=0, pv_kw_ac_hourly=[], init_soc=0, crit
     :param fuel_available: float, gallons of diesel fuel available
     :param b: float, diesel fuel burn rate intercept coefficient (y = m*x + b*rated_capacity)  [gal/kwh/kw]
     :param m: float, diesel fuel burn rate slope (y = m*x + b*rated_capacity)  [gal/kWh]
+    :param celery_eager: bool, False to run each outage simulation as a separate celery task
+    :param chp_kw: float, CHP capacity
+    :param engine: str, one of
+        "vectorized": simulate all outages together with simulate_outage_batch
+        "process_pool": split the initial time steps into n_chunks contiguous chunks and run simulate_outage_batch on
+            each chunk in a local process pool (falls back to "vectorized" inside daemonic processes)
+        "celery_chunks": run simulate_outage_batch on n_chunks contiguous chunks as celery tasks
+        "loop": call simulate_outage once per time step (reference implementation)
+        Only used when celery_eager is True.
+    :param n_chunks: int, number of chunks for the "process_pool" and "celery_chunks" engines, defaults to cpu count
     :return: dict,
         {
             "resilience_by_timestep": r,
@@ -141,6 +250,19 @@ def simulate_outages(batt_kwh=0, batt_kw=0, pv_kw_ac_hourly=[], init_soc=0, crit
     if wind_kw_ac_hourly in [None, []]:
         wind_kw_ac_hourly = [0] * n_timesteps
     load_minus_der = [ld - pv - wd for (pv, wd, ld) in zip(pv_kw_ac_hourly, wind_kw_ac_hourly, critical_loads_kw)]
+    batt_soc_kwh = [init_soc[time_step] * batt_kwh for time_step in range(n_timesteps)]
+    outage_inputs = dict(
+        diesel_kw=diesel_kw,
+        fuel_available=fuel_available,
+        b=b, m=m,
+        batt_kwh=batt_kwh,
+        batt_kw=batt_kw,
+        batt_roundtrip_efficiency=batt_roundtrip_efficiency,
+        n_timesteps=n_timesteps,
+        n_steps_per_hour=n_steps_per_hour,
+        crit_load=load_minus_der,
+        chp_kw=chp_kw
+    )
     '''
     Simulation starts here
     '''
@@ -148,95 +270,145 @@ def simulate_outages(batt_kwh=0, batt_kw=0, pv_kw_ac_hourly=[], init_soc=0, crit
     if not celery_eager:  # run jobs in parallel
         jobs = group(simulate_outage.s(
             init_time_step=time_step,
-            diesel_kw=diesel_kw,
-            fuel_available=fuel_available,
-            b=b, m=m,
-            batt_kwh=batt_kwh,
-            batt_kw=batt_kw,
-            batt_roundtrip_efficiency=batt_roundtrip_efficiency,
-            n_timesteps=n_timesteps,
-            n_steps_per_hour=n_steps_per_hour,
-            batt_soc_kwh=init_soc[time_step]*batt_kwh,
-            crit_load=load_minus_der,
-            chp_kw=chp_kw
+            batt_soc_kwh=batt_soc_kwh[time_step],
+            **outage_inputs
         ) for time_step in range(n_timesteps)
         )
-        result = chord(jobs, process_results.s(n_steps_per_hour, n_timesteps)).delay()
-        while not result.ready():
-            sleep(2)
-        if not result.successful():
-            raise Exception("Outage simulator failed.")
-        return result.result
+        return wait_for_chord(chord(jobs, process_results.s(n_steps_per_hour, n_timesteps)).delay())
+    elif engine == "celery_chunks":  # one celery task per contiguous chunk of initial time steps
+        jobs = group(simulate_outage_batch.s(
+            init_time_steps=list(chunk),
+            batt_soc_kwh=batt_soc_kwh[chunk.start:chunk.stop],
+            **outage_inputs
+        ) for chunk in split_time_steps(n_timesteps, n_chunks or os.cpu_count())
+        )
+        return wait_for_chord(chord(jobs, process_chunked_results.s(n_steps_per_hour, n_timesteps)).delay())
+    elif engine == "process_pool" and not multiprocessing.current_process().daemon:
+        # daemonic processes (e.g. celery prefork workers) cannot have children, so they fall through to "vectorized"
+        chunks = split_time_steps(n_timesteps, n_chunks or os.cpu_count())
+        with ProcessPoolExecutor(max_workers=len(chunks), initializer=init_outage_worker,
+                                 initargs=(outage_inputs,)) as executor:
+            chunk_results = executor.map(simulate_outage_chunk, [list(chunk) for chunk in chunks],
+                                         [batt_soc_kwh[chunk.start:chunk.stop] for chunk in chunks])
+            r = [hours for chunk_r in chunk_results for hours in chunk_r]
+        results = process_results(r, n_steps_per_hour, n_timesteps)
+        return results
+    elif engine in ["vectorized", "process_pool"]:  # run all outages together, advancing one time step at a time
+        r = simulate_outage_batch(
+            init_time_steps=list(range(n_timesteps)),
+            batt_soc_kwh=batt_soc_kwh,
+            **outage_inputs
+        )
+        results = process_results(r, n_steps_per_hour, n_timesteps)
+        return results
     else:  # run jobs serially, faster when each job only takes a small amount of time
         for time_step in range(n_timesteps):
             r[time_step] = simulate_outage(
                 init_time_step=time_step,
-                diesel_kw=diesel_kw,
-                fuel_available=fuel_available,
-                b=b, m=m,
-                batt_kwh=batt_kwh,
-                batt_kw=batt_kw,
-                batt_roundtrip_efficiency=batt_roundtrip_efficiency,
-                n_timesteps=n_timesteps,
-                n_steps_per_hour=n_steps_per_hour,
-                batt_soc_kwh=init_soc[time_step] * batt_kwh,
-                crit_load=load_minus_der,
-                chp_kw=chp_kw
+                batt_soc_kwh=batt_soc_kwh[time_step],
+                **outage_inputs
             )
         results = process_results(r, n_steps_per_hour, n_timesteps)
         return results
 
 
-@shared_task
+def split_time_steps(n_timesteps, n_chunks):
+    """
+    Split the initial time steps into contiguous chunks of (nearly) equal size.
+    :param n_timesteps: int, number of time steps in a year
+    :param n_chunks: int, number of chunks
+    :return: list of range
+    """
+    n_chunks = max(1, min(n_chunks, n_timesteps))
+    bounds = [round(n_timesteps * k / n_chunks) for k in range(n_chunks + 1)]
+    return [range(bounds[k], bounds[k + 1]) for k in range(n_chunks)]
+
+
+def wait_for_chord(result):
+    """
+    Wait for the chord callback and return its result, then delete the result rows of the chord from the result backend
+    since nothing reads them again.
+    """
+    try:
+        while not result.ready():
+            sleep(2)
+        if not result.successful():
+            raise Exception("Outage simulator failed.")
+        return resolve_result(result.result, delete=True)
+    finally:
+        forget_results(result)
+
+
+_outage_worker_inputs = dict()
+
+
+def init_outage_worker(outage_inputs):
+    """
+    Process pool initializer: store the inputs shared by all chunks (critical load net of DER, generator and battery
+    parameters) once per worker process instead of sending them with every chunk.
+    """
+    _outage_worker_inputs.update(outage_inputs)
+
+
+def simulate_outage_chunk(init_time_steps, batt_soc_kwh):
+    return simulate_outage_batch(init_time_steps=init_time_steps, batt_soc_kwh=batt_soc_kwh, **_outage_worker_inputs)
+
+
+@shared_task(base=CappedResultTask)
+def process_chunked_results(chunk_results, n_steps_per_hour, n_timesteps):
+    r = [hours for chunk_r in chunk_results for hours in resolve_result(chunk_r, delete=True)]
+    return process_results(r, n_steps_per_hour, n_timesteps)
+
+
+def survival_probabilities(r, outage_durations, n_outages=None):
+    """
+    Fraction of outages in r that are survived for at least hrs hours, for hrs in outage_durations.
+    Counts come from a binary search over the sorted resilience values rather than a scan of r for every duration.
+    :param r: array of resilience hours, one per initial time step
+    :param outage_durations: iterable of int, outage durations in hours
+    :param n_outages: int, denominator of the probabilities, defaults to len(r)
+    :return: list of float rounded to 4 decimals
+    """
+    r_sorted = np.sort(np.asarray(r, dtype=float))
+    hours = np.asarray(list(outage_durations), dtype=float)
+    n_survived = len(r_sorted) - np.searchsorted(r_sorted, hours, side='left')
+    n_outages = float(n_outages or len(r_sorted))
+    return [round(float(count) / n_outages, 4) for count in n_survived.tolist()]
+
+
+def grouped_survival_probabilities(r, groups):
+    """
+    Survival probabilities for each group of resilience values, padded with zeros to a rectangular list of lists
+    because PostgreSQL requires that the arrays are rectangular.
+    :param r: np.ndarray of resilience hours, one per initial time step
+    :param groups: np.ndarray of the group of each time step (eg. its month), the groups are returned in sorted order
+    :return: list of list of float
+    """
+    y_vals_group = [survival_probabilities(v, range(int(v.max()) + 1))
+                    for v in (r[groups == group] for group in np.unique(groups))]
+    width = max(len(v) for v in y_vals_group)
+    return [v + [0] * (width - len(v)) for v in y_vals_group]
+
+
+@shared_task(base=CappedResultTask)
 def process_results(r, n_steps_per_hour, n_timesteps):
 
     r_min = min(r)
     r_max = max(r)
     r_avg = round((float(sum(r)) / float(len(r))), 2)
 
-    # Create a time series of 8760*n_steps_per_hour elements starting on 1/1/2017
-    time = pd.date_range('1/1/2017', periods=8760*n_steps_per_hour, freq='{}min'.format(n_steps_per_hour*60))
-    r_series = pd.Series(r, index=time)
-
-    r_group_month = r_series.groupby(r_series.index.month)
-    r_group_hour = r_series.groupby(r_series.index.hour)
+    # month and hour of each of the 8760*n_steps_per_hour time steps starting on 1/1/2017
+    cal = step_calendar(2017, n_steps_per_hour)
+    r_array = np.asarray(r, dtype=float)
 
     x_vals = list(range(1, int(floor(r_max)+1)))
-    y_vals = list()
+    y_vals = survival_probabilities(r, x_vals, n_timesteps)
     y_vals_group_month = list()
     y_vals_group_hour = list()
 
-    for hrs in x_vals:
-        y_vals.append(round(float(sum([1 if h >= hrs else 0 for h in r])) / float(n_timesteps), 4))
-
     if len(x_vals) > 0:
-        width = 0
-        for k, v in r_group_month:
-            tmp = list()
-            max_hr = int(v.max()) + 1
-            for hrs in range(max_hr):
-                tmp.append(round(float(sum([1 if h >= hrs else 0 for h in v])) / float(len(v)), 4))
-            y_vals_group_month.append(tmp)
-            if max_hr > width:
-                width = max_hr
-
-        # PostgreSQL requires that the arrays are rectangular
-        for i, v in enumerate(y_vals_group_month):
-            y_vals_group_month[i] = v + [0] * (width - len(v))
-
-        width = 0
-        for k, v in r_group_hour:
-            tmp = list()
-            max_hr = int(v.max()) + 1
-            for hrs in range(max_hr):
-                tmp.append(round(float(sum([1 if h >= hrs else 0 for h in v])) / float(len(v)), 4))
-            y_vals_group_hour.append(tmp)
-            if max_hr > width:
-                width = max_hr
-
-        # PostgreSQL requires that the arrays are rectangular
-        for i, v in enumerate(y_vals_group_hour):
-            y_vals_group_hour[i] = v + [0] * (width - len(v))
+        y_vals_group_month = grouped_survival_probabilities(r_array, cal.month)
+        y_vals_group_hour = grouped_survival_probabilities(r_array, cal.hour)
 
     return {"resilience_by_timestep": r,
             "resilience_hours_min": r_min,
@@ -0,0 +1,41 @@
+# REopt®, Copyright (c) Alliance for Sustainable Energy, LLC. See also https://github.com/NREL/REopt_API/blob/master/LICENSE.
+"""
+Benchmark of outage_simulator_LF.process_results against the maximum resilience hours r_max.
+The former implementation counted the outages surviving each duration with a list comprehension over every time step,
+so its runtime grew with n_timesteps * r_max. Run from the repository root with:
+    python -m resilience_stats.tests.benchmark_process_results
+"""
+from math import floor
+from time import perf_counter
+import numpy as np
+from resilience_stats.outage_simulator_LF import process_results
+
+
+def process_results_reference(r, n_timesteps):
+    """ Survival curve as computed before the histogram implementation (without the month/hour groups) """
+    return [round(float(sum([1 if h >= hrs else 0 for h in r])) / float(n_timesteps), 4)
+            for hrs in range(1, int(floor(max(r)) + 1))]
+
+
+def main(n_steps_per_hour=1, r_maxes=(10, 100, 1000, 4000)):
+    n_timesteps = 8760 * n_steps_per_hour
+    rng = np.random.default_rng(42)
+    print("{:>8} {:>14} {:>14}".format("r_max", "reference [s]", "current [s]"))
+    for r_max in r_maxes:
+        r = (np.floor(rng.random(n_timesteps) * r_max * n_steps_per_hour) / n_steps_per_hour).tolist()
+        r[0] = float(r_max)
+
+        start = perf_counter()
+        expected = process_results_reference(r, n_timesteps)
+        reference_seconds = perf_counter() - start
+
+        start = perf_counter()
+        result = process_results(r, n_steps_per_hour, n_timesteps)
+        current_seconds = perf_counter() - start
+
+        assert result["probs_of_surviving"] == expected
+        print("{:>8} {:>14.3f} {:>14.3f}".format(r_max, reference_seconds, current_seconds))
+
+
+if __name__ == "__main__":
+    main()
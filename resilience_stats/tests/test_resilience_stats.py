@@ -3,7 +3,7 @@ import json
 import os
 from django.test import TestCase
 from tastypie.test import ResourceTestCaseMixin
-from resilience_stats.outage_simulator_LF import simulate_outages
+from resilience_stats.outage_simulator_LF import simulate_outages, survival_probabilities
 
 
 class TestResilStats(ResourceTestCaseMixin, TestCase):
@@ -414,3 +414,28 @@ class TestResilStats(ResourceTestCaseMixin, TestCase):
         self.assertListEqual(expected['outage_durations'], resp['outage_durations'])
         for x, y in zip(expected['probs_of_surviving'], resp['probs_of_surviving']):
             self.assertAlmostEquals(x, y, places=4)
+
+    def test_outage_sim_engines_match(self):
+        """
+        The vectorized outage simulator should return exactly the same resilience by time step as the reference loop.
+        """
+        for inputs in [self.inputs, self.inputs2, dict(self.inputs, diesel_kw=30, fuel_available=5),
+                       dict(self.inputs, diesel_kw=0, fuel_available=0, m=0, b=0)]:
+            loop_resp = simulate_outages(engine="loop", **inputs)
+            vectorized_resp = simulate_outages(engine="vectorized", **inputs)
+            self.assertListEqual(loop_resp['resilience_by_timestep'], vectorized_resp['resilience_by_timestep'])
+            self.assertEqual(loop_resp['probs_of_surviving'], vectorized_resp['probs_of_surviving'])
+
+    def test_outage_sim_process_pool(self):
+        """
+        Running contiguous chunks of initial time steps in a process pool should not change the results.
+        """
+        serial_resp = simulate_outages(**self.inputs2)
+        pool_resp = simulate_outages(engine="process_pool", n_chunks=3, **self.inputs2)
+        self.assertDictEqual(serial_resp, pool_resp)
+
+    def test_survival_probabilities(self):
+        r = [0, 0.5, 1, 1, 2.25, 3, 10]
+        expected = [round(float(sum([1 if h >= hrs else 0 for h in r])) / float(len(r)), 4) for hrs in range(12)]
+        self.assertListEqual(expected, survival_probabilities(r, range(12)))
+        self.assertListEqual([0.625, 0.25], survival_probabilities(r, [1, 3], n_outages=8))